@@ -0,0 +1,370 @@
+'''
+Benchmark suite for the solvers, simulators and plotting helpers.
+
+Every benchmark is run over a grid of sizes. For each case, the wall time of a few repeats
+is recorded after a warm-up call, which loads the numba kernels. Peak memory is then
+measured in a separate call, both as the tracemalloc peak (which counts NumPy arrays,
+including those created inside compiled kernels) and as the growth of the resident set,
+which also sees other native allocations but misses pages reused from earlier calls.
+By default each case runs in a fresh interpreter, so results do not depend on what ran before.
+Results are written as JSON tagged with the git revision, so two runs can be compared:
+
+    python notebook_writeup/benchmark_suite.py --grid full --output benchmarks.json
+    python notebook_writeup/benchmark_suite.py --compare old.json new.json
+'''
+
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import resource
+import argparse
+import subprocess
+import tracemalloc
+import numpy as np
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from unittest import mock
+
+# This makes imports around a directory a bit easier usually
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(_HERE)
+
+
+class Case(NamedTuple):
+    """
+    A single benchmark case.
+
+    Attributes:
+        benchmark (str): Name of the function or class being benchmarked.
+        params (Dict[str, Any]): Parameters of this case, recorded alongside the result.
+        setup (Callable[[], Callable[[], Any]]): Prepares the inputs (untimed) and returns
+            the zero-argument call to be timed.
+    """
+    benchmark: str
+    params: Dict[str, Any]
+    setup: Callable[[], Callable[[], Any]]
+
+
+def _solver_case(target_score: int, die_sides: int, method: str) -> Case:
+    def setup():
+        from optimised_layered_vi import pig_layered_value_iteration
+        return lambda: pig_layered_value_iteration(target_score, die_sides, target_score, 1e-6, method)
+    return Case('pig_layered_value_iteration',
+                dict(target_score=target_score, die_sides=die_sides, method=method), setup)
+
+
+def _piglet_case(goal: int) -> Case:
+    def setup():
+        from piglet import PigletSolver
+        return lambda: PigletSolver(goal, 1e-6)()
+    return Case('PigletSolver', dict(goal=goal), setup)
+
+
+def _competition_case(replications: int, compiled: bool, die_sides: int) -> Case:
+    def setup():
+        from competition import Competition, Opponents
+        player1, player2 = Opponents.hold_at_n(20), Opponents.hold_at_n(25)
+        return lambda: Competition(player1, player2, replications, 0,
+                                   die_sides=die_sides, compiled=compiled)()
+    return Case('Competition', dict(replications=replications, compiled=compiled,
+                                    die_sides=die_sides), setup)
+
+
+def _optimal_policy() -> np.ndarray:
+    """
+    Optimal policy of the standard game, as used by `map_reachable_states`.
+    """
+    from optimised_layered_vi import pig_layered_value_iteration
+    return pig_layered_value_iteration(100, 6, 100, method='direct')[1]
+
+
+def _state_space_case(iterations: int) -> Case:
+    def setup():
+        from map_reachable_states import modelling_state_space
+        policy = _optimal_policy()
+
+        def run():
+            np.random.seed(0)
+            return modelling_state_space(policy, np.zeros((101, 101, 101)), iterations, 0.1)
+        return run
+    return Case('modelling_state_space', dict(iterations=iterations), setup)
+
+
+def _plotting_case(function: str, target_score: int) -> Case:
+    def setup():
+        import plotly.graph_objects as go
+        import plotting_tools
+        from optimised_layered_vi import pig_layered_value_iteration
+
+        V, policy = pig_layered_value_iteration(target_score, 6, target_score, method='direct')
+        array = V if function.startswith('plot_isosurface') else policy
+
+        def run():
+            # Time building the figure, not opening it in a browser
+            with mock.patch.object(go.Figure, 'show'):
+                return getattr(plotting_tools, function)(array)
+        return run
+    return Case(function, dict(target_score=target_score), setup)
+
+
+def build_grid(grid: str = 'quick') -> List[Case]:
+    """
+    Lists the benchmark cases of a named grid.
+
+    Args:
+        grid (str, optional): 'quick' for a smoke run of every benchmark at small sizes, or
+                              'full' for the regression grid. Defaults to 'quick'.
+
+    Returns:
+        List[Case]: The cases, in a fixed order.
+    """
+    if grid == 'quick':
+        targets, dice, goals = [15], [6], [5]
+        competition = [(200, False), (1000, True)]
+        iterations, plot_targets = [10], [15]
+    elif grid == 'full':
+        targets, dice, goals = [25, 50, 100], [6, 10], [10, 50, 100]
+        competition = [(1000, False), (1000, True), (10000, True), (100000, True)]
+        iterations, plot_targets = [100, 1000], [25, 50, 100]
+    else:
+        raise ValueError(f"Unknown grid '{grid}', expected 'quick' or 'full'.")
+
+    cases = [_solver_case(target, die, method)
+             for method in ('sweep', 'parallel', 'direct') for die in dice for target in targets]
+    cases += [_piglet_case(goal) for goal in goals]
+    cases += [_competition_case(reps, compiled, die)
+              for die in dice for reps, compiled in competition]
+    cases += [_state_space_case(n) for n in iterations]
+    cases += [_plotting_case(function, target)
+              for function in ('plot_isosurface_from_array', 'generate_box_plots',
+                               'plot_isosurface_mesh', 'generate_box_plots_mesh')
+              for target in plot_targets]
+    return cases
+
+
+def _rss_status(field: str) -> Optional[int]:
+    """
+    Reads a memory field (e.g. 'VmRSS', 'VmHWM') of this process from /proc, in bytes.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Resets the peak resident set size to the current one, where Linux allows it.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss() -> int:
+    """
+    Peak resident set size of this process in bytes, from getrusage.
+    """
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _measure_memory(run: Callable[[], Any]) -> Dict[str, Optional[int]]:
+    """
+    Peak memory of one call, above what was in use before it.
+
+    Without a resettable peak the getrusage high-water mark is used, which only registers
+    growth beyond earlier peaks; running each case in a fresh interpreter keeps that small.
+    """
+    gc.collect()
+    reset = _reset_peak_rss()
+    before = _rss_status('VmRSS') if reset else _max_rss()
+
+    tracemalloc.start()
+    run()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    after = _rss_status('VmHWM') if reset else _max_rss()
+    return dict(peak_rss_bytes=max(after - before, 0), peak_traced_bytes=traced_peak)
+
+
+def run_case(case: Case, repeats: int = 3) -> Dict[str, Any]:
+    """
+    Times and measures a single case in this process.
+
+    Args:
+        case (Case): The case to run.
+        repeats (int, optional): Timed repeats after the warm-up call. Defaults to 3.
+
+    Returns:
+        Dict[str, Any]: The result record. `status` is 'ok', or 'skipped' if an optional
+            dependency is missing.
+    """
+    record = dict(benchmark=case.benchmark, params=case.params)
+    try:
+        run = case.setup()
+    except ImportError as error:
+        return dict(record, status='skipped', reason=str(error))
+
+    run()  # Warm-up: loads compiled kernels and fills caches
+    seconds = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+
+    return dict(record, status='ok', repeats=repeats, seconds=seconds,
+                seconds_min=min(seconds), seconds_median=float(np.median(seconds)),
+                **_measure_memory(run))
+
+
+def _run_isolated(grid: str, index: int, repeats: int) -> Dict[str, Any]:
+    """
+    Runs case `index` of `grid` in a fresh interpreter and returns its record.
+    """
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--grid', grid,
+                                '--repeats', str(repeats), '--run-case', str(index)],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        case = build_grid(grid)[index]
+        return dict(benchmark=case.benchmark, params=case.params, status='error',
+                    reason=completed.stderr.strip().splitlines()[-1] if completed.stderr else '')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _metadata(grid: str, repeats: int, isolated: bool) -> Dict[str, Any]:
+    """
+    Describes the revision and machine a run was made on.
+    """
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=_HERE, capture_output=True,
+                                  text=True).stdout.strip() or None
+        except OSError:
+            return None
+
+    import numba
+    return dict(revision=git('rev-parse', 'HEAD'),
+                dirty=bool(git('status', '--porcelain', '--untracked-files=no')),
+                timestamp=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                python=platform.python_version(), numpy=np.__version__, numba=numba.__version__,
+                platform=platform.platform(), cpu_count=os.cpu_count(),
+                grid=grid, repeats=repeats, isolated=isolated)
+
+
+def run_suite(grid: str = 'quick',
+              repeats: int = 3,
+              isolate: bool = True,
+              benchmarks: Optional[List[str]] = None,
+              output: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs every case of a grid.
+
+    Args:
+        grid (str, optional): Grid name, see `build_grid`. Defaults to 'quick'.
+        repeats (int, optional): Timed repeats per case. Defaults to 3.
+        isolate (bool, optional): Run each case in a fresh interpreter. Defaults to True.
+        benchmarks (Optional[List[str]]): Only run these benchmark names.
+        output (Optional[str]): JSON file to write the results to.
+
+    Returns:
+        Dict[str, Any]: The run's `metadata` and the list of `results`.
+    """
+    results = []
+    for index, case in enumerate(build_grid(grid)):
+        if benchmarks is not None and case.benchmark not in benchmarks:
+            continue
+        result = _run_isolated(grid, index, repeats) if isolate else run_case(case, repeats)
+        results.append(result)
+        print(f"{case.benchmark} {case.params}: {result['status']}"
+              + (f" {result['seconds_min']:.4f}s" if result['status'] == 'ok' else ''),
+              file=sys.stderr)
+
+    report = dict(metadata=_metadata(grid, repeats, isolate), results=results)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1)
+    return report
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 1.2) -> List[Dict[str, Any]]:
+    """
+    Matches the cases of two runs and flags slowdowns and memory growth.
+
+    Args:
+        old (Dict[str, Any]): Baseline run, as returned by `run_suite` or loaded from JSON.
+        new (Dict[str, Any]): Run to check.
+        threshold (float, optional): Ratio of new to old above which a case regressed.
+                                     Defaults to 1.2.
+
+    Returns:
+        List[Dict[str, Any]]: One row per case present and 'ok' in both runs, with the
+            ratios of best time and of tracemalloc peak (the less noisy memory measure),
+            and whether either exceeds `threshold`.
+    """
+    def key(result):
+        return result['benchmark'], json.dumps(result['params'], sort_keys=True)
+
+    baseline = {key(r): r for r in old['results'] if r['status'] == 'ok'}
+    rows = []
+    for result in new['results']:
+        before = baseline.get(key(result))
+        if before is None or result['status'] != 'ok':
+            continue
+        time_ratio = result['seconds_min'] / before['seconds_min']
+        memory_ratio = (result['peak_traced_bytes'] / before['peak_traced_bytes']
+                        if before['peak_traced_bytes'] else 1.0)
+        rows.append(dict(benchmark=result['benchmark'], params=result['params'],
+                         time_ratio=time_ratio, memory_ratio=memory_ratio,
+                         regressed=time_ratio > threshold or memory_ratio > threshold))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the suite, a single case (used for isolation), or a comparison of two runs.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Pig solvers, simulators and plots.")
+    parser.add_argument('--grid', choices=['quick', 'full'], default='quick')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--benchmark', action='append', default=None,
+                        help="Only run this benchmark; may be given more than once.")
+    parser.add_argument('--in-process', action='store_true', help="Run all cases in this interpreter.")
+    parser.add_argument('--output', default=None, help="JSON file to write results to.")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), default=None)
+    parser.add_argument('--threshold', type=float, default=1.2)
+    parser.add_argument('--run-case', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case is not None:
+        print(json.dumps(run_case(build_grid(args.grid)[args.run_case], args.repeats)))
+        return 0
+
+    if args.compare is not None:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            rows = compare(json.load(f_old), json.load(f_new), args.threshold)
+        for row in rows:
+            flag = 'REGRESSED' if row['regressed'] else ''
+            print(f"{row['benchmark']:<28} {json.dumps(row['params']):<60} "
+                  f"time x{row['time_ratio']:.2f}  memory x{row['memory_ratio']:.2f}  {flag}")
+        return int(any(row['regressed'] for row in rows))
+
+    report = run_suite(args.grid, args.repeats, not args.in_process, args.benchmark, args.output)
+    if args.output is None:
+        print(json.dumps(report, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+'''
+Ahead-of-time build of the layered value iteration kernels.
+
+Running this script compiles the serial and direct solvers into a small extension
+module, `_pig_aot`, next to it (or in the directory given as its argument). Short-lived
+jobs such as `solve_cli.py` load that instead of importing numba and its JIT, which
+dominates their start-up time. The build records `SOLVER_VERSION`, and `solve_cli.py`
+falls back to the JIT kernels when it differs, so rebuild after changing the kernels in
+`optimised_layered_vi.py`.
+
+    python notebook_writeup/build_aot.py
+'''
+
+import os
+import sys
+from numba.pycc import CC
+
+# This makes imports around a directory a bit easier usually
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from optimised_layered_vi import SOLVER_VERSION, _layered_vi, _layered_vi_direct
+
+SIGNATURE = 'Tuple((f8[:, :, ::1], i8[:, :, ::1]))(f8[:, :, ::1], i8[:, :, ::1], i8, i8, i8, f8)'
+
+
+def solver_version() -> int:
+    """
+    The `SOLVER_VERSION` of the kernels, frozen into the build as a constant.
+    """
+    return SOLVER_VERSION
+
+
+if __name__ == "__main__":
+    cc = CC('_pig_aot')
+    cc.output_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    cc.export('sweep', SIGNATURE)(_layered_vi.py_func)
+    cc.export('direct', SIGNATURE)(_layered_vi_direct.py_func)
+    cc.export('solver_version', 'i8()')(solver_version)
+    cc.compile()
+    print(f'built _pig_aot in {cc.output_dir}')
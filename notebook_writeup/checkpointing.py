@@ -0,0 +1,233 @@
+'''
+Checkpointing and resuming of long layered value iteration runs.
+
+`pig_layered_value_iteration` solves every layer inside one compiled call, so a job that
+is stopped part way keeps nothing. Here the layers are driven one at a time from Python
+with the same per-layer kernels as `instrumented_layered_value_iteration`, and every few
+layers the rows of the layers finished since the last checkpoint are written to a new
+chunk file. A layer only reads finished layers and its own initial values, so restoring
+the chunks into freshly initialised arrays puts the solver back exactly where it was, and
+a resumed run gives results identical to an uninterrupted one.
+
+Chunks and the checkpoint record (`checkpoint.json`) are written to staging files and
+moved into place with `os.replace`, the record last, so a job killed at any moment leaves
+the previous checkpoint intact. A chunk not named in the record is ignored.
+'''
+
+import os
+import json
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    from .optimised_layered_vi import SOLVER_VERSION, _init_V_policy, _SOLVERS
+    from .solver_telemetry import _run_layer
+except ImportError:
+    from optimised_layered_vi import SOLVER_VERSION, _init_V_policy, _SOLVERS
+    from solver_telemetry import _run_layer
+
+
+class CheckpointedSolve(NamedTuple):
+    """
+    Result of `checkpointed_layered_value_iteration` and `resume_layered_value_iteration`.
+
+    Attributes:
+        V (np.ndarray): Value array; only layers above `next_score_sum` are solved if incomplete.
+        policy (np.ndarray): Policy array, likewise.
+        complete (bool): Whether every layer has been solved.
+        next_score_sum (int): The next layer to solve, -1 once complete.
+    """
+    V: np.ndarray
+    policy: np.ndarray
+    complete: bool
+    next_score_sum: int
+
+
+def _layer_rows(score_sums: range, target_score: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Player and opponent scores of the non-terminal rows in the given layers.
+    """
+    ps = np.concatenate([np.arange(max(0, s - target_score + 1), min(target_score - 1, s) + 1)
+                         for s in score_sums] or [np.zeros(0, np.int64)])
+    os_ = np.concatenate([s - np.arange(max(0, s - target_score + 1), min(target_score - 1, s) + 1)
+                          for s in score_sums] or [np.zeros(0, np.int64)])
+    return ps, os_
+
+
+def _replace_atomically(path: Path, write: Callable) -> None:
+    """
+    Writes a file through `write(f)` to a staging file, then moves it over `path`.
+    """
+    handle, staging = tempfile.mkstemp(dir=path.parent, prefix='.staging-')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            write(f)
+        os.replace(staging, path)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+
+
+def _save_checkpoint(directory: Path,
+                     params: Dict,
+                     chunks: List[str],
+                     V: np.ndarray,
+                     policy: np.ndarray,
+                     first: int,
+                     next_score_sum: int) -> None:
+    """
+    Writes the layers from `first` down to `next_score_sum` + 1 as a new chunk, then the record.
+    """
+    if first > next_score_sum:
+        ps, os_ = _layer_rows(range(first, next_score_sum, -1), params['target_score'])
+        name = f'layers-{first:06d}-{next_score_sum + 1:06d}.npz'
+        _replace_atomically(directory / name,
+                            lambda f: np.savez(f, ps=ps, os=os_, V=V[ps, os_], policy=policy[ps, os_]))
+        chunks.append(name)
+
+    record = dict(params, solver_version=SOLVER_VERSION, chunks=chunks, next_score_sum=next_score_sum)
+    _replace_atomically(directory / 'checkpoint.json',
+                        lambda f: f.write(json.dumps(record, sort_keys=True).encode()))
+
+
+def _solve_from(directory: Path,
+                params: Dict,
+                chunks: List[str],
+                V: np.ndarray,
+                policy: np.ndarray,
+                next_score_sum: int,
+                every: int,
+                max_layers: Optional[int]) -> CheckpointedSolve:
+    """
+    Solves layers from `next_score_sum` down, checkpointing every `every` layers and at the end.
+    """
+    target_score, die_sides = params['target_score'], params['die_sides']
+    max_turn, epsilon, method = params['max_turn'], params['epsilon'], params['method']
+    pair_diff = np.zeros(max(target_score, 1))
+    slope = np.zeros(max_turn + 1)
+
+    first = next_score_sum
+    solved = 0
+    while next_score_sum >= 0 and (max_layers is None or solved < max_layers):
+        _run_layer(method, V, policy, pair_diff, slope, next_score_sum,
+                   target_score, die_sides, max_turn, epsilon)
+        next_score_sum -= 1
+        solved += 1
+        if solved % every == 0:
+            _save_checkpoint(directory, params, chunks, V, policy, first, next_score_sum)
+            first = next_score_sum
+
+    if first != next_score_sum or solved == 0:
+        _save_checkpoint(directory, params, chunks, V, policy, first, next_score_sum)
+    return CheckpointedSolve(V, policy, next_score_sum < 0, next_score_sum)
+
+
+def _restore(directory: Path, record: Dict) -> CheckpointedSolve:
+    """
+    Rebuilds the solver state saved in a checkpoint record.
+    """
+    V, policy = _init_V_policy(record['target_score'], record['max_turn'])
+    for name in record['chunks']:
+        with np.load(directory / name) as chunk:
+            V[chunk['ps'], chunk['os']] = chunk['V']
+            policy[chunk['ps'], chunk['os']] = chunk['policy']
+    next_score_sum = record['next_score_sum']
+    return CheckpointedSolve(V, policy, next_score_sum < 0, next_score_sum)
+
+
+def _read_record(directory: Path) -> Optional[Dict]:
+    """
+    The checkpoint record in `directory`, or None if there is none.
+    """
+    path = directory / 'checkpoint.json'
+    if not path.exists():
+        return None
+    record = json.loads(path.read_text())
+    if record['solver_version'] != SOLVER_VERSION:
+        raise ValueError(f"Checkpoint in {directory} was written by solver version "
+                         f"{record['solver_version']}, not {SOLVER_VERSION}.")
+    return record
+
+
+def checkpointed_layered_value_iteration(directory: Union[str, Path],
+                                         target_score: int = 15,
+                                         die_sides: int = 6,
+                                         max_turn: int = 15,
+                                         epsilon: float = 1e-6,
+                                         method: str = 'sweep',
+                                         every: int = 10,
+                                         max_layers: Optional[int] = None) -> CheckpointedSolve:
+    """
+    `pig_layered_value_iteration`, checkpointing to `directory` every `every` layers.
+
+    If `directory` already holds a checkpoint of the same solve, it is resumed rather than
+    started again.
+
+    Args:
+        directory (Union[str, Path]): Checkpoint directory, created if missing.
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        method (str, optional): Solver method, as for `pig_layered_value_iteration`.
+                                Defaults to 'sweep'.
+        every (int, optional): Layers between checkpoints. Defaults to 10.
+        max_layers (Optional[int]): Solve at most this many layers in this call and then
+                                    checkpoint and return, e.g. to fit a job's time limit.
+
+    Returns:
+        CheckpointedSolve: The arrays, and how far the solve has got.
+    """
+    if method not in _SOLVERS:
+        raise ValueError(f"Unknown method '{method}', expected one of {sorted(_SOLVERS)}.")
+    if every < 1:
+        raise ValueError("every must be at least 1.")
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    params = dict(target_score=target_score, die_sides=die_sides, max_turn=max_turn,
+                  epsilon=epsilon, method=method)
+
+    record = _read_record(directory)
+    if record is not None:
+        saved = {key: record[key] for key in params}
+        if saved != params:
+            raise ValueError(f"{directory} holds a checkpoint of a different solve: {saved}.")
+        return resume_layered_value_iteration(directory, every, max_layers)
+
+    V, policy = _init_V_policy(target_score, max_turn)
+    return _solve_from(directory, params, [], V, policy, 2 * target_score - 2, every, max_layers)
+
+
+def resume_layered_value_iteration(directory: Union[str, Path],
+                                   every: int = 10,
+                                   max_layers: Optional[int] = None) -> CheckpointedSolve:
+    """
+    Continues the solve checkpointed in `directory` from its last checkpoint.
+
+    The results are identical to those of an uninterrupted run, and to
+    `pig_layered_value_iteration` with the same arguments.
+
+    Args:
+        directory (Union[str, Path]): Directory written by `checkpointed_layered_value_iteration`.
+        every (int, optional): Layers between checkpoints. Defaults to 10.
+        max_layers (Optional[int]): Solve at most this many more layers in this call.
+
+    Returns:
+        CheckpointedSolve: The arrays, and how far the solve has got.
+    """
+    if every < 1:
+        raise ValueError("every must be at least 1.")
+    directory = Path(directory)
+    record = _read_record(directory)
+    if record is None:
+        raise FileNotFoundError(f"No checkpoint found in {directory}.")
+
+    state = _restore(directory, record)
+    if state.complete:
+        return state
+    params = {key: record[key] for key in ('target_score', 'die_sides', 'max_turn', 'epsilon', 'method')}
+    return _solve_from(directory, params, list(record['chunks']), state.V, state.policy,
+                       state.next_score_sum, every, max_layers)
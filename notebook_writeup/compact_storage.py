@@ -0,0 +1,363 @@
+'''
+Compact storage for the solution of Pig.
+
+The dense arrays from `pig_layered_value_iteration` hold (target + 1)^2 (max_turn + 1)
+entries, but every state with ps + t >= target or os >= target is terminal and has a
+known value. Here only the non-terminal states are kept, row by row in a flat array,
+with values optionally in float32 and the policy either one byte per state or bit-packed.
+A dense float64 plane of t = 0 values is all the solver needs besides the row being solved.
+'''
+
+import numpy as np
+from numba import njit
+from typing import Tuple, Union
+
+try:
+    from .optimised_layered_vi import _solve_pair_fixed_point
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from optimised_layered_vi import _solve_pair_fixed_point
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+def _layout(target_score: int, max_turn: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the row widths and flat offsets of the non-terminal states.
+
+    Row (ps, os) holds turn totals 0..widths[ps] - 1 and starts at offsets[ps] + os * widths[ps].
+
+    Args:
+        target_score (int): Score required to win.
+        max_turn (int): Maximum turn total represented.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The widths (length target) and offsets (length target + 1).
+    """
+    widths = np.minimum(max_turn, target_score - 1 - np.arange(target_score)) + 1
+    offsets = np.zeros(target_score + 1, np.int64)
+    offsets[1:] = np.cumsum(target_score * widths.astype(np.int64))
+    return widths, offsets
+
+
+@njit(cache=True)
+def _store_row(values: np.ndarray,
+               policy: np.ndarray,
+               start: int,
+               row_V: np.ndarray,
+               row_policy: np.ndarray,
+               width: int,
+               packed: bool) -> None:
+    """
+    Copies a solved row into flat storage, setting policy bits when `packed` is True.
+    """
+    for t in range(width):
+        values[start + t] = row_V[t]
+        if packed:
+            if row_policy[t] == 1:
+                i = start + t
+                policy[i >> 3] |= 1 << (i & 7)
+        else:
+            policy[start + t] = row_policy[t]
+
+
+@njit(cache=True)
+def _compact_direct_vi(values: np.ndarray,
+                       policy: np.ndarray,
+                       offsets: np.ndarray,
+                       widths: np.ndarray,
+                       t0_plane: np.ndarray,
+                       target_score: int,
+                       die_sides: int,
+                       max_turn: int,
+                       packed: bool) -> None:
+    """
+    Direct layered solve writing straight into compact storage.
+
+    Each mirrored pair of rows is solved in float64 scratch rows by the same routine as the
+    dense direct solver, then stored. Holding reads the float64 t = 0 plane, so float32
+    storage does not feed rounding back into the solve.
+
+    Args:
+        values (np.ndarray): Flat value storage (filled in).
+        policy (np.ndarray): Flat or bit-packed policy storage (filled in, initially zero).
+        offsets (np.ndarray): Row offsets from `_layout`.
+        widths (np.ndarray): Row widths from `_layout`.
+        t0_plane (np.ndarray): Dense (target, target) array of t = 0 values (filled in).
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        packed (bool): Whether `policy` is bit-packed.
+    """
+    slope = np.zeros(max_turn + 1)
+    low_V = np.zeros(max_turn + 1)
+    high_V = np.zeros(max_turn + 1)
+    low_policy = np.zeros(max_turn + 1, np.int64)
+    high_policy = np.zeros(max_turn + 1, np.int64)
+
+    for score_sum in range(2 * target_score - 2, -1, -1):
+        p_min = max(0, score_sum - target_score + 1)
+        p_max = min(target_score - 1, score_sum)
+
+        for low in range(p_min, (p_min + p_max) // 2 + 1):
+            high = score_sum - low
+            low_V[:] = 0.0
+            high_V[:] = 0.0
+            _solve_pair_fixed_point(low_V, low_policy, high_V, high_policy, slope, t0_plane,
+                                    low, high, target_score, die_sides, max_turn)
+
+            t0_plane[low, high] = low_V[0]
+            _store_row(values, policy, offsets[low] + high * widths[low],
+                       low_V, low_policy, widths[low], packed)
+            if high != low:
+                t0_plane[high, low] = high_V[0]
+                _store_row(values, policy, offsets[high] + low * widths[high],
+                           high_V, high_policy, widths[high], packed)
+
+
+class CompactSolution:
+    """
+    Values and policy of the non-terminal states of Pig in flat, triangular storage.
+
+    States are addressed with the same (ps, os, t) indices as the dense arrays, and the
+    lookups below also answer for terminal states, so callers need not special-case them.
+    """
+
+    def __init__(self,
+                 values: np.ndarray,
+                 policy: np.ndarray,
+                 target_score: int,
+                 max_turn: int,
+                 packed: bool) -> None:
+        """
+        Wraps existing flat storage.
+
+        Args:
+            values (np.ndarray): Flat values of the non-terminal states.
+            policy (np.ndarray): Flat policy (uint8 per state) or bit-packed policy.
+            target_score (int): Score required to win.
+            max_turn (int): Maximum turn total represented.
+            packed (bool): Whether `policy` is bit-packed.
+        """
+        self.values = values
+        self.policy = policy
+        self.target_score = target_score
+        self.max_turn = max_turn
+        self.packed = packed
+        self.widths, self.offsets = _layout(target_score, max_turn)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """
+        Shape of the equivalent dense arrays.
+        """
+        return (self.target_score + 1, self.target_score + 1, self.max_turn + 1)
+
+    @property
+    def n_states(self) -> int:
+        """
+        Number of non-terminal states stored.
+        """
+        return int(self.offsets[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the value and policy storage.
+        """
+        return self.values.nbytes + self.policy.nbytes
+
+    def _split(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Broadcasts the indices and returns them with a mask of the non-terminal states.
+
+        Raises:
+            IndexError: If any index lies outside the dense arrays' shape.
+        """
+        ps, os, t = np.broadcast_arrays(np.asarray(ps, np.int64),
+                                        np.asarray(os, np.int64),
+                                        np.asarray(t, np.int64))
+        T = self.target_score
+        if ((ps < 0) | (ps > T) | (os < 0) | (os > T) | (t < 0) | (t > self.max_turn)).any():
+            raise IndexError(f"State indices out of range for shape {self.shape}.")
+        stored = (ps + t < T) & (os < T)
+        return ps, os, t, stored
+
+    def index(self, ps, os, t) -> np.ndarray:
+        """
+        Flat storage index of non-terminal states.
+
+        Args:
+            ps: Player score(s).
+            os: Opponent score(s).
+            t: Turn total(s), with ps + t < target and os < target.
+
+        Returns:
+            np.ndarray: Index (or indices) into `values`.
+
+        Raises:
+            IndexError: If any state is terminal or outside the stored range.
+        """
+        ps, os, t = (np.asarray(a, np.int64) for a in (ps, os, t))
+        T = self.target_score
+        if ((ps < 0) | (ps >= T) | (os < 0) | (os >= T) | (t < 0)
+                | (t > np.minimum(self.max_turn, T - ps - 1))).any():
+            raise IndexError(f"Only non-terminal states with 0 <= ps, os < {T} and "
+                             f"0 <= t <= min({self.max_turn}, {T} - ps - 1) are stored.")
+        return self.offsets[ps] + os * self.widths[ps] + t
+
+    def value(self, ps, os, t) -> np.ndarray:
+        """
+        Win probability of the player to move, vectorised over the indices.
+        """
+        ps, os, t, stored = self._split(ps, os, t)
+        out = np.asarray(ps + t >= self.target_score, np.float64)
+        out[stored] = self.values[self.index(ps[stored], os[stored], t[stored])]
+        return out
+
+    def action(self, ps, os, t) -> np.ndarray:
+        """
+        Policy decision (0 = hold, 1 = roll), vectorised over the indices.
+        """
+        ps, os, t, stored = self._split(ps, os, t)
+        out = np.asarray(ps + t < self.target_score, np.uint8)
+        idx = self.index(ps[stored], os[stored], t[stored])
+        if self.packed:
+            out[stored] = (self.policy[idx >> 3] >> (idx & 7)) & 1
+        else:
+            out[stored] = self.policy[idx]
+        return out
+
+    def _flat_policy(self) -> np.ndarray:
+        """
+        The policy as one uint8 per stored state.
+        """
+        if self.packed:
+            return np.unpackbits(self.policy, count=self.n_states, bitorder='little')
+        return self.policy
+
+    def dense_policy(self, dtype: type = np.uint8) -> np.ndarray:
+        """
+        Expands the policy to the dense layout used by `Competition` and the plotting code.
+
+        Args:
+            dtype (type, optional): Element type of the dense array. Defaults to np.uint8.
+
+        Returns:
+            np.ndarray: Dense policy matching `pig_layered_value_iteration`.
+        """
+        T = self.target_score
+        ps = np.arange(T + 1)[:, None, None]
+        t = np.arange(self.max_turn + 1)[None, None, :]
+        dense = np.broadcast_to(ps + t < T, self.shape).astype(dtype)
+
+        flat = self._flat_policy()
+        for p in range(T):
+            w = self.widths[p]
+            dense[p, :T, :w] = flat[self.offsets[p]:self.offsets[p + 1]].reshape(T, w)
+        return dense
+
+    def dense_values(self) -> np.ndarray:
+        """
+        Expands the values to the dense float64 layout of `pig_layered_value_iteration`.
+        """
+        T = self.target_score
+        ps = np.arange(T + 1)[:, None, None]
+        t = np.arange(self.max_turn + 1)[None, None, :]
+        dense = np.broadcast_to(ps + t >= T, self.shape).astype(np.float64)
+
+        for p in range(T):
+            w = self.widths[p]
+            dense[p, :T, :w] = self.values[self.offsets[p]:self.offsets[p + 1]].reshape(T, w)
+        return dense
+
+    def to_dense(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Dense float64 values and int64 policy.
+        """
+        return self.dense_values(), self.dense_policy(np.int64)
+
+    @classmethod
+    def from_dense(cls,
+                   V: np.ndarray,
+                   policy: np.ndarray,
+                   target_score: int,
+                   value_dtype: type = np.float32,
+                   packed: bool = True) -> 'CompactSolution':
+        """
+        Compacts dense solver output.
+
+        Args:
+            V (np.ndarray): Dense value array.
+            policy (np.ndarray): Dense policy array.
+            target_score (int): Score required to win.
+            value_dtype (type, optional): Storage type of the values. Defaults to np.float32.
+            packed (bool, optional): Whether to bit-pack the policy. Defaults to True.
+
+        Returns:
+            CompactSolution: The compact equivalent.
+        """
+        T = target_score
+        max_turn = V.shape[2] - 1
+        widths, offsets = _layout(T, max_turn)
+        values = np.empty(offsets[-1], value_dtype)
+        flat_policy = np.empty(offsets[-1], np.uint8)
+
+        for p in range(T):
+            w = widths[p]
+            values[offsets[p]:offsets[p + 1]] = V[p, :T, :w].ravel()
+            flat_policy[offsets[p]:offsets[p + 1]] = policy[p, :T, :w].ravel()
+
+        if packed:
+            flat_policy = np.packbits(flat_policy, bitorder='little')
+        return cls(values, flat_policy, T, max_turn, packed)
+
+
+def compact_layered_value_iteration(target_score: int = 15,
+                                    die_sides: int = 6,
+                                    max_turn: int = 15,
+                                    value_dtype: type = np.float32,
+                                    packed: bool = True) -> CompactSolution:
+    """
+    Solves Pig directly into compact storage, never allocating the dense arrays.
+
+    Args:
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        value_dtype (type, optional): Storage type of the values. Defaults to np.float32.
+        packed (bool, optional): Whether to bit-pack the policy. Defaults to True.
+
+    Returns:
+        CompactSolution: The solved values and policy.
+    """
+    widths, offsets = _layout(target_score, max_turn)
+    n_states = int(offsets[-1])
+    values = np.zeros(n_states, value_dtype)
+    policy = np.zeros((n_states + 7) // 8 if packed else n_states, np.uint8)
+    t0_plane = np.zeros((target_score, target_score))
+
+    _compact_direct_vi(values, policy, offsets, widths, t0_plane,
+                       target_score, die_sides, max_turn, packed)
+    return CompactSolution(values, policy, target_score, max_turn, packed)
+
+
+def as_dense_policy(policy: Union[np.ndarray, CompactSolution]) -> np.ndarray:
+    """
+    Returns a dense policy array, expanding a compact format such as `CompactSolution`
+    or `ThresholdPolicy` (anything with a `dense_policy` method) to one byte per state.
+    """
+    if hasattr(policy, 'dense_policy'):
+        return policy.dense_policy()
+    return policy
+
+
+def as_dense_values(values: Union[np.ndarray, CompactSolution]) -> np.ndarray:
+    """
+    Returns a dense value array, expanding a `CompactSolution` if necessary.
+    """
+    if isinstance(values, CompactSolution):
+        return values.dense_values()
+    return values
@@ -4,24 +4,470 @@ can return all of the relevant analytics to us regarding any instance of the con
 '''
 
 import numpy as np
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit
+from statistics import NormalDist
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    from .compact_storage import as_dense_policy
+    from .game_statistics import GameStatistics
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from compact_storage import as_dense_policy
+    from game_statistics import GameStatistics
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+# splitmix64 constants, used by the compiled engine's private RNG stream
+_SM64_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_SM64_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+_SM64_MUL2 = np.uint64(0x94D049BB133111EB)
+_TO_UNIT = 1.0 / 9007199254740992.0  # 2^-53
+
+
+@njit(nogil=True, cache=True)
+def _next_uint64(rng_state: np.ndarray) -> np.uint64:
+    """
+    Advances a splitmix64 stream held in a length-1 uint64 array.
+
+    Args:
+        rng_state (np.ndarray): Generator state, updated in place.
+
+    Returns:
+        np.uint64: The next 64 random bits.
+    """
+    rng_state[0] += _SM64_GAMMA
+    z = rng_state[0]
+    z = (z ^ (z >> np.uint64(30))) * _SM64_MUL1
+    z = (z ^ (z >> np.uint64(27))) * _SM64_MUL2
+    return z ^ (z >> np.uint64(31))
+
+
+@njit(nogil=True, cache=True)
+def _roll_die(rng_state: np.ndarray, die_sides: int) -> int:
+    """
+    Draws a uniform roll from 1..die_sides using the top 53 bits of the stream.
+    """
+    u = (_next_uint64(rng_state) >> np.uint64(11)) * _TO_UNIT
+    return 1 + int(u * die_sides)
+
+
+@njit(nogil=True, cache=True)
+def _compiled_turn(score: int, opp_score: int, pol: np.ndarray,
+                   die_sides: int, rng_state: np.ndarray) -> int:
+    """
+    Compiled counterpart of `Competition._turn`.
+
+    Args:
+        score (int): Banked score of the player to move.
+        opp_score (int): Banked score of the opponent.
+        pol (np.ndarray): Policy of the player to move (1 = roll, 0 = hold).
+        die_sides (int): Number of faces on the die.
+        rng_state (np.ndarray): RNG state, updated in place.
+
+    Returns:
+        int: The player's banked score at the end of the turn.
+    """
+    i_max = pol.shape[0] - 1
+    j_max = pol.shape[1] - 1
+    k_max = pol.shape[2] - 1
+    turn_total = 0
+    while pol[min(score, i_max), min(opp_score, j_max), min(turn_total, k_max)] == 1:
+        roll = _roll_die(rng_state, die_sides)
+        if roll == 1:
+            return score  # Turn lost, no points added
+        turn_total += roll
+    return score + turn_total
+
+
+@njit(nogil=True, cache=True)
+def _simulate_games(policy1: np.ndarray,
+                    policy2: np.ndarray,
+                    n_games: int,
+                    target_score: int,
+                    die_sides: int,
+                    rng_state: np.ndarray) -> int:
+    """
+    Plays a batch of games with player 1 moving first and counts player 1's wins.
+
+    Args:
+        policy1 (np.ndarray): Player 1's policy.
+        policy2 (np.ndarray): Player 2's policy.
+        n_games (int): Number of games to play.
+        target_score (int): Score required to win.
+        die_sides (int): Number of faces on the die.
+        rng_state (np.ndarray): RNG state, updated in place so batches can be chained.
+
+    Returns:
+        int: Number of games won by player 1.
+    """
+    wins = 0
+    for _ in range(n_games):
+        score1 = 0
+        score2 = 0
+        while True:
+            score1 = _compiled_turn(score1, score2, policy1, die_sides, rng_state)
+            if score1 >= target_score:
+                wins += 1
+                break
+            score2 = _compiled_turn(score2, score1, policy2, die_sides, rng_state)
+            if score2 >= target_score:
+                break
+    return wins
+
+
+@njit(nogil=True, cache=True)
+def _recorded_turn(score: int, opp_score: int, pol: np.ndarray, die_sides: int,
+                   rng_state: np.ndarray, player: int, visits: np.ndarray) -> Tuple[int, int, bool]:
+    """
+    `_compiled_turn`, also counting the states visited and the rolls made.
+
+    Draws the same rolls as `_compiled_turn`, so games follow the same course.
+
+    Args:
+        score (int): Banked score of the player to move.
+        opp_score (int): Banked score of the opponent.
+        pol (np.ndarray): Policy of the player to move (1 = roll, 0 = hold).
+        die_sides (int): Number of faces on the die.
+        rng_state (np.ndarray): RNG state, updated in place.
+        player (int): 0 for player 1, 1 for player 2, selecting the slice of `visits`.
+        visits (np.ndarray): Visit counts, updated in place unless the state axes are empty.
+
+    Returns:
+        Tuple[int, int, bool]: The banked score at the end of the turn, the number of rolls
+            made and whether the turn ended in a bust.
+    """
+    i_max = pol.shape[0] - 1
+    j_max = pol.shape[1] - 1
+    k_max = pol.shape[2] - 1
+    record = visits.shape[1] > 0
+    turn_total = 0
+    rolls = 0
+    while True:
+        i, j, k = min(score, i_max), min(opp_score, j_max), min(turn_total, k_max)
+        if record:
+            visits[player, i, j, k] += 1
+        if pol[i, j, k] != 1:
+            return score + turn_total, rolls, False
+        roll = _roll_die(rng_state, die_sides)
+        rolls += 1
+        if roll == 1:
+            return score, rolls, True
+        turn_total += roll
+
+
+@njit(nogil=True, cache=True)
+def _simulate_games_recorded(policy1: np.ndarray,
+                             policy2: np.ndarray,
+                             n_games: int,
+                             target_score: int,
+                             die_sides: int,
+                             rng_state: np.ndarray,
+                             games: np.ndarray,
+                             wins: np.ndarray,
+                             length_counts: np.ndarray,
+                             length_moments: np.ndarray,
+                             margin_counts: np.ndarray,
+                             margin_moments: np.ndarray,
+                             turns: np.ndarray,
+                             busts: np.ndarray,
+                             rolls: np.ndarray,
+                             rolls_squared: np.ndarray,
+                             roll_counts: np.ndarray,
+                             visits: np.ndarray) -> None:
+    """
+    `_simulate_games`, accumulating the arrays of a `GameStatistics` in place.
+
+    With the same RNG state the same games are played, so the wins agree with `_simulate_games`.
+    """
+    max_length = length_counts.shape[0] - 1
+    margin_bound = (margin_counts.shape[0] - 1) // 2
+    max_rolls = roll_counts.shape[1] - 1
+    for _ in range(n_games):
+        score1 = 0
+        score2 = 0
+        length = 0
+        while True:
+            # Player 1 moves on even turns and player 2 on odd ones
+            player = length % 2
+            if player == 0:
+                score, n_rolls, bust = _recorded_turn(score1, score2, policy1, die_sides, rng_state, 0, visits)
+                score1 = score
+            else:
+                score, n_rolls, bust = _recorded_turn(score2, score1, policy2, die_sides, rng_state, 1, visits)
+                score2 = score
+            length += 1
+            turns[player] += 1
+            busts[player] += bust
+            rolls[player] += n_rolls
+            rolls_squared[player] += n_rolls * n_rolls
+            roll_counts[player, min(n_rolls, max_rolls)] += 1
+            if score >= target_score:
+                wins[player] += 1
+                break
+
+        margin = score1 - score2
+        games[0] += 1
+        length_counts[min(length, max_length)] += 1
+        length_moments[0] += length
+        length_moments[1] += length * length
+        margin_counts[min(max(margin, -margin_bound), margin_bound) + margin_bound] += 1
+        margin_moments[0] += margin
+        margin_moments[1] += margin * margin
+
+
+# Estimators of `Competition.estimate`, as passed to `_simulate_paired`
+_ESTIMATORS = {'plain': 0, 'crn': 1, 'antithetic': 2, 'control_variate': 3}
+
+
+@njit(nogil=True, cache=True)
+def _mover_value(values: np.ndarray, score: int, opp_score: int, turn_total: int, target_score: int) -> float:
+    """
+    Win probability of the player to move according to `values`, which is 1 once holding wins.
+    """
+    if score + turn_total >= target_score:
+        return 1.0
+    return values[min(score, values.shape[0] - 1), min(opp_score, values.shape[1] - 1),
+                  min(turn_total, values.shape[2] - 1)]
+
+
+@njit(nogil=True, cache=True)
+def _controlled_turn(score: int, opp_score: int, pol: np.ndarray, die_sides: int, target_score: int,
+                     rng_state: np.ndarray, antithetic: bool, values: np.ndarray) -> Tuple[int, float]:
+    """
+    `_compiled_turn` with optionally mirrored dice, also returning the turn's control variate.
+
+    The control is the sum over rolls of the mover's value after the roll minus its expectation
+    before it. Each term has conditional mean zero whatever the policies, so the control has
+    mean exactly zero; it is only accumulated when `values` is non-empty.
+
+    Returns:
+        Tuple[int, float]: The banked score at the end of the turn and the control.
+    """
+    i_max = pol.shape[0] - 1
+    j_max = pol.shape[1] - 1
+    k_max = pol.shape[2] - 1
+    use_values = values.shape[0] > 0
+    control = 0.0
+    turn_total = 0
+    while pol[min(score, i_max), min(opp_score, j_max), min(turn_total, k_max)] == 1:
+        roll = _roll_die(rng_state, die_sides)
+        if antithetic:
+            roll = die_sides + 1 - roll  # u -> 1 - u, which maps every face to its mirror
+        if use_values:
+            expected = 1.0 - _mover_value(values, opp_score, score, 0, target_score)
+            for face in range(2, die_sides + 1):
+                expected += _mover_value(values, score, opp_score, turn_total + face, target_score)
+            expected /= die_sides
+            if roll == 1:
+                control += 1.0 - _mover_value(values, opp_score, score, 0, target_score) - expected
+            else:
+                control += _mover_value(values, score, opp_score, turn_total + roll, target_score) - expected
+        if roll == 1:
+            return score, control  # Turn lost, no points added
+        turn_total += roll
+    return score + turn_total, control
+
+
+@njit(nogil=True, cache=True)
+def _controlled_game(policy_first: np.ndarray, policy_second: np.ndarray, target_score: int,
+                     die_sides: int, stream_first: np.ndarray, stream_second: np.ndarray,
+                     antithetic: bool, values: np.ndarray) -> Tuple[int, float]:
+    """
+    Plays one game, drawing each seat's rolls from its own stream (which may be the same array).
+
+    Returns:
+        Tuple[int, float]: 1 if the first player wins (else 0), and the control variate
+            of the first player's win.
+    """
+    score1 = 0
+    score2 = 0
+    control = 0.0
+    while True:
+        score1, c = _controlled_turn(score1, score2, policy_first, die_sides, target_score,
+                                     stream_first, antithetic, values)
+        control += c
+        if score1 >= target_score:
+            return 1, control
+        score2, c = _controlled_turn(score2, score1, policy_second, die_sides, target_score,
+                                     stream_second, antithetic, values)
+        control -= c  # The first player's value is one minus the second's
+        if score2 >= target_score:
+            return 0, control
+
+
+@njit(nogil=True, cache=True)
+def _simulate_paired(policy1: np.ndarray,
+                     policy2: np.ndarray,
+                     n_samples: int,
+                     target_score: int,
+                     die_sides: int,
+                     rng_state: np.ndarray,
+                     estimator: int,
+                     values: np.ndarray) -> np.ndarray:
+    """
+    Draws samples (x, y) for one of the estimators of `Competition.estimate`.
+
+    plain: x is player 1's win moving first, y = 0; the same games as `_simulate_games`.
+    crn: x and y are player 1's wins moving first and second, each seat's dice drawn from
+         its own stream and the streams reused with the seats swapped.
+    antithetic: x and y are player 1's wins moving first, with the dice of y mirrored.
+    control_variate: x is player 1's win moving first and y its control variate.
+
+    Returns:
+        np.ndarray: Running sums [n, x, y, x^2, y^2, xy], mergeable across workers.
+    """
+    sums = np.zeros(6)
+    first = np.zeros(1, np.uint64)
+    second = np.zeros(1, np.uint64)
+    for _ in range(n_samples):
+        y = 0.0
+        if estimator == 0 or estimator == 3:
+            win, control = _controlled_game(policy1, policy2, target_score, die_sides,
+                                            rng_state, rng_state, False, values)
+            x = float(win)
+            if estimator == 3:
+                y = control
+        elif estimator == 1:
+            seed_first, seed_second = _next_uint64(rng_state), _next_uint64(rng_state)
+            first[0], second[0] = seed_first, seed_second
+            x = float(_controlled_game(policy1, policy2, target_score, die_sides,
+                                       first, second, False, values)[0])
+            first[0], second[0] = seed_first, seed_second
+            y = 1.0 - _controlled_game(policy2, policy1, target_score, die_sides,
+                                       first, second, False, values)[0]
+        else:
+            seed = _next_uint64(rng_state)
+            first[0] = seed
+            x = float(_controlled_game(policy1, policy2, target_score, die_sides,
+                                       first, first, False, values)[0])
+            first[0] = seed
+            y = float(_controlled_game(policy1, policy2, target_score, die_sides,
+                                       first, first, True, values)[0])
+        sums[0] += 1.0
+        sums[1] += x
+        sums[2] += y
+        sums[3] += x * x
+        sums[4] += y * y
+        sums[5] += x * y
+    return sums
+
+
+class Estimate(NamedTuple):
+    """
+    Result of `Competition.estimate`.
+
+    Attributes:
+        win_rate (float): Estimated win rate of player 1.
+        std_error (float): Standard error of the estimate.
+        games (int): Number of games played.
+        variance_reduction (float): Variance of plain simulation with the same number of
+                                    games divided by this estimator's, i.e. how many times
+                                    fewer games reach the same confidence interval.
+        method (str): The estimator used.
+    """
+    win_rate: float
+    std_error: float
+    games: int
+    variance_reduction: float
+    method: str
+
+
+class SequentialResult(NamedTuple):
+    """
+    Result of `Competition.sequential`.
+
+    Attributes:
+        win_rate (float): Estimated win rate of player 1.
+        interval (Tuple[float, float]): Confidence interval for the win rate.
+        games (int): Number of games played.
+        reason (str): 'half_width', 'sprt_better', 'sprt_worse' or 'max_games'.
+        log_likelihood_ratio (float): Final SPRT statistic (0 when the test was not run).
+        estimate (Estimate): The final estimate, with its standard error.
+    """
+    win_rate: float
+    interval: Tuple[float, float]
+    games: int
+    reason: str
+    log_likelihood_ratio: float
+    estimate: Estimate
+
+
+def _wilson_interval(wins: float, n: float, z: float) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion, which stays sensible near 0 and 1.
+    """
+    p = wins / n
+    centre = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+    spread = z / (1 + z ** 2 / n) * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))
+    return centre - spread, centre + spread
+
+
+def _summarise(sums: np.ndarray, method: str) -> Estimate:
+    """
+    Turns the running sums of `_simulate_paired` into an `Estimate`.
+    """
+    n = sums[0]
+    mean_x, mean_y = sums[1] / n, sums[2] / n
+    var_x = max(sums[3] / n - mean_x ** 2, 0.0) * n / max(n - 1, 1)
+    var_y = max(sums[4] / n - mean_y ** 2, 0.0) * n / max(n - 1, 1)
+    cov = (sums[5] / n - mean_x * mean_y) * n / max(n - 1, 1)
+
+    if method == 'plain':
+        return Estimate(float(mean_x), float(np.sqrt(var_x / n)), int(n), 1.0, method)
+
+    if method == 'control_variate':
+        beta = cov / var_y if var_y > 0 else 0.0
+        variance = var_x - beta * cov  # The control's mean is known to be zero
+        baseline, estimate, games = var_x, mean_x - beta * mean_y, n
+    else:
+        # Paired estimators average two games per sample; independent games would give (var_x + var_y) / 4
+        variance = (var_x + var_y + 2 * cov) / 4
+        baseline, estimate, games = (var_x + var_y) / 4, (mean_x + mean_y) / 2, 2 * n
+
+    # Below rounding error of the sums the estimator is exact, e.g. crn for a policy against itself
+    if variance <= 1e-12 * baseline:
+        variance = 0.0
+    reduction = baseline / variance if variance > 0 else np.inf
+    return Estimate(float(estimate), float(np.sqrt(variance / n)), int(games), float(reduction), method)
 
 
 class Competition:
-    def __init__(self, player1: np.ndarray, player2: np.ndarray, replications: int, seed: int) -> None:
+    def __init__(self,
+                 player1: np.ndarray,
+                 player2: np.ndarray,
+                 replications: int,
+                 seed: int,
+                 target_score: int = 100,
+                 die_sides: int = 6,
+                 compiled: bool = False,
+                 workers: int = 1) -> None:
         """
         Initializes a Competition instance for simulating contests between two policies.
 
         Args:
-            player1: A 3D numpy array representing player 1's policy.
-            player2: A 3D numpy array representing player 2's policy.
+            player1: A 3D numpy array (or `CompactSolution`) representing player 1's policy.
+            player2: A 3D numpy array (or `CompactSolution`) representing player 2's policy.
             replications: Number of independent games to simulate.
             seed: Random seed for reproducibility.
+            target_score: Score required to win a game. Defaults to 100.
+            die_sides: Number of faces on the die. Defaults to 6.
+            compiled: If True, games are played in batches by a numba kernel with its own
+                      RNG stream derived from `seed`, rather than through the global NumPy RNG.
+            workers: Number of threads sharing the replications. Values above 1 imply the
+                     compiled engine; results are identical for a given (seed, workers) pair.
         """
-        self.player1_policy = player1  # Policy array of shape (101, 101, 101)
-        self.player2_policy = player2
+        self.player1_policy = as_dense_policy(player1)  # Policy array of shape (target + 1, target + 1, max_turn + 1)
+        self.player2_policy = as_dense_policy(player2)
         self.reps = replications
         self.start_seed = seed
+        self.target_score = target_score
+        self.die_sides = die_sides
+        self.compiled = compiled or workers > 1
+        self.workers = workers
 
     def _turn(self, state: Tuple[int, int, int], pol: np.ndarray) -> Tuple[int, int, int]:
         """
@@ -29,14 +475,15 @@ class Competition:
 
         Args:
             state: Tuple containing (score_player, score_opponent, turn_total).
-            pol: A 3D numpy array policy of shape (101, 101, 101) indicating whether to roll (1) or hold (0).
+            pol: A 3D numpy array policy indicating whether to roll (1) or hold (0).
 
         Returns:
             Tuple[int, int, int]: The new state after the player's turn, with roles swapped for the next player.
         """
+        i_max, j_max, k_max = (n - 1 for n in pol.shape)
         roll = 0
-        while roll != 1 and pol[min(state[0], 100), min(state[1], 100), min(state[2], 100)] == 1:
-            roll = np.random.randint(1, 7)
+        while roll != 1 and pol[min(state[0], i_max), min(state[1], j_max), min(state[2], k_max)] == 1:
+            roll = np.random.randint(1, self.die_sides + 1)
             if roll != 1:
                 state = (state[0], state[1], state[2] + roll)
 
@@ -63,11 +510,11 @@ class Competition:
         while True:
             state = self._turn(state, policy1)
             turn_counter += 1
-            if state[1] >= 100:
+            if state[1] >= self.target_score:
                 return 1
             state = self._turn(state, policy2)
             turn_counter += 1
-            if state[1] >= 100:
+            if state[1] >= self.target_score:
                 return 0
 
     def __call__(self) -> float:
@@ -77,12 +524,271 @@ class Competition:
         Returns:
             float: The win proportion for player 1 over the specified number of replications.
         """
+        if self.compiled:
+            return self._compiled_call()
         np.random.seed(self.start_seed)
         win_sum = 0
         for i in range(self.reps):
             win_sum += self._game(self.player1_policy, self.player2_policy)
         return win_sum / self.reps
 
+    def _worker_streams(self) -> List[np.ndarray]:
+        """
+        Derives one independent RNG state per worker from the competition seed.
+
+        A single worker draws from the seed's own stream, as before workers were added, so
+        single-worker results are unchanged; several workers draw from spawned children.
+
+        Returns:
+            List[np.ndarray]: A length-1 uint64 state array for each worker.
+        """
+        if self.workers == 1:
+            return [np.random.SeedSequence(self.start_seed).generate_state(1, np.uint64)]
+        children = np.random.SeedSequence(self.start_seed).spawn(self.workers)
+        return [child.generate_state(1, np.uint64) for child in children]
+
+    def _worker_shares(self, total: Optional[int] = None) -> List[int]:
+        """
+        Splits the replications as evenly as possible, earlier workers taking the remainder.
+
+        Args:
+            total (Optional[int]): Number of units to split instead of the replications.
+
+        Returns:
+            List[int]: Number of games played by each worker.
+        """
+        base, extra = divmod(self.reps if total is None else total, self.workers)
+        return [base + (w < extra) for w in range(self.workers)]
+
+    def _shared_policies(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns read-only contiguous views of both policies, shared by every worker thread.
+        """
+        shared = []
+        for pol in (self.player1_policy, self.player2_policy):
+            view = np.ascontiguousarray(pol).view()
+            view.flags.writeable = False
+            shared.append(view)
+        return shared[0], shared[1]
+
+    def _compiled_call(self) -> float:
+        """
+        Runs the replications through the compiled engine, one batch per worker.
+
+        The kernel releases the GIL, so workers run on separate cores while reading the
+        same policy arrays rather than each receiving a copy.
+
+        Returns:
+            float: The win proportion for player 1 over the specified number of replications.
+        """
+        policy1, policy2 = self._shared_policies()
+        jobs = zip(self._worker_shares(), self._worker_streams())
+
+        if self.workers == 1:
+            n_games, rng_state = next(jobs)
+            wins = _simulate_games(policy1, policy2, n_games, self.target_score, self.die_sides, rng_state)
+            return wins / self.reps
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_simulate_games, policy1, policy2, n_games,
+                                   self.target_score, self.die_sides, rng_state)
+                       for n_games, rng_state in jobs]
+            wins = sum(f.result() for f in futures)
+        return wins / self.reps
+
+    def statistics(self,
+                   visits: bool = True,
+                   max_length: int = 1000,
+                   max_rolls: int = 100) -> GameStatistics:
+        """
+        Plays the replications with the compiled engine, collecting streaming statistics.
+
+        Each worker fills its own fixed-size accumulators, which are merged at the end, so
+        memory does not depend on the number of replications. The games are the ones
+        played by the compiled engine for the same (seed, workers), so the win rate equals
+        the value returned by calling the competition with `compiled=True`.
+
+        Args:
+            visits (bool, optional): Count visits to every state; costs one int64 per state
+                                     and player, per worker. Defaults to True.
+            max_length (int, optional): Last bin of the game length histogram. Defaults to 1000.
+            max_rolls (int, optional): Last bin of the rolls per turn histogram. Defaults to 100.
+
+        Returns:
+            GameStatistics: Game lengths, margins, rolls per turn, bust rates and visit counts.
+        """
+        policy1, policy2 = self._shared_policies()
+        parts = [GameStatistics.empty(policy1.shape, self.target_score, max_length, max_rolls, visits)
+                 for _ in range(self.workers)]
+        jobs = [(n_games, rng_state, part.arrays())
+                for (n_games, rng_state), part in zip(zip(self._worker_shares(), self._worker_streams()), parts)]
+
+        if self.workers == 1:
+            n_games, rng_state, arrays = jobs[0]
+            _simulate_games_recorded(policy1, policy2, n_games, self.target_score, self.die_sides,
+                                     rng_state, *arrays)
+            return parts[0]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_simulate_games_recorded, policy1, policy2, n_games,
+                                   self.target_score, self.die_sides, rng_state, *arrays)
+                       for n_games, rng_state, arrays in jobs]
+            for f in futures:
+                f.result()
+        return GameStatistics.combine(parts)
+
+    def estimate(self, method: str = 'plain', values: Optional[np.ndarray] = None) -> Estimate:
+        """
+        Estimates player 1's win rate with a variance-reduced estimator, using the compiled engine.
+
+        'plain' plays the same games as the compiled engine. 'antithetic' plays the games in
+        pairs, the second with every die roll mirrored (r -> die_sides + 1 - r); in Pig the two
+        games soon diverge, so expect little from it. 'control_variate'
+        subtracts a multiple of the sum, over all rolls, of the change in the values in `values`
+        less its expectation; this has mean zero for any policies and removes almost all of
+        the noise when the policies are close to the one `values` was solved for. These three
+        estimate the win rate moving first, as `__call__` does.
+
+        'crn' uses common random numbers: each seat draws its dice from its own stream, and
+        every game is replayed with the seats swapped and the streams kept, so that each
+        policy meets the dice the other had. It estimates the win rate averaged over both
+        seats, which is the fair comparison of two policies.
+
+        Args:
+            method (str, optional): 'plain', 'crn', 'antithetic' or 'control_variate'.
+                                    Defaults to 'plain'.
+            values (Optional[np.ndarray]): Value array from `pig_layered_value_iteration`,
+                                           required by 'control_variate'.
+
+        Returns:
+            Estimate: The estimate, its standard error and the variance reduction factor
+                relative to plain simulation of the same number of games, itself estimated
+                from the samples.
+        """
+        values = self._estimator_values(method, values)
+        # Paired estimators play two games per sample
+        samples = self.reps if method in ('plain', 'control_variate') else max(self.reps // 2, 1)
+        sums = self._paired_sums(method, values, samples, self._worker_streams())
+        return _summarise(sums, method)
+
+    @staticmethod
+    def _estimator_values(method: str, values: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Validates the estimator and returns the value array its kernel expects (empty if unused).
+        """
+        if method not in _ESTIMATORS:
+            raise ValueError(f"Unknown method '{method}', expected one of {sorted(_ESTIMATORS)}.")
+        if method != 'control_variate':
+            return np.zeros((0, 0, 0))
+        if values is None:
+            raise ValueError("The control variate needs the value array of a solved game.")
+        return np.ascontiguousarray(values, np.float64)
+
+    def _paired_sums(self,
+                     method: str,
+                     values: np.ndarray,
+                     samples: int,
+                     streams: List[np.ndarray]) -> np.ndarray:
+        """
+        Draws `samples` samples of an estimator across the workers, advancing their streams.
+
+        Returns:
+            np.ndarray: The merged running sums of `_simulate_paired`.
+        """
+        policy1, policy2 = self._shared_policies()
+        jobs = list(zip(self._worker_shares(samples), streams))
+        args = (self.target_score, self.die_sides)
+
+        if self.workers == 1:
+            n, rng_state = jobs[0]
+            return _simulate_paired(policy1, policy2, n, *args, rng_state, _ESTIMATORS[method], values)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_simulate_paired, policy1, policy2, n, *args, rng_state,
+                                   _ESTIMATORS[method], values)
+                       for n, rng_state in jobs]
+            return sum(f.result() for f in futures)
+
+    def sequential(self,
+                   half_width: Optional[float] = 0.01,
+                   sprt_delta: Optional[float] = None,
+                   confidence: float = 0.95,
+                   alpha: float = 0.05,
+                   beta: float = 0.05,
+                   batch: int = 10000,
+                   method: str = 'plain',
+                   values: Optional[np.ndarray] = None) -> 'SequentialResult':
+        """
+        Plays games in batches with the compiled engine until the answer is clear, with
+        `replications` as the budget.
+
+        After every batch the confidence interval is updated (Wilson score interval for
+        'plain', the normal interval of the estimator otherwise) and play stops once its
+        half-width is at most `half_width`. With `sprt_delta`, Wald's sequential probability
+        ratio test of p = 0.5 - delta against p = 0.5 + delta also runs on player 1's wins,
+        stopping once it accepts either, with error rates `alpha` and `beta`. The tests
+        are checked at batch boundaries, so they slightly overshoot Wald's boundaries.
+        The interval is recomputed after every batch without correction for the repeated looks.
+
+        Args:
+            half_width (Optional[float]): Target half-width of the interval, or None to
+                                          stop on the test alone. Defaults to 0.01.
+            sprt_delta (Optional[float]): Distance of the SPRT hypotheses from 0.5, or None
+                                          to skip the test. Only with 'plain'.
+            confidence (float, optional): Level of the interval. Defaults to 0.95.
+            alpha (float, optional): SPRT probability of calling player 1 better when worse.
+            beta (float, optional): SPRT probability of calling player 1 worse when better.
+            batch (int, optional): Games per batch. Defaults to 10000.
+            method (str, optional): Estimator, as in `estimate`. Defaults to 'plain'.
+            values (Optional[np.ndarray]): Value array for 'control_variate'.
+
+        Returns:
+            SequentialResult: The estimate, interval, games used and why play stopped.
+        """
+        values = self._estimator_values(method, values)
+        if sprt_delta is not None and method != 'plain':
+            raise ValueError("The SPRT is only run on the win counts of the 'plain' estimator.")
+        if sprt_delta is not None and not 0 < sprt_delta < 0.5:
+            raise ValueError("sprt_delta must lie strictly between 0 and 0.5.")
+
+        games_per_sample = 1 if method in ('plain', 'control_variate') else 2
+        max_samples = max(self.reps // games_per_sample, 1)
+        batch_samples = max(batch // games_per_sample, 1)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        if sprt_delta is not None:
+            p0, p1 = 0.5 - sprt_delta, 0.5 + sprt_delta
+            win_step, loss_step = np.log(p1 / p0), np.log((1 - p1) / (1 - p0))
+            upper, lower = np.log((1 - beta) / alpha), np.log(beta / (1 - alpha))
+
+        streams = self._worker_streams()
+        sums = np.zeros(6)
+        log_ratio = 0.0
+        while True:
+            n = min(batch_samples, max_samples - int(sums[0]))
+            sums += self._paired_sums(method, values, n, streams)
+            estimate = _summarise(sums, method)
+
+            if method == 'plain':
+                interval = _wilson_interval(sums[1], sums[0], z)
+            else:
+                interval = (estimate.win_rate - z * estimate.std_error,
+                            estimate.win_rate + z * estimate.std_error)
+
+            reason = None
+            if sprt_delta is not None:
+                log_ratio = sums[1] * win_step + (sums[0] - sums[1]) * loss_step
+                if log_ratio >= upper:
+                    reason = 'sprt_better'
+                elif log_ratio <= lower:
+                    reason = 'sprt_worse'
+            if reason is None and half_width is not None and (interval[1] - interval[0]) / 2 <= half_width:
+                reason = 'half_width'
+            if reason is None and sums[0] >= max_samples:
+                reason = 'max_games'
+            if reason is not None:
+                return SequentialResult(estimate.win_rate, (float(interval[0]), float(interval[1])),
+                                        estimate.games, reason, float(log_ratio), estimate)
+
 
 class Opponents:
     '''
@@ -0,0 +1,192 @@
+'''
+Solutions of Pig indexed by distance to the goal rather than by score.
+
+The win probability in state (ps, os, t) only depends on the points each player still
+needs, (target - ps, target - os), and on t. Indexed that way, the solution for one target
+is contained in the solution for any larger target, so growing the target only requires
+solving the states in which one of the players is further from the goal than before.
+The solution for any smaller target is then a slice of the larger one.
+'''
+
+import numpy as np
+from numba import njit
+from typing import Optional, Tuple
+
+try:
+    from .optimised_layered_vi import _solve_pair_fixed_point
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from optimised_layered_vi import _solve_pair_fixed_point
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+def _init_W_policy(max_distance: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Allocates distance-indexed arrays holding the terminal states.
+
+    `W[a, b, t]` is the win probability of the player to move when they need `a` points,
+    the opponent needs `b` and the turn total is `t`. Mirrors `_init_V_policy`.
+
+    Args:
+        max_distance (int): Largest distance (i.e. target score) represented.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Value and policy arrays of shape (max_distance + 1,) * 3.
+    """
+    a = np.arange(max_distance + 1)[:, None, None]
+    t = np.arange(max_distance + 1)[None, None, :]
+    shape = (max_distance + 1,) * 3
+    W = np.broadcast_to(t >= a, shape).astype(np.float64)
+    policy = np.broadcast_to(t < a, shape).astype(np.int64)
+    return W, policy
+
+
+@njit(cache=True)
+def _extend_layers(W: np.ndarray,
+                   policy: np.ndarray,
+                   old_max: int,
+                   die_sides: int) -> None:
+    """
+    Solves every state with a distance above `old_max`, in increasing distance-sum order.
+
+    The arrays are viewed in score coordinates for target = max distance by reversing
+    the first two axes, so the pair routine of the direct solver is reused unchanged.
+
+    Args:
+        W (np.ndarray): Distance-indexed values (updated in place).
+        policy (np.ndarray): Distance-indexed policy (updated in place).
+        old_max (int): Largest distance already solved.
+        die_sides (int): Number of faces on the die.
+    """
+    target_score = W.shape[0] - 1
+    score_V = W[::-1, ::-1]
+    score_policy = policy[::-1, ::-1]
+    hold_plane = score_V[:, :, 0]
+    slope = np.zeros(target_score + 1)
+
+    for distance_sum in range(2, 2 * target_score + 1):
+        for a in range(max(1, distance_sum - target_score), distance_sum // 2 + 1):
+            b = distance_sum - a
+            if b <= old_max:
+                continue  # Both distances already solved
+
+            low = target_score - b
+            high = target_score - a
+            _solve_pair_fixed_point(score_V[low, high], score_policy[low, high],
+                                    score_V[high, low], score_policy[high, low],
+                                    slope, hold_plane, low, high,
+                                    target_score, die_sides, target_score)
+
+
+class DistanceSolution:
+    """
+    Values and policy indexed by distance to the goal, for every target up to `max_distance`.
+    """
+
+    def __init__(self, W: np.ndarray, policy: np.ndarray, die_sides: int) -> None:
+        """
+        Args:
+            W (np.ndarray): Distance-indexed values, shape (max_distance + 1,) * 3.
+            policy (np.ndarray): Distance-indexed policy of the same shape.
+            die_sides (int): Number of faces on the die.
+        """
+        self.W = W
+        self.policy = policy
+        self.die_sides = die_sides
+
+    @property
+    def max_distance(self) -> int:
+        """
+        Largest target score this solution covers.
+        """
+        return self.W.shape[0] - 1
+
+    @classmethod
+    def solve(cls, target_score: int, die_sides: int = 6) -> 'DistanceSolution':
+        """
+        Solves from scratch up to `target_score`.
+
+        Args:
+            target_score (int): Largest target score to cover.
+            die_sides (int, optional): Number of sides on the die. Defaults to 6.
+
+        Returns:
+            DistanceSolution: The solution.
+        """
+        return cls(*_init_W_policy(0), die_sides).extend(target_score)
+
+    @classmethod
+    def from_score_arrays(cls, V: np.ndarray, policy: np.ndarray, die_sides: int) -> 'DistanceSolution':
+        """
+        Re-indexes a score-indexed solution, e.g. one loaded from `SolutionCache`.
+
+        The solution must not truncate turn totals, i.e. max_turn >= target_score - 1.
+
+        Args:
+            V (np.ndarray): Value array from `pig_layered_value_iteration`.
+            policy (np.ndarray): Policy array from `pig_layered_value_iteration`.
+            die_sides (int): Number of sides on the die it was solved for.
+
+        Returns:
+            DistanceSolution: The same solution indexed by distance.
+        """
+        target_score = V.shape[0] - 1
+        if V.shape[2] < target_score:
+            raise ValueError("max_turn must be at least target_score - 1 to re-index by distance.")
+
+        W, W_policy = _init_W_policy(target_score)
+        turns = min(V.shape[2], target_score + 1)
+        W[:, :, :turns] = V[::-1, ::-1, :turns]
+        W_policy[:, :, :turns] = policy[::-1, ::-1, :turns]
+        return cls(W, W_policy, die_sides)
+
+    def extend(self, target_score: int) -> 'DistanceSolution':
+        """
+        Grows the solution to a larger target, solving only the states that are new.
+
+        Args:
+            target_score (int): New largest target score.
+
+        Returns:
+            DistanceSolution: The extended solution (or this one, if already large enough).
+        """
+        old_max = self.max_distance
+        if target_score <= old_max:
+            return self
+
+        W, policy = _init_W_policy(target_score)
+        W[:old_max + 1, :old_max + 1, :old_max + 1] = self.W
+        policy[:old_max + 1, :old_max + 1, :old_max + 1] = self.policy
+        _extend_layers(W, policy, old_max, self.die_sides)
+        return DistanceSolution(W, policy, self.die_sides)
+
+    def for_target(self, target_score: int, max_turn: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Slices out the score-indexed solution for a given target.
+
+        Values are those of the untruncated game, so they match the solver whenever
+        max_turn >= target_score - 1; smaller `max_turn` only drops turn totals.
+
+        Args:
+            target_score (int): Target score, at most `max_distance`.
+            max_turn (Optional[int]): Turn totals to include. Defaults to `target_score`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Value and policy arrays laid out as in
+                `pig_layered_value_iteration(target_score, die_sides, max_turn)`.
+        """
+        if target_score > self.max_distance:
+            raise ValueError(f"Solution only covers targets up to {self.max_distance}; call extend first.")
+
+        max_turn = target_score if max_turn is None else max_turn
+        shape = (target_score + 1, target_score + 1, max_turn + 1)
+
+        # Turn totals above the target are always terminal wins
+        V = np.ones(shape)
+        policy = np.zeros(shape, np.int64)
+        turns = min(max_turn, target_score) + 1
+        V[:, :, :turns] = self.W[target_score::-1, target_score::-1, :turns]
+        policy[:, :, :turns] = self.policy[target_score::-1, target_score::-1, :turns]
+        return V, policy
@@ -0,0 +1,217 @@
+'''
+Streaming statistics of simulated games, collected by `Competition.statistics`.
+
+Nothing is stored per game. Every quantity is a fixed-size histogram or an exact integer
+sum (count, sum and sum of squares) updated as games are played, so memory does not grow
+with the number of games and runs of 10^8 games cost no more memory than runs of 10^3.
+All accumulators are added elementwise, so statistics from separate workers, processes
+or runs merge by addition into exactly what a single run would have collected.
+
+Per-player arrays are indexed 0 for player 1 (who moves first) and 1 for player 2.
+'''
+
+import numpy as np
+from typing import Dict, Iterable, Tuple
+
+
+# Accumulators held by every `GameStatistics`, in save order
+_FIELDS = ('games', 'wins', 'length_counts', 'length_moments', 'margin_counts', 'margin_moments',
+           'turns', 'busts', 'rolls', 'rolls_squared', 'roll_counts', 'visits')
+
+
+class GameStatistics:
+    """
+    Bounded-memory summary of a batch of games.
+
+    Histograms clip values beyond their last bin into it, while the moments are exact.
+
+    Attributes:
+        games (np.ndarray): Number of games played, shape (1,).
+        wins (np.ndarray): Games won by each player, shape (2,).
+        length_counts (np.ndarray): Histogram of game length in turns (both players' turns).
+        length_moments (np.ndarray): Sum and sum of squares of game lengths.
+        margin_counts (np.ndarray): Histogram of player 1's final score minus player 2's,
+                                    bin i holding a margin of i - margin_bound.
+        margin_moments (np.ndarray): Sum and sum of squares of the margins.
+        turns (np.ndarray): Turns taken by each player.
+        busts (np.ndarray): Turns each player ended by rolling a 1.
+        rolls (np.ndarray): Rolls made by each player.
+        rolls_squared (np.ndarray): Sum over turns of the squared number of rolls, per player.
+        roll_counts (np.ndarray): Histogram of rolls per turn, shape (2, max_rolls + 1).
+        visits (np.ndarray): Times each player was to move in state (own score, opponent's
+                             score, turn total), with indices clamped to the policy shape as
+                             in play; shape (2, 0, 0, 0) when visits are not collected.
+    """
+
+    def __init__(self, **arrays: np.ndarray) -> None:
+        for name in _FIELDS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def empty(cls,
+              policy_shape: Tuple[int, int, int],
+              target_score: int = 100,
+              max_length: int = 1000,
+              max_rolls: int = 100,
+              visits: bool = True) -> 'GameStatistics':
+        """
+        Creates zeroed accumulators.
+
+        Args:
+            policy_shape (Tuple[int, int, int]): Shape of the policies being played.
+            target_score (int, optional): Score required to win; sets the margin histogram's
+                                          range to +-2 * target. Defaults to 100.
+            max_length (int, optional): Last game length bin. Defaults to 1000.
+            max_rolls (int, optional): Last rolls-per-turn bin. Defaults to 100.
+            visits (bool, optional): Whether to count state visits. Defaults to True.
+
+        Returns:
+            GameStatistics: Statistics of zero games.
+        """
+        visit_shape = (2,) + (tuple(policy_shape) if visits else (0, 0, 0))
+        return cls(games=np.zeros(1, np.int64),
+                   wins=np.zeros(2, np.int64),
+                   length_counts=np.zeros(max_length + 1, np.int64),
+                   length_moments=np.zeros(2, np.int64),
+                   margin_counts=np.zeros(4 * target_score + 1, np.int64),
+                   margin_moments=np.zeros(2, np.int64),
+                   turns=np.zeros(2, np.int64),
+                   busts=np.zeros(2, np.int64),
+                   rolls=np.zeros(2, np.int64),
+                   rolls_squared=np.zeros(2, np.int64),
+                   roll_counts=np.zeros((2, max_rolls + 1), np.int64),
+                   visits=np.zeros(visit_shape, np.int64))
+
+    def arrays(self) -> Tuple[np.ndarray, ...]:
+        """
+        The accumulators in the order the simulation kernel takes them.
+        """
+        return tuple(getattr(self, name) for name in _FIELDS)
+
+    def merge(self, other: 'GameStatistics') -> 'GameStatistics':
+        """
+        Adds another batch's statistics into this one, in place.
+
+        Args:
+            other (GameStatistics): Statistics collected with the same settings.
+
+        Returns:
+            GameStatistics: self, for chaining.
+        """
+        for name in _FIELDS:
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if mine.shape != theirs.shape:
+                raise ValueError(f"Cannot merge statistics with different {name} shapes "
+                                 f"{mine.shape} and {theirs.shape}.")
+            mine += theirs
+        return self
+
+    def __add__(self, other: 'GameStatistics') -> 'GameStatistics':
+        """
+        Merged statistics as a new object, leaving both operands unchanged.
+        """
+        return self.copy().merge(other)
+
+    def copy(self) -> 'GameStatistics':
+        """
+        An independent copy of the accumulators.
+        """
+        return GameStatistics(**{name: getattr(self, name).copy() for name in _FIELDS})
+
+    @classmethod
+    def combine(cls, parts: Iterable['GameStatistics']) -> 'GameStatistics':
+        """
+        Merges the statistics of several workers or runs into a new object.
+        """
+        parts = iter(parts)
+        total = next(parts).copy()
+        for part in parts:
+            total.merge(part)
+        return total
+
+    @property
+    def n_games(self) -> int:
+        """
+        Number of games summarised.
+        """
+        return int(self.games[0])
+
+    @property
+    def margin_bound(self) -> int:
+        """
+        Margin held by the last bin of `margin_counts`; bin 0 holds -margin_bound.
+        """
+        return (self.margin_counts.size - 1) // 2
+
+    @property
+    def win_rate(self) -> float:
+        """
+        Proportion of games won by player 1, as returned by `Competition.__call__`.
+        """
+        return self.wins[0] / self.n_games
+
+    @staticmethod
+    def _mean_std(n: int, moments: np.ndarray) -> Tuple[float, float]:
+        """
+        Mean and standard deviation from a count and exact sums of x and x^2.
+        """
+        mean = moments[0] / n
+        # The sums are exact integers, so the difference suffers no cancellation until it is cast
+        variance = int(n * int(moments[1]) - int(moments[0]) ** 2) / n ** 2
+        return float(mean), float(np.sqrt(max(variance, 0.0)))
+
+    @property
+    def game_length(self) -> Tuple[float, float]:
+        """
+        Mean and standard deviation of the game length in turns.
+        """
+        return self._mean_std(self.n_games, self.length_moments)
+
+    @property
+    def margin(self) -> Tuple[float, float]:
+        """
+        Mean and standard deviation of player 1's final score margin.
+        """
+        return self._mean_std(self.n_games, self.margin_moments)
+
+    @property
+    def bust_rate(self) -> np.ndarray:
+        """
+        Proportion of each player's turns ended by rolling a 1.
+        """
+        return self.busts / np.maximum(self.turns, 1)
+
+    @property
+    def rolls_per_turn(self) -> np.ndarray:
+        """
+        Mean and standard deviation of rolls per turn, shape (2, 2) with a row per player.
+        """
+        return np.array([self._mean_std(int(self.turns[p]), np.array([self.rolls[p], self.rolls_squared[p]]))
+                         for p in range(2)])
+
+    def summary(self) -> Dict[str, float]:
+        """
+        The headline numbers as a flat dictionary.
+        """
+        length_mean, length_std = self.game_length
+        margin_mean, margin_std = self.margin
+        rolls = self.rolls_per_turn
+        return dict(games=self.n_games, win_rate=float(self.win_rate),
+                    length_mean=length_mean, length_std=length_std,
+                    margin_mean=margin_mean, margin_std=margin_std,
+                    bust_rate_1=float(self.bust_rate[0]), bust_rate_2=float(self.bust_rate[1]),
+                    rolls_per_turn_1=float(rolls[0, 0]), rolls_per_turn_2=float(rolls[1, 0]))
+
+    def save(self, path: str) -> None:
+        """
+        Writes the accumulators to an .npz file, so runs in separate processes can be merged.
+        """
+        np.savez(path, **{name: getattr(self, name) for name in _FIELDS})
+
+    @classmethod
+    def load(cls, path: str) -> 'GameStatistics':
+        """
+        Reads statistics written by `save`.
+        """
+        with np.load(path) as f:
+            return cls(**{name: f[name] for name in _FIELDS})
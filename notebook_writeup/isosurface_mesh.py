@@ -0,0 +1,224 @@
+'''
+Isosurface extraction in NumPy, for plotting large state spaces as lightweight meshes.
+
+`go.Isosurface` is handed every grid point and extracts the surface in the browser, which
+stops working well before target 500. Here the surface is extracted once per isovalue by
+marching tetrahedra: each grid cube is split into six tetrahedra sharing its main
+diagonal, and each tetrahedron crossed by the isovalue contributes one or two triangles
+with vertices interpolated along its edges. The split is the same in neighbouring cubes,
+so the mesh is watertight. Only cubes that cross the isovalue are visited, slab by slab,
+so memory grows with the surface rather than the volume.
+
+Meshes are cached as small .npz files. A solution memory-mapped from `SolutionCache` keeps
+its meshes in its own cache entry, counted toward the cache's size limit and evicted with it.
+'''
+
+import os
+import hashlib
+import itertools
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+try:
+    from .solution_cache import SolutionCache
+except ImportError:
+    from solution_cache import SolutionCache
+
+# Cube corners, indexed x + 2y + 4z
+_CORNERS = np.array([[x, y, z] for z in (0, 1) for y in (0, 1) for x in (0, 1)])
+
+# Kuhn split of the cube into six tetrahedra along the diagonal from corner 0 to corner 7
+_TETRAHEDRA = np.array([[0, a, a + b, 7] for a, b, _ in itertools.permutations((1, 2, 4))])
+
+
+def _tetrahedron_cases() -> List[List[Tuple[Tuple[int, int], ...]]]:
+    """
+    For each of the 16 inside/outside patterns of a tetrahedron's vertices, the triangles
+    to emit, each given by the three tetrahedron edges its vertices lie on.
+    """
+    cases = []
+    for code in range(16):
+        inside = [v for v in range(4) if code >> v & 1]
+        outside = [v for v in range(4) if not code >> v & 1]
+        if len(inside) in (1, 3):
+            lone, others = (inside[0], outside) if len(inside) == 1 else (outside[0], inside)
+            cases.append([tuple((lone, o) for o in others)])
+        elif len(inside) == 2:
+            (a, b), (c, d) = inside, outside
+            cases.append([((a, c), (a, d), (b, d)), ((a, c), (b, d), (b, c))])
+        else:
+            cases.append([])
+    return cases
+
+
+_CASES = _tetrahedron_cases()
+
+
+def marching_tetrahedra(array: np.ndarray,
+                        isovalue: float,
+                        step: int = 1,
+                        slab: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extracts the surface where `array` crosses `isovalue`.
+
+    Args:
+        array (np.ndarray): 3D array of values on an integer grid.
+        isovalue (float): Level of the surface. Points with values >= isovalue are inside.
+        step (int, optional): Sample every `step`-th grid point along each axis, reducing
+                              the number of triangles by about step^2. Defaults to 1.
+        slab (int, optional): Cube layers along the first axis processed at a time.
+                              Defaults to 32.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: float32 vertex coordinates (n, 3) in grid units of
+            the original array, and int32 triangle vertex indices (m, 3), oriented with
+            normals pointing towards increasing values.
+    """
+    grid = array[::step, ::step, ::step]
+    nx, ny, nz = grid.shape
+    keys, values, points, insides = [], [], [], []
+
+    for x0 in range(0, nx - 1, slab):
+        sub = np.asarray(grid[x0:min(x0 + slab, nx - 1) + 1], dtype=np.float64)
+        cubes = tuple(s - 1 for s in sub.shape)
+        corner_values = [sub[dx:dx + cubes[0], dy:dy + cubes[1], dz:dz + cubes[2]]
+                         for dx, dy, dz in _CORNERS]
+
+        crossing = (np.minimum.reduce(corner_values) < isovalue) & (np.maximum.reduce(corner_values) >= isovalue)
+        cx, cy, cz = np.nonzero(crossing)
+        if cx.size == 0:
+            continue
+
+        # Value, grid position and global grid id of the 8 corners of every crossing cube
+        cube_values = np.stack([c[crossing] for c in corner_values], axis=1)
+        cube_points = np.stack([cx + x0, cy, cz], axis=1)[:, None, :] + _CORNERS[None, :, :]
+        cube_ids = (cube_points[..., 0] * ny + cube_points[..., 1]) * nz + cube_points[..., 2]
+
+        for tetrahedron in _TETRAHEDRA:
+            tet_values = cube_values[:, tetrahedron]
+            inside = tet_values >= isovalue
+            code = (inside * (1 << np.arange(4))).sum(axis=1)
+
+            for case, triangles in enumerate(_CASES):
+                rows = np.nonzero(code == case)[0]
+                if rows.size == 0 or not triangles:
+                    continue
+                for triangle in triangles:
+                    a = np.array([tetrahedron[e[0]] for e in triangle])
+                    b = np.array([tetrahedron[e[1]] for e in triangle])
+                    ids_a, ids_b = cube_ids[rows][:, a], cube_ids[rows][:, b]
+                    keys.append(np.minimum(ids_a, ids_b) * (nx * ny * nz) + np.maximum(ids_a, ids_b))
+                    values.append(np.stack([cube_values[rows][:, a], cube_values[rows][:, b]], axis=-1))
+                    points.append(np.stack([cube_points[rows][:, a], cube_points[rows][:, b]], axis=-2))
+                    # Centroid of the inside corners minus that of the outside ones, for orientation
+                    n_inside = inside[rows].sum(axis=1, keepdims=True)
+                    weights = np.where(inside[rows], 1.0 / n_inside, -1.0 / (4 - n_inside))
+                    insides.append((weights[..., None] * cube_points[rows][:, tetrahedron]).sum(axis=1))
+
+    if not keys:
+        return np.zeros((0, 3), np.float32), np.zeros((0, 3), np.int32)
+
+    keys = np.concatenate(keys)
+    values = np.concatenate(values)
+    points = np.concatenate(points).astype(np.float64)
+    towards_inside = np.concatenate(insides)
+
+    # Interpolate the crossing along every edge used by a triangle vertex
+    fraction = (isovalue - values[..., 0]) / (values[..., 1] - values[..., 0])
+    positions = points[..., 0, :] + fraction[..., None] * (points[..., 1, :] - points[..., 0, :])
+
+    normals = np.cross(positions[:, 1] - positions[:, 0], positions[:, 2] - positions[:, 0])
+    flip = (normals * towards_inside).sum(axis=1) < 0
+    keys[flip] = keys[flip][:, ::-1]
+    positions[flip] = positions[flip][:, ::-1]
+
+    # Merge the vertices shared between triangles
+    unique_keys, first, faces = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    vertices = positions.reshape(-1, 3)[first] * step
+    return vertices.astype(np.float32), faces.reshape(-1, 3).astype(np.int32)
+
+
+def _cache_path(array: np.ndarray,
+                isovalue: float,
+                step: int,
+                cache_dir: Union[str, Path, None]) -> Optional[Path]:
+    """
+    Where the mesh of `array` at `isovalue` is cached, or None if it is not.
+
+    Memory-mapped arrays, such as solutions from `SolutionCache`, are identified by the full
+    path of their file and their place in it, and cached next to that file unless `cache_dir`
+    is given; other arrays are identified by a hash of their contents and are only cached
+    when `cache_dir` is given.
+    """
+    filename = getattr(array, 'filename', None)
+    if isinstance(array, np.memmap) and filename is not None:
+        # Byte offset of this view within the file, telling apart slices of one file. The
+        # memory map at the root of the views starts at the file offset it was opened at.
+        root = array
+        while isinstance(root.base, np.memmap):
+            root = root.base
+        offset = (root.offset + array.__array_interface__['data'][0]
+                  - root.__array_interface__['data'][0])
+        identity = f"{Path(filename).resolve()}:{offset}:{array.shape}:{array.strides}:{array.dtype}"
+        directory = Path(cache_dir) if cache_dir is not None else Path(filename).parent
+    elif cache_dir is not None:
+        identity = hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+        identity += f":{array.shape}:{array.dtype}"
+        directory = Path(cache_dir)
+    else:
+        return None
+
+    digest = hashlib.sha256(f"{identity}:{isovalue!r}:{step}".encode()).hexdigest()[:24]
+    return directory / f"mesh-{digest}.npz"
+
+
+def _save_mesh(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
+    """
+    Writes a mesh to exactly `path`, which `np.savez` would otherwise give an .npz suffix.
+    """
+    with open(path, 'wb') as f:
+        np.savez(f, vertices=vertices, faces=faces)
+
+
+def cached_isosurface(array: np.ndarray,
+                      isovalue: float,
+                      step: int = 1,
+                      cache_dir: Union[str, Path, None] = None,
+                      cache: Optional[SolutionCache] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `marching_tetrahedra`, loading the mesh from the cache when it has been extracted before.
+
+    Args:
+        array (np.ndarray): 3D array of values.
+        isovalue (float): Level of the surface.
+        step (int, optional): Downsampling stride. Defaults to 1.
+        cache_dir (Union[str, Path, None]): Directory for meshes of in-memory arrays. Meshes of
+            memory-mapped solutions are kept next to the solution unless this is given.
+        cache (Optional[SolutionCache]): The `SolutionCache` the solution came from, whose size
+            limit a mesh kept in its entry counts toward. If None, the cache is reopened from
+            the solution's directory with its recorded or default limit.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Vertices and triangles, as from `marching_tetrahedra`.
+    """
+    path = _cache_path(array, isovalue, step, cache_dir)
+    if path is not None and path.exists():
+        with np.load(path) as mesh:
+            return mesh['vertices'], mesh['faces']
+
+    vertices, faces = marching_tetrahedra(array, isovalue, step)
+    if path is not None:
+        try:
+            if cache is None or path.parent.parent.resolve() != cache.root.resolve():
+                cache = SolutionCache.containing(path)
+            if cache is not None and (path.parent / 'meta.json').exists():
+                cache.add_to_entry(path, lambda staging: _save_mesh(staging, vertices, faces))
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                staging = path.with_name(f".{path.stem}-{os.getpid()}.npz")
+                _save_mesh(staging, vertices, faces)
+                staging.replace(path)
+        except OSError:
+            pass  # A read-only solution directory just means no caching
+    return vertices, faces
@@ -0,0 +1,32 @@
+'''
+Sharing numba's on-disk kernel cache between the two ways this folder is imported.
+
+The tests import these modules as a package (`notebook_writeup.optimised_layered_vi`)
+while scripts and notebooks import them as flat modules (`optimised_layered_vi`). numba
+keys its cache by source file, but each cached kernel records the name of the module it
+was compiled in and imports that module again when it is loaded, so a kernel cached under
+one name fails to load under the other. Registering every kernel module under both names
+in `sys.modules` lets either import load the other's cached kernels.
+'''
+
+import os
+import sys
+
+
+def share_kernel_cache(name: str) -> None:
+    """
+    Makes the module imported as `name` importable under its other name too.
+
+    Call as `share_kernel_cache(__name__)` from a module with `cache=True` kernels. If the
+    other name was already imported separately, it is left alone.
+
+    Args:
+        name (str): The module's `__name__`, either 'notebook_writeup.<module>' or '<module>'.
+    """
+    module = sys.modules[name]
+    if '.' in name:
+        other = name.rpartition('.')[2]
+    else:
+        package = os.path.basename(os.path.dirname(os.path.abspath(module.__file__)))
+        other = f'{package}.{name}'
+    sys.modules.setdefault(other, module)
@@ -1,19 +1,50 @@
 '''
 This script contains our code for mapping all of the reachable states in the space.
 
-We take the approach of direct simulation: two optimal policies play against each other,
+We originally took the approach of direct simulation: two optimal policies play against each other,
 but player 2 is forced to hold at random points in order to fill in gaps in the reachable state space.
+
+The exact alternative propagates probability mass forward through the layers instead, giving the
+expected number of visits and the probability of ever visiting each state under a pair of policies.
+Policies may hold roll probabilities in [0, 1] rather than 0/1 actions, which is how the random
+holds of the simulation are expressed exactly. The reachable set is the nonzero support.
 '''
 
 import random
 import sys
 import pickle
 import numpy as np
-from typing import Any
+from numba import njit
+from typing import Any, NamedTuple
 
 # This makes imports around a directory a bit easier usually
 sys.path.append('..')
 
+try:
+    from .policy_evaluation import _action
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from policy_evaluation import _action
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+class StateVisits(NamedTuple):
+    """
+    Result of `exact_state_visits`. Player 2's arrays are indexed by their own score first.
+
+    Attributes:
+        visit1 (np.ndarray): Probability that player 1 is ever to move in state (i, j, k).
+        visit2 (np.ndarray): Probability that player 2 is ever to move in state (i, j, k).
+        occupancy1 (np.ndarray): Expected number of times player 1 is to move in state (i, j, k).
+        occupancy2 (np.ndarray): Expected number of times player 2 is to move in state (i, j, k).
+    """
+    visit1: np.ndarray
+    visit2: np.ndarray
+    occupancy1: np.ndarray
+    occupancy2: np.ndarray
+
 
 def roll_die() -> int:
     """
@@ -100,26 +131,203 @@ def modelling_state_space(policy: np.ndarray,
     return reachable
 
 
-# Brute-force mapping of reachable states
+@njit(cache=True)
+def _turn_profile(pol: np.ndarray,
+                  ps: int,
+                  os: int,
+                  target_score: int,
+                  die_sides: int,
+                  alpha: np.ndarray,
+                  beta: np.ndarray) -> None:
+    """
+    Computes hitting and passing probabilities for a single turn starting from (ps, os, 0).
+
+    Args:
+        pol (np.ndarray): Roll probability of the player to move in each state.
+        ps (int): Score of the player to move.
+        os (int): Score of the opponent.
+        target_score (int): Score required to win.
+        die_sides (int): Number of faces on the die.
+        alpha (np.ndarray): Filled with the probability of reaching each turn total this turn.
+        beta (np.ndarray): Filled with the probability that, from each turn total, the turn
+                           ends with nothing banked (a bust, or holding at zero).
+    """
+    roll_prob = 1.0 / die_sides
+    n_t = alpha.shape[0]
+
+    alpha[:] = 0.0
+    alpha[0] = 1.0
+    for t in range(n_t):
+        if alpha[t] == 0.0 or ps + t >= target_score:
+            continue
+        step = alpha[t] * _action(pol, ps, os, t) * roll_prob
+        for r in range(2, die_sides + 1):
+            alpha[t + r] += step
+
+    for t in range(n_t - 1, -1, -1):
+        if ps + t >= target_score:
+            beta[t] = 0.0
+            continue
+        roll = _action(pol, ps, os, t)
+        b = roll * roll_prob
+        for r in range(2, die_sides + 1):
+            b += roll * roll_prob * beta[t + r]
+        if t == 0:
+            b += 1.0 - roll
+        beta[t] = b
+
+
+@njit(cache=True)
+def _spread_turn(pol: np.ndarray,
+                 ps: int,
+                 os: int,
+                 entries: float,
+                 alpha: np.ndarray,
+                 beta: np.ndarray,
+                 opp_pass: float,
+                 opp_inflow: np.ndarray,
+                 occupancy: np.ndarray,
+                 visit: np.ndarray,
+                 target_score: int) -> None:
+    """
+    Distributes the expected entries into (ps, os, 0) over the turn totals of that turn.
+
+    A state can be revisited when both players bust in succession, so the visit probability
+    is the occupancy scaled by one minus the probability of returning to the state.
+
+    Args:
+        pol (np.ndarray): Roll probability of the player to move.
+        ps (int): Score of the player to move.
+        os (int): Score of the opponent.
+        entries (float): Expected number of times the player is to move in (ps, os, 0).
+        alpha (np.ndarray): Hitting probabilities from `_turn_profile`.
+        beta (np.ndarray): Passing probabilities from `_turn_profile`.
+        opp_pass (float): Probability the opponent's turn from (os, ps, 0) banks nothing.
+        opp_inflow (np.ndarray): Opponent's expected entries into each (score, score) pair, updated.
+        occupancy (np.ndarray): Occupancy array of the player to move, updated.
+        visit (np.ndarray): Visit probability array of the player to move, updated.
+        target_score (int): Score required to win.
+    """
+    k_max = occupancy.shape[2] - 1
+    for t in range(alpha.shape[0]):
+        if alpha[t] == 0.0:
+            continue
+        occ = entries * alpha[t]
+        k = min(t, k_max)
+        occupancy[ps, os, k] += occ
+
+        if ps + t >= target_score:
+            visit[ps, os, k] += occ  # The game ends here, so it is never revisited
+            continue
+
+        returns = beta[t] * opp_pass * alpha[t] / (1.0 - (beta[0] - alpha[t] * beta[t]) * opp_pass)
+        visit[ps, os, k] += occ * (1.0 - returns)
+        if t > 0:
+            opp_inflow[os, ps + t] += occ * (1.0 - _action(pol, ps, os, t))
+
+
+@njit(cache=True)
+def _forward_occupancy(policy1: np.ndarray,
+                       policy2: np.ndarray,
+                       target_score: int,
+                       die_sides: int,
+                       occupancy1: np.ndarray,
+                       occupancy2: np.ndarray,
+                       visit1: np.ndarray,
+                       visit2: np.ndarray) -> None:
+    """
+    Propagates probability mass forward over `score_sum` layers, from (0, 0, 0) upwards.
+
+    Within a layer, the only coupling is between player 1 at (ps, os, 0) and player 2 at
+    (os, ps, 0) through busts, which is a 2x2 linear system solved in closed form.
+    """
+    inflow1 = np.zeros((target_score, target_score))
+    inflow2 = np.zeros((target_score, target_score))
+    inflow1[0, 0] = 1.0  # Player 1 moves first
+
+    n_t = target_score + die_sides
+    alpha1 = np.zeros(n_t)
+    beta1 = np.zeros(n_t)
+    alpha2 = np.zeros(n_t)
+    beta2 = np.zeros(n_t)
+
+    for score_sum in range(2 * target_score - 1):
+        p_min = max(0, score_sum - target_score + 1)
+        p_max = min(target_score - 1, score_sum)
+
+        for ps in range(p_min, p_max + 1):
+            os = score_sum - ps
+            e1 = inflow1[ps, os]
+            e2 = inflow2[os, ps]
+            if e1 == 0.0 and e2 == 0.0:
+                continue
+
+            _turn_profile(policy1, ps, os, target_score, die_sides, alpha1, beta1)
+            _turn_profile(policy2, os, ps, target_score, die_sides, alpha2, beta2)
+            b1 = beta1[0]
+            b2 = beta2[0]
+            if b1 * b2 >= 1.0:
+                raise ValueError("Both policies pass forever, so the game never ends.")
+
+            n1 = (e1 + b2 * e2) / (1.0 - b1 * b2)
+            n2 = (e2 + b1 * e1) / (1.0 - b1 * b2)
+            _spread_turn(policy1, ps, os, n1, alpha1, beta1, b2, inflow2, occupancy1, visit1, target_score)
+            _spread_turn(policy2, os, ps, n2, alpha2, beta2, b1, inflow1, occupancy2, visit2, target_score)
+
+
+def exact_state_visits(policy1: np.ndarray,
+                       policy2: np.ndarray,
+                       target_score: int = 100,
+                       die_sides: int = 6,
+                       max_turn: int = 100) -> StateVisits:
+    """
+    Computes the exact visit probabilities and occupancies of every state under a pair of policies.
+
+    Turn totals beyond `max_turn` (which only occur once the game is won) are pooled into the
+    last slice, as the simulation does.
+
+    Args:
+        policy1 (np.ndarray): Player 1's policy, holding 0/1 actions or roll probabilities.
+        policy2 (np.ndarray): Player 2's policy, in the same format.
+        target_score (int, optional): Score needed to win. Defaults to 100.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 100.
+
+    Returns:
+        StateVisits: Visit probabilities and occupancies for both players.
+    """
+    shape = (target_score + 1, target_score + 1, max_turn + 1)
+    occupancy1, occupancy2 = np.zeros(shape), np.zeros(shape)
+    visit1, visit2 = np.zeros(shape), np.zeros(shape)
+    _forward_occupancy(np.ascontiguousarray(policy1, dtype=np.float64),
+                       np.ascontiguousarray(policy2, dtype=np.float64),
+                       target_score, die_sides, occupancy1, occupancy2, visit1, visit2)
+    return StateVisits(visit1, visit2, occupancy1, occupancy2)
+
+
+# Mapping of reachable states
 if __name__ == "__main__":
-    # Generate the optimal policy 
-    from optimised_layered_vi import pig_layered_value_iteration
+    # Generate the optimal policy, or load it from the solution cache
+    from solution_cache import cached_pig_layered_value_iteration
 
     die_size = 6
     target_score = 100
     max_turn = 100
 
-    _, policy = pig_layered_value_iteration(target_score=target_score,
-                                            die_sides=die_size,
-                                            max_turn=max_turn,
-                                            epsilon=1e-6)
+    _, policy = cached_pig_layered_value_iteration(target_score=target_score,
+                                                   die_sides=die_size,
+                                                   max_turn=max_turn,
+                                                   epsilon=1e-6)
 
-    # Initialise 3D array to track which (i, j, k) states are reached by player 1
-    reachable_states = np.zeros((101, 101, 101))
+    # Highest probability with which player 1 ever visits each (i, j, k), over the same opponents
+    # that the simulation used: player 2 rolls with probability `prob` wherever the optimal policy rolls
+    visit_probability = np.zeros((target_score + 1, target_score + 1, max_turn + 1))
 
     for prob in [0, 0.01, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]:
-        reachable_states = modelling_state_space(policy, reachable_states, iterations=10**6, hold_prob=prob)
-        print(f'finished looping for p = {prob}', flush=True)
+        visits = exact_state_visits(policy, prob * policy, target_score, die_size, max_turn)
+        visit_probability = np.maximum(visit_probability, visits.visit1)
+        print(f'finished propagating for p = {prob}', flush=True)
 
-    with open('notebook_writeup/pickle_and_config_files/reachable_states.pkl', 'wb') as f:
-        pickle.dump(reachable_states, f)
+    # The reachable set is visit_probability > 0
+    np.save('notebook_writeup/pickle_and_config_files/reachable_states.npy',
+            visit_probability.astype(np.float32))
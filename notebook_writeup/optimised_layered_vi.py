@@ -5,37 +5,20 @@ python overhead for the loop computations.
 '''
 
 import numpy as np
-from numba import njit
+from numba import njit, prange
 from typing import Tuple
 
+try:
+    from .kernel_cache import share_kernel_cache
+    from .solver_state import SOLVER_VERSION, _init_V_policy
+except ImportError:
+    from kernel_cache import share_kernel_cache
+    from solver_state import SOLVER_VERSION, _init_V_policy
 
-@njit
-def _init_V_policy(target_score: int, max_turn: int) -> Tuple[np.ndarray, np.ndarray]:
-    """
-    Initialises the value and policy arrays for all reachable states.
-
-    Args:
-        target_score (int): The score required to win the game.
-        max_turn (int): Maximum number of unbanked points to track (limits state space).
-
-    Returns:
-        Tuple[np.ndarray, np.ndarray]: Zero-initialised value array and default policy (all roll).
-    """
-    V = np.zeros((target_score + 1, target_score + 1, max_turn + 1))
-    policy = np.ones((target_score + 1, target_score + 1, max_turn + 1), np.int64)
-
-    for ps in range(target_score + 1):
-        for os in range(target_score + 1):
-            for t in range(max_turn + 1):
-                if ps + t >= target_score:
-                    V[ps, os, t] = 1.0
-                    policy[ps, os, t] = 0
-                elif os >= target_score:
-                    V[ps, os, t] = 0.0
-    return V, policy
+share_kernel_cache(__name__)
 
 
-@njit
+@njit(cache=True)
 def _layered_vi(V: np.ndarray,
                 policy: np.ndarray,
                 target_score: int,
@@ -120,10 +103,511 @@ def _layered_vi(V: np.ndarray,
     return V, policy
 
 
+@njit(cache=True)
+def _sweep_row(V: np.ndarray,
+               policy: np.ndarray,
+               ps: int,
+               os: int,
+               target_score: int,
+               die_sides: int,
+               max_turn: int) -> float:
+    """
+    Performs one Gauss-Seidel sweep over the turn totals of a single (ps, os) row.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (updated in place).
+        ps (int): Player score.
+        os (int): Opponent score.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+
+    Returns:
+        float: Largest change made to any value in the row.
+    """
+    roll_prob = 1.0 / die_sides
+    max_diff = 0.0
+
+    for t in range(min(max_turn, target_score - ps - 1) + 1):
+        # Compute expected value of rolling
+        roll_value = roll_prob * (1.0 - V[os, ps, 0])
+        for r in range(2, die_sides + 1):
+            new_t = t + r
+            if ps + new_t >= target_score:
+                roll_value += roll_prob * 1.0
+            elif new_t <= max_turn:
+                roll_value += roll_prob * V[ps, os, new_t]
+
+        # Compute value of holding
+        if t > 0:
+            hold_value = 1.0 - V[os, ps + t, 0]
+        else:
+            hold_value = 0.0
+
+        # Select better action
+        if roll_value >= hold_value:
+            new_v = roll_value
+            policy_val = 1
+        else:
+            new_v = hold_value
+            policy_val = 0
+
+        diff = abs(V[ps, os, t] - new_v)
+        if diff > max_diff:
+            max_diff = diff
+
+        V[ps, os, t] = new_v
+        policy[ps, os, t] = policy_val
+
+    return max_diff
+
+
+@njit(cache=True)
+def _sweep_row_window(V: np.ndarray,
+                      policy: np.ndarray,
+                      ps: int,
+                      os: int,
+                      target_score: int,
+                      die_sides: int,
+                      max_turn: int) -> float:
+    """
+    `_sweep_row` with the roll expectation updated incrementally along t.
+
+    The non-bust faces of a roll from t either win outright or land on
+    V[ps, os, t + 2 .. min(t + die_sides, width - 1)]. The sum over that window is
+    slid along the row, dropping V[ps, os, t + 2] and adding V[ps, os, t + die_sides + 1],
+    both not yet updated in this sweep as in `_sweep_row`. Each state then costs the same
+    whatever the size of the die, and the sums differ from `_sweep_row`'s only by rounding.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (updated in place).
+        ps (int): Player score.
+        os (int): Opponent score.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+
+    Returns:
+        float: Largest change made to any value in the row.
+    """
+    roll_prob = 1.0 / die_sides
+    max_diff = 0.0
+    last = min(max_turn, target_score - ps - 1)
+
+    # Sum of V[ps, os, 2 .. min(die_sides, last)], the landing spots from t = 0
+    window = 0.0
+    for u in range(2, min(die_sides, last) + 1):
+        window += V[ps, os, u]
+
+    for t in range(last + 1):
+        # Faces r in 2..die_sides with ps + t + r >= target win outright
+        wins = die_sides - max(2, target_score - ps - t) + 1
+        roll_value = roll_prob * (1.0 - V[os, ps, 0]) + roll_prob * (max(wins, 0) + window)
+
+        # Compute value of holding
+        if t > 0:
+            hold_value = 1.0 - V[os, ps + t, 0]
+        else:
+            hold_value = 0.0
+
+        # Select better action
+        if roll_value >= hold_value:
+            new_v = roll_value
+            policy_val = 1
+        else:
+            new_v = hold_value
+            policy_val = 0
+
+        diff = abs(V[ps, os, t] - new_v)
+        if diff > max_diff:
+            max_diff = diff
+
+        V[ps, os, t] = new_v
+        policy[ps, os, t] = policy_val
+
+        # Slide the window to t + 1, resetting it once empty so that no rounding is carried
+        if t + 3 > last:
+            window = 0.0
+        else:
+            window -= V[ps, os, t + 2]
+            if t + die_sides + 1 <= last:
+                window += V[ps, os, t + die_sides + 1]
+
+    return max_diff
+
+
+@njit(cache=True)
+def _layered_vi_parallel(V: np.ndarray,
+                         policy: np.ndarray,
+                         target_score: int,
+                         die_sides: int,
+                         max_turn: int,
+                         epsilon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Layered value iteration with each layer spread across cores.
+
+    Within a layer, row (ps, os) only reads another row of the same layer through the
+    opponent's `V[os, ps, 0]`. Rows are therefore grouped into mirrored pairs, each pair
+    handled by one thread with the lower ps first, which reproduces the update order of
+    `_layered_vi` exactly while pairs run concurrently.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (0 = hold, 1 = roll).
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Convergence threshold for iteration.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The converged value and policy arrays.
+    """
+    pair_diff = np.zeros(max(target_score, 1))
+    for score_sum in range(2 * target_score - 2, -1, -1):
+        _parallel_layer(V, policy, pair_diff, score_sum, target_score, die_sides, max_turn, epsilon)
+    return V, policy
+
+
+@njit(cache=True)
+def _solve_row(row_V: np.ndarray,
+               row_policy: np.ndarray,
+               slope: np.ndarray,
+               hold_plane: np.ndarray,
+               ps: int,
+               os: int,
+               opp_value: float,
+               target_score: int,
+               die_sides: int,
+               max_turn: int) -> Tuple[float, float]:
+    """
+    Solves a (ps, os) row exactly in one pass, given the opponent's value `V[os, ps, 0]`.
+
+    With the bust value fixed, each turn total only depends on larger turn totals and on
+    higher layers, so a single descending pass is exact. Alongside the values, the pass
+    tracks their derivative with respect to the opponent's value.
+
+    Args:
+        row_V (np.ndarray): Values V[ps, os, :] (updated in place).
+        row_policy (np.ndarray): Policy policy[ps, os, :] (updated in place).
+        slope (np.ndarray): Scratch array receiving dV[ps, os, t] / d opp_value.
+        hold_plane (np.ndarray): The t = 0 values V[:, :, 0], read for holding.
+        ps (int): Player score.
+        os (int): Opponent score.
+        opp_value (float): Value taken for V[os, ps, 0].
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+
+    Returns:
+        Tuple[float, float]: V[ps, os, 0] and its derivative with respect to `opp_value`.
+    """
+    roll_prob = 1.0 / die_sides
+
+    for t in range(min(max_turn, target_score - ps - 1), -1, -1):
+        # Compute expected value of rolling, and its slope
+        roll_value = roll_prob * (1.0 - opp_value)
+        roll_slope = -roll_prob
+        for r in range(2, die_sides + 1):
+            new_t = t + r
+            if ps + new_t >= target_score:
+                roll_value += roll_prob * 1.0
+            elif new_t <= max_turn:
+                roll_value += roll_prob * row_V[new_t]
+                roll_slope += roll_prob * slope[new_t]
+
+        # Compute value of holding
+        if t > 0:
+            hold_value = 1.0 - hold_plane[os, ps + t]
+        else:
+            hold_value = 0.0
+
+        # Select better action
+        if roll_value >= hold_value:
+            row_V[t] = roll_value
+            row_policy[t] = 1
+            slope[t] = roll_slope
+        else:
+            row_V[t] = hold_value
+            row_policy[t] = 0
+            slope[t] = 0.0
+
+    return row_V[0], slope[0]
+
+
+@njit(cache=True)
+def _solve_pair(low_V: np.ndarray,
+                low_policy: np.ndarray,
+                high_V: np.ndarray,
+                high_policy: np.ndarray,
+                slope: np.ndarray,
+                hold_plane: np.ndarray,
+                low: int,
+                high: int,
+                x: float,
+                target_score: int,
+                die_sides: int,
+                max_turn: int) -> Tuple[float, float]:
+    """
+    Maps a guess x for V[low, high, 0] to the value implied by solving both mirrored rows.
+
+    Returns:
+        Tuple[float, float]: The implied V[low, high, 0] and its derivative with respect to x.
+    """
+    if low == high:
+        return _solve_row(low_V, low_policy, slope, hold_plane, low, high, x,
+                          target_score, die_sides, max_turn)
+    y, dy = _solve_row(high_V, high_policy, slope, hold_plane, high, low, x,
+                       target_score, die_sides, max_turn)
+    g, dg = _solve_row(low_V, low_policy, slope, hold_plane, low, high, y,
+                       target_score, die_sides, max_turn)
+    return g, dg * dy
+
+
+@njit(cache=True)
+def _solve_pair_fixed_point(low_V: np.ndarray,
+                            low_policy: np.ndarray,
+                            high_V: np.ndarray,
+                            high_policy: np.ndarray,
+                            slope: np.ndarray,
+                            hold_plane: np.ndarray,
+                            low: int,
+                            high: int,
+                            target_score: int,
+                            die_sides: int,
+                            max_turn: int) -> Tuple[int, float]:
+    """
+    Solves a mirrored pair of rows to machine precision, leaving both rows filled in.
+
+    The map from x = V[low, high, 0] to the value it implies is increasing with slope below
+    one, so its fixed point is found by Newton's method safeguarded by bisection.
+
+    Returns:
+        Tuple[int, float]: Number of times the pair was solved, and the last residual |g - x|.
+    """
+    lo, hi = 0.0, 1.0
+    x = low_V[0]
+    h = 0.0
+    evaluations = 1
+    for _ in range(200):
+        g, dg = _solve_pair(low_V, low_policy, high_V, high_policy, slope, hold_plane,
+                            low, high, x, target_score, die_sides, max_turn)
+        evaluations += 1
+        h = g - x
+        if h > 0.0:
+            lo = x
+        elif h < 0.0:
+            hi = x
+        else:
+            break
+
+        x_new = x - h / (dg - 1.0)
+        if not (lo < x_new < hi):
+            x_new = 0.5 * (lo + hi)
+        if x_new == x:
+            break
+        x = x_new
+
+    # Leave both rows filled in from the converged value
+    _solve_pair(low_V, low_policy, high_V, high_policy, slope, hold_plane,
+                low, high, x, target_score, die_sides, max_turn)
+    return evaluations, abs(h)
+
+
+@njit(cache=True)
+def _layered_vi_direct(V: np.ndarray,
+                       policy: np.ndarray,
+                       target_score: int,
+                       die_sides: int,
+                       max_turn: int,
+                       epsilon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Layered value iteration that solves each layer's fixed point directly, without sweeps.
+
+    Every row (ps, os) of a layer is coupled to the rest of the layer only through the
+    opponent's `V[os, ps, 0]`, so each mirrored pair of rows has a single unknown
+    x = V[ps, os, 0], solved to machine precision by `_solve_pair_fixed_point`.
+    `epsilon` is unused and kept for a common solver signature.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (0 = hold, 1 = roll).
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Unused.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The solved value and policy arrays.
+    """
+    slope = np.zeros(max_turn + 1)
+    for score_sum in range(2 * target_score - 2, -1, -1):
+        _direct_layer(V, policy, slope, score_sum, target_score, die_sides, max_turn)
+    return V, policy
+
+
+@njit(cache=True)
+def _row_width(ps: int, target_score: int, max_turn: int) -> int:
+    """
+    Number of non-terminal turn totals in a row with player score `ps`.
+    """
+    return min(max_turn, target_score - ps - 1) + 1
+
+
+@njit(cache=True)
+def _sweep_layer(V: np.ndarray,
+                 policy: np.ndarray,
+                 score_sum: int,
+                 target_score: int,
+                 die_sides: int,
+                 max_turn: int,
+                 epsilon: float,
+                 window: bool = False) -> Tuple[int, float, int]:
+    """
+    Sweeps a single layer to convergence, in the same order as `_layered_vi`, with
+    `_sweep_row_window` instead of `_sweep_row` when `window` is True.
+
+    Returns:
+        Tuple[int, float, int]: Sweeps taken, final max_diff and number of state updates.
+    """
+    p_min = max(0, score_sum - target_score + 1)
+    p_max = min(target_score - 1, score_sum)
+    layer_states = 0
+    for ps in range(p_min, p_max + 1):
+        layer_states += _row_width(ps, target_score, max_turn)
+
+    sweeps = 0
+    while True:
+        max_diff = 0.0
+        for ps in range(p_min, p_max + 1):
+            if window:
+                diff = _sweep_row_window(V, policy, ps, score_sum - ps, target_score, die_sides, max_turn)
+            else:
+                diff = _sweep_row(V, policy, ps, score_sum - ps, target_score, die_sides, max_turn)
+            if diff > max_diff:
+                max_diff = diff
+        sweeps += 1
+        if max_diff < epsilon:
+            return sweeps, max_diff, sweeps * layer_states
+
+
+@njit(cache=True)
+def _layered_vi_window(V: np.ndarray,
+                       policy: np.ndarray,
+                       target_score: int,
+                       die_sides: int,
+                       max_turn: int,
+                       epsilon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `_layered_vi` with window-sum roll expectations, so the cost per state update does
+    not grow with the number of die sides.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (0 = hold, 1 = roll).
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Convergence threshold for iteration.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The converged value and policy arrays.
+    """
+    for score_sum in range(2 * target_score - 2, -1, -1):
+        _sweep_layer(V, policy, score_sum, target_score, die_sides, max_turn, epsilon, True)
+    return V, policy
+
+
+@njit(parallel=True, cache=True)
+def _parallel_layer(V: np.ndarray,
+                    policy: np.ndarray,
+                    pair_diff: np.ndarray,
+                    score_sum: int,
+                    target_score: int,
+                    die_sides: int,
+                    max_turn: int,
+                    epsilon: float) -> Tuple[int, float, int]:
+    """
+    Sweeps a single layer to convergence with mirrored pairs spread across cores;
+    the layer step of `_layered_vi_parallel`.
+
+    Returns:
+        Tuple[int, float, int]: Sweeps taken, final max_diff and number of state updates.
+    """
+    p_min = max(0, score_sum - target_score + 1)
+    p_max = min(target_score - 1, score_sum)
+    n_pairs = (p_max - p_min) // 2 + 1
+    layer_states = 0
+    for ps in range(p_min, p_max + 1):
+        layer_states += _row_width(ps, target_score, max_turn)
+
+    sweeps = 0
+    while True:
+        for pair in prange(n_pairs):
+            low = p_min + pair
+            high = score_sum - low
+            diff = _sweep_row(V, policy, low, high, target_score, die_sides, max_turn)
+            if high != low:
+                diff = max(diff, _sweep_row(V, policy, high, low, target_score, die_sides, max_turn))
+            pair_diff[pair] = diff
+
+        sweeps += 1
+        max_diff = pair_diff[:n_pairs].max()
+        if max_diff < epsilon:
+            return sweeps, max_diff, sweeps * layer_states
+
+
+@njit(cache=True)
+def _direct_layer(V: np.ndarray,
+                  policy: np.ndarray,
+                  slope: np.ndarray,
+                  score_sum: int,
+                  target_score: int,
+                  die_sides: int,
+                  max_turn: int) -> Tuple[int, float, int]:
+    """
+    Solves a single layer directly; the layer step of `_layered_vi_direct`.
+
+    Returns:
+        Tuple[int, float, int]: Most row-pair solves needed by any pair, the largest final
+            fixed-point residual, and the number of state updates.
+    """
+    hold_plane = V[:, :, 0]
+    p_min = max(0, score_sum - target_score + 1)
+    p_max = min(target_score - 1, score_sum)
+
+    sweeps = 0
+    max_diff = 0.0
+    states = 0
+    for low in range(p_min, (p_min + p_max) // 2 + 1):
+        high = score_sum - low
+        evaluations, residual = _solve_pair_fixed_point(V[low, high], policy[low, high],
+                                                        V[high, low], policy[high, low],
+                                                        slope, hold_plane, low, high,
+                                                        target_score, die_sides, max_turn)
+        pair_states = _row_width(low, target_score, max_turn)
+        if high != low:
+            pair_states += _row_width(high, target_score, max_turn)
+        states += evaluations * pair_states
+        sweeps = max(sweeps, evaluations)
+        max_diff = max(max_diff, residual)
+    return sweeps, max_diff, states
+
+
+_SOLVERS = {
+    'sweep': _layered_vi,
+    'parallel': _layered_vi_parallel,
+    'direct': _layered_vi_direct,
+    'window': _layered_vi_window,
+}
+
+
 def pig_layered_value_iteration(target_score: int = 15,
                                 die_sides: int = 6,
                                 max_turn: int = 15,
-                                epsilon: float = 1e-6) -> Tuple[np.ndarray, np.ndarray]:
+                                epsilon: float = 1e-6,
+                                method: str = 'sweep') -> Tuple[np.ndarray, np.ndarray]:
     """
     Wrapper to perform layered value iteration from scratch.
 
@@ -132,10 +616,18 @@ def pig_layered_value_iteration(target_score: int = 15,
         die_sides (int, optional): Number of sides on the die. Defaults to 6.
         max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
         epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        method (str, optional): 'sweep' for serial Gauss-Seidel sweeps, 'parallel' to spread
+                                each layer across cores, or 'direct' to solve each layer's
+                                fixed point to machine precision without sweeps (ignoring
+                                `epsilon`), or 'window' for serial sweeps whose cost per
+                                state does not grow with `die_sides`. Defaults to 'sweep'.
 
     Returns:
         Tuple[np.ndarray, np.ndarray]: Final value and policy arrays.
     """
+    if method not in _SOLVERS:
+        raise ValueError(f"Unknown method '{method}', expected one of {sorted(_SOLVERS)}.")
+
     V, policy = _init_V_policy(target_score, max_turn)
-    V, policy = _layered_vi(V, policy, target_score, die_sides, max_turn, epsilon)
+    V, policy = _SOLVERS[method](V, policy, target_score, die_sides, max_turn, epsilon)
     return V, policy
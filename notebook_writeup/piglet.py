@@ -3,17 +3,60 @@ Billie's code for the simplified game of Piglet.
 
 This class solves a simplified variant of the dice game Pig using value iteration.
 At each state, the agent chooses whether to "flip" (roll) or "hold" (bank points).
+
+The values and decisions are held in NumPy arrays and each sweep is compiled with numba,
+visiting states in the same order as the original triple loop. Convergence history is
+kept in a buffer bounded in both snapshots and bytes, thinned out as it fills, or streamed
+to disk, so that its memory grows neither with the number of sweeps nor beyond the budget
+as the goal grows.
 '''
 
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import copy
 import sys
-from typing import List
+import numpy as np
+from numba import njit
+from typing import List, Optional
 
 # Enable relative imports when running from different entry points
 sys.path.append('..')
 
+try:
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+@njit(cache=True)
+def _piglet_sweep(p: np.ndarray, flip: np.ndarray, goal: int) -> float:
+    """
+    Performs one in-place Gauss-Seidel sweep over all states.
+
+    Args:
+        p (np.ndarray): Win probabilities, shape (goal, goal, goal) (updated in place).
+        flip (np.ndarray): Decisions, True = flip (updated in place).
+        goal (int): Score required to win the game.
+
+    Returns:
+        float: Largest change made to any win probability.
+    """
+    max_change = 0.0
+    for i in range(goal):
+        for j in range(goal):
+            for k in range(goal - i):
+                old_prob = p[i, j, k]
+
+                # The opponent moves from (j, i, 0); their score is below the goal
+                p_flip_next = 1.0 if i + k + 1 >= goal else p[i, j, k + 1]
+                p_flip = (1.0 - p[j, i, 0] + p_flip_next) / 2
+                p_hold = 1.0 - p[j, i + k, 0] if i + k < goal else 1.0
+
+                p[i, j, k] = max(p_flip, p_hold)
+                flip[i, j, k] = p_flip > p_hold
+                change = abs(p[i, j, k] - old_prob)
+                max_change = max(max_change, change)
+    return max_change
+
 
 class PigletSolver:
     """
@@ -21,39 +64,102 @@ class PigletSolver:
     Tracks convergence history and allows policy extraction for testing.
     """
 
-    def __init__(self, goal: int, epsilon: float) -> None:
+    def __init__(self,
+                 goal: int,
+                 epsilon: float,
+                 log_every: int = 1,
+                 max_logs: int = 256,
+                 max_log_bytes: int = 64 * 2 ** 20,
+                 log_file: Optional[str] = None) -> None:
         """
         Initialises the solver with a win condition and convergence tolerance.
 
         Args:
             goal (int): Score required to win the game.
             epsilon (float): Threshold for value iteration convergence.
+            log_every (int): Snapshot `p` every this many sweeps; 0 disables snapshots.
+            max_logs (int): Most snapshots held in memory. When the buffer is full, every
+                            other snapshot is dropped and the logging interval doubles.
+            max_log_bytes (int): Memory budget of the snapshot buffer, which holds at most
+                                 this many bytes of snapshots. If fewer than two snapshots
+                                 fit, none are kept in memory; only `max_changes` is recorded.
+            log_file (Optional[str]): If given, snapshots are appended to this raw float64 file
+                                      instead of being held in memory. See `load_log`.
         """
+        if log_file is None and log_every > 0 and max_logs < 2:
+            raise ValueError("max_logs must be at least 2 to hold a thinned history.")
+
         self.goal: int = goal
         self.epsilon: float = epsilon
-        self.p: List[List[List[float]]] = [[[0.0 for _ in range(goal)] for _ in range(goal)] for _ in range(goal)]
-        self.flip: List[List[List[bool]]] = [[[False for _ in range(goal)] for _ in range(goal)] for _ in range(goal)]
-        self.iteration_logs: List[List[List[List[float]]]] = []  # list of snapshots of `p` across iterations
+        self.p: np.ndarray = np.zeros((goal, goal, goal))
+        self.flip: np.ndarray = np.zeros((goal, goal, goal), np.bool_)
+
+        self.log_every: int = log_every
+        self.log_file: Optional[str] = log_file
+        self.max_changes: List[float] = []  # largest update of every sweep
+        self.log_iterations: List[int] = []  # sweep index of every snapshot
+        capacity = min(max_logs, max_log_bytes // self.p.nbytes) if log_file is None else 0
+        self._buffer: np.ndarray = np.empty((capacity if capacity >= 2 else 0, goal, goal, goal))
+
+    @property
+    def iteration_logs(self) -> np.ndarray:
+        """
+        Snapshots of `p`, one per entry of `log_iterations`, indexed as [log][i][j][k].
+        """
+        if self.log_file is not None:
+            return self.load_log(self.log_file, self.goal)
+        return self._buffer[:len(self.log_iterations)]
+
+    @staticmethod
+    def load_log(path: str, goal: int) -> np.ndarray:
+        """
+        Memory-maps snapshots streamed to disk by a solver with the same `goal`.
+
+        Returns:
+            np.ndarray: Snapshots of shape (n_logs, goal, goal, goal).
+        """
+        return np.memmap(path, dtype=np.float64, mode='r').reshape(-1, goal, goal, goal)
+
+    def _log(self, iteration: int, stream) -> None:
+        """
+        Records a snapshot of `p` if this sweep is due to be logged.
+        """
+        if self.log_every == 0 or iteration % self.log_every != 0:
+            return
+
+        if stream is not None:
+            stream.write(self.p.tobytes())
+        elif self._buffer.shape[0] == 0:
+            return
+        else:
+            if len(self.log_iterations) == self._buffer.shape[0]:
+                # Buffer full: keep every other snapshot and log half as often. Moving them
+                # down one at a time in increasing order never overwrites one still to move.
+                kept = len(self.log_iterations[::2])
+                for index in range(1, kept):
+                    self._buffer[index] = self._buffer[2 * index]
+                self.log_iterations = self.log_iterations[::2]
+                self.log_every *= 2
+                if iteration % self.log_every != 0:
+                    return
+            self._buffer[len(self.log_iterations)] = self.p
+        self.log_iterations.append(iteration)
 
     def _value_iterate(self) -> None:
         """
         Runs value iteration until the value function converges.
         Updates both the value estimates `p` and the action decisions `flip`.
         """
-        max_change = float('inf')
-        while max_change >= self.epsilon:
-            max_change = 0.0
-            self.iteration_logs.append(copy.deepcopy(self.p))
-            for i in range(self.goal):
-                for j in range(self.goal):
-                    for k in range(self.goal - i):
-                        old_prob = self.p[i][j][k]
-                        p_flip = (1.0 - self._p_win(j, i, 0) + self._p_win(i, j, k + 1)) / 2
-                        p_hold = 1.0 - self._p_win(j, i + k, 0)
-                        self.p[i][j][k] = max(p_flip, p_hold)
-                        self.flip[i][j][k] = p_flip > p_hold
-                        change = abs(self.p[i][j][k] - old_prob)
-                        max_change = max(max_change, change)
+        stream = open(self.log_file, 'wb') if self.log_file is not None else None
+        try:
+            max_change = float('inf')
+            while max_change >= self.epsilon:
+                self._log(len(self.max_changes), stream)
+                max_change = _piglet_sweep(self.p, self.flip, self.goal)
+                self.max_changes.append(max_change)
+        finally:
+            if stream is not None:
+                stream.close()
 
     def _p_win(self, i: int, j: int, k: int) -> float:
         """
@@ -72,26 +178,28 @@ class PigletSolver:
         elif j >= self.goal:
             return 0.0
         else:
-            return self.p[i][j][k]
+            return self.p[i, j, k]
 
     def _return_convergence_plots(self) -> None:
         """
         Plots the win probability values for all reachable states over iterations.
         Only called if `convergence_plots=True` is passed to the solver.
         """
+        import matplotlib.pyplot as plt  # Imported lazily so that solving alone stays headless
+
         valid_states = [(i, j, k) for i in range(self.goal)
                         for j in range(self.goal)
                         for k in range(self.goal - i)]
 
+        logs = self.iteration_logs
         plt.figure(figsize=(10, 6))
         for state in valid_states:
             i, j, k = state
-            values = [log[i][j][k] for log in self.iteration_logs]
-            plt.plot(values, label=f"({i},{j},{k})")
+            plt.plot(self.log_iterations, logs[:, i, j, k], label=f"({i},{j},{k})")
 
         plt.xlabel("Iteration")
         plt.ylabel("Win Probability")
-        plt.title("State Value Convergence in Piglet (goal=2)")
+        plt.title(f"State Value Convergence in Piglet (goal={self.goal})")
         plt.legend(title="State (i,j,k)", bbox_to_anchor=(1.05, 1), loc='upper left')
         plt.tight_layout()
         plt.grid(True)
@@ -112,13 +220,14 @@ class PigletSolver:
         self.savefig = savefig
         self._value_iterate()
         if convergence_plots:
+            import matplotlib as mpl
             mpl.rc_file('pickle_and_config_files/matplotlibrc')
             self._return_convergence_plots()
 
-    def get_policy(self) -> List[List[List[bool]]]:
+    def get_policy(self) -> np.ndarray:
         """
         Returns:
-            List[List[List[bool]]]: The optimal policy as a 3D array of booleans.
-                                    True = roll, False = hold.
+            np.ndarray: The optimal policy as a 3D array of booleans, indexed [i][j][k].
+                        True = roll, False = hold.
         """
         return self.flip
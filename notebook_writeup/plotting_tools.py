@@ -1,14 +1,49 @@
 '''
 Plotting code for visualising win probabilities and reachable states as 3D isosurfaces.
+
+Plotly is imported inside each plotting function, so that importing this module from a
+headless solver job does not pay for it.
+
+The `*_mesh` variants extract each surface once in NumPy (see `isosurface_mesh`) and send
+only the triangles to the browser as `go.Mesh3d`, so they stay usable at large targets.
 '''
 
 import numpy as np
-import plotly.graph_objects as go
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    from .compact_storage import CompactSolution, as_dense_policy, as_dense_values
+    from .isosurface_mesh import cached_isosurface
+except ImportError:
+    from compact_storage import CompactSolution, as_dense_policy, as_dense_values
+    from isosurface_mesh import cached_isosurface
+
+
+def _isosurface_layout(fig, title: str, perspective: List[float]) -> None:
+    """
+    Applies the layout shared by all the isosurface plots.
+    """
+    fig.update_layout(
+        font=dict(family='serif'),
+        title=dict(
+            text=title,
+            x=0.5,
+            y=0.75,
+            xanchor='center',
+            font=dict(size=20, family='serif')
+        ),
+        scene=dict(
+            xaxis=dict(title='Player Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
+            yaxis=dict(title='Opponent Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
+            zaxis=dict(title='Turn Total', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)')
+        ),
+        scene_camera=dict(eye=dict(x=perspective[0], y=perspective[1], z=perspective[2]))
+    )
 
 
 def plot_isosurface_from_array(
-    array: np.ndarray,
+    array: Union[np.ndarray, CompactSolution],
     isovalues: List[float] = [0.2, 0.4, 0.6, 0.8],
     save_as: Optional[str] = None,
     perspective: List[float] = [1, 1, 1]
@@ -17,11 +52,15 @@ def plot_isosurface_from_array(
     Plots multiple isosurfaces from a 3D array of values using Plotly.
 
     Args:
-        array (np.ndarray): 3D numpy array containing scalar values (e.g. win probabilities).
+        array (Union[np.ndarray, CompactSolution]): 3D numpy array containing scalar values
+            (e.g. win probabilities), or a compact solution whose values are plotted.
         isovalues (List[float]): Contour values to extract as surfaces.
         save_as (Optional[str]): Optional file path to save image output.
         perspective (List[float]): 3D camera perspective [x, y, z].
     """
+    import plotly.graph_objects as go
+
+    array = as_dense_values(array)
     array = array[:, :-1, :]  # Drop last slice in j-dimension
     i_dim, j_dim, k_dim = array.shape
     i, j, k = np.meshgrid(np.arange(i_dim), np.arange(j_dim), np.arange(k_dim), indexing='ij')
@@ -44,22 +83,7 @@ def plot_isosurface_from_array(
             name=f'Iso {iso_val:.2f}'
         ))
 
-    fig.update_layout(
-        font=dict(family='serif'),
-        title=dict(
-            text='Contours of Equal Win Probability',
-            x=0.5,
-            y=0.75,
-            xanchor='center',
-            font=dict(size=20, family='serif')
-        ),
-        scene=dict(
-            xaxis=dict(title='Player Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
-            yaxis=dict(title='Opponent Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
-            zaxis=dict(title='Turn Total', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)')
-        ),
-        scene_camera=dict(eye=dict(x=perspective[0], y=perspective[1], z=perspective[2]))
-    )
+    _isosurface_layout(fig, 'Contours of Equal Win Probability', perspective)
 
     if save_as:
         fig.write_image(save_as, scale=3)
@@ -68,7 +92,7 @@ def plot_isosurface_from_array(
 
 
 def generate_box_plots(
-    array: np.ndarray,
+    array: Union[np.ndarray, CompactSolution],
     title: str = 'Isosurface Plot of Reachable States',
     pad: bool = False,
     save_as: Optional[str] = None,
@@ -78,12 +102,16 @@ def generate_box_plots(
     Generates a box-style isosurface plot for reachable states/ policies.
 
     Args:
-        array (np.ndarray): 3D binary array where 1 = reachable state.
+        array (Union[np.ndarray, CompactSolution]): 3D binary array where 1 = reachable state,
+            or a compact solution whose policy is plotted.
         title (str): Plot title to display.
         pad (bool): Whether to pad the array borders with zeros for better edge rendering.
         save_as (Optional[str]): Optional file path to save image output.
         perspective (List[float]): 3D camera perspective [x, y, z].
     """
+    import plotly.graph_objects as go
+
+    array = as_dense_policy(array)
     padded = np.pad(array, pad_width=1, mode='constant', constant_values=0) if pad else array
 
     i_dim, j_dim, k_dim = padded.shape
@@ -103,22 +131,103 @@ def generate_box_plots(
         showscale=False
     ))
 
-    fig.update_layout(
-        font=dict(family='serif'),
-        title=dict(
-            text=title,
-            x=0.5,
-            y=0.75,
-            xanchor='center',
-            font=dict(size=20, family='serif')
-        ),
-        scene=dict(
-            xaxis=dict(title='Player Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
-            yaxis=dict(title='Opponent Score', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)'),
-            zaxis=dict(title='Turn Total', showgrid=True, gridcolor='lightgrey', showbackground=True, backgroundcolor='rgba(240,240,240,0.5)')
-        ),
-        scene_camera=dict(eye=dict(x=perspective[0], y=perspective[1], z=perspective[2]))
-    )
+    _isosurface_layout(fig, title, perspective)
+
+    if save_as:
+        fig.write_image(save_as, scale=3)
+
+    fig.show()
+
+
+def plot_isosurface_mesh(
+    array: Union[np.ndarray, CompactSolution],
+    isovalues: List[float] = [0.2, 0.4, 0.6, 0.8],
+    step: int = 1,
+    cache_dir: Union[str, Path, None] = None,
+    save_as: Optional[str] = None,
+    perspective: List[float] = [1, 1, 1]
+) -> None:
+    """
+    Plots the same contours as `plot_isosurface_from_array` as precomputed triangle meshes.
+
+    Args:
+        array (Union[np.ndarray, CompactSolution]): 3D numpy array containing scalar values
+            (e.g. win probabilities), or a compact solution whose values are plotted.
+        isovalues (List[float]): Contour values to extract as surfaces.
+        step (int): Downsampling stride along each axis; 1 keeps every state.
+        cache_dir (Union[str, Path, None]): Where to cache meshes. Without it, meshes of
+            solutions from `SolutionCache` are cached with the solution and meshes of
+            in-memory arrays are not cached.
+        save_as (Optional[str]): Optional file path to save image output.
+        perspective (List[float]): 3D camera perspective [x, y, z].
+    """
+    import plotly.graph_objects as go
+
+    array = as_dense_values(array)
+    array = array[:, :-1, :]  # Drop last slice in j-dimension
+
+    fig = go.Figure()
+    colours = np.linspace(0, 1, len(isovalues))
+    for iso_val, colour in zip(isovalues, colours):
+        vertices, faces = cached_isosurface(array, iso_val, step, cache_dir)
+        fig.add_trace(go.Mesh3d(
+            x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+            i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+            intensity=np.full(len(vertices), colour),
+            cmin=0, cmax=1,
+            opacity=0.8,
+            colorscale='Viridis',
+            showscale=False,
+            name=f'Iso {iso_val:.2f}'
+        ))
+
+    _isosurface_layout(fig, 'Contours of Equal Win Probability', perspective)
+
+    if save_as:
+        fig.write_image(save_as, scale=3)
+
+    fig.show()
+
+
+def generate_box_plots_mesh(
+    array: Union[np.ndarray, CompactSolution],
+    title: str = 'Isosurface Plot of Reachable States',
+    pad: bool = False,
+    step: int = 1,
+    cache_dir: Union[str, Path, None] = None,
+    save_as: Optional[str] = None,
+    perspective: List[float] = [1, 1, 1]
+) -> None:
+    """
+    Plots the same surface as `generate_box_plots` as a precomputed triangle mesh.
+
+    Args:
+        array (Union[np.ndarray, CompactSolution]): 3D binary array where 1 = reachable state,
+            or a compact solution whose policy is plotted.
+        title (str): Plot title to display.
+        pad (bool): Whether to pad the array borders with zeros for better edge rendering.
+        step (int): Downsampling stride along each axis; 1 keeps every state.
+        cache_dir (Union[str, Path, None]): Where to cache meshes. Without it, meshes of
+            solutions from `SolutionCache` are cached with the solution and meshes of
+            in-memory arrays are not cached.
+        save_as (Optional[str]): Optional file path to save image output.
+        perspective (List[float]): 3D camera perspective [x, y, z].
+    """
+    import plotly.graph_objects as go
+
+    array = as_dense_policy(array)
+    padded = np.pad(array, pad_width=1, mode='constant', constant_values=0) if pad else array
+    vertices, faces = cached_isosurface(padded, 0.75, step, cache_dir)
+
+    fig = go.Figure(data=go.Mesh3d(
+        x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        color='gray',
+        opacity=1,
+        flatshading=True
+    ))
+
+    _isosurface_layout(fig, title, perspective)
 
     if save_as:
         fig.write_image(save_as, scale=3)
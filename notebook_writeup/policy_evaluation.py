@@ -0,0 +1,300 @@
+'''
+Exact evaluation of fixed policies, using the same layered backward sweep as
+`optimised_layered_vi`. Instead of maximising over actions in every state, both
+players' actions are read from their policy arrays, so the sweep returns the
+exact win probabilities of one policy against another with no simulation noise.
+
+Fixing only the opponent's actions and maximising over our own gives the best
+response to that opponent, and with it a measure of how exploitable it is.
+'''
+
+import numpy as np
+from numba import njit
+from typing import NamedTuple, Tuple
+
+try:
+    from .optimised_layered_vi import _init_V_policy
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from optimised_layered_vi import _init_V_policy
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+@njit(cache=True)
+def _action(pol: np.ndarray, ps: int, os: int, t: int) -> int:
+    """
+    Looks up a policy decision, clamping indices to the policy's shape as `Competition` does.
+
+    Args:
+        pol (np.ndarray): Policy array (0 = hold, 1 = roll).
+        ps (int): Score of the player to move.
+        os (int): Score of the opponent.
+        t (int): Current turn total.
+
+    Returns:
+        int: The action taken in this state.
+    """
+    return pol[min(ps, pol.shape[0] - 1), min(os, pol.shape[1] - 1), min(t, pol.shape[2] - 1)]
+
+
+@njit(cache=True)
+def _fixed_action_value(V: np.ndarray,
+                        V_opp: np.ndarray,
+                        action: int,
+                        ps: int,
+                        os: int,
+                        t: int,
+                        target_score: int,
+                        die_sides: int,
+                        max_turn: int) -> float:
+    """
+    Computes the value of taking a given action in state (ps, os, t).
+
+    Args:
+        V (np.ndarray): Win probabilities of the player to move.
+        V_opp (np.ndarray): Win probabilities of the opponent when they are to move.
+        action (int): 1 to roll, 0 to hold.
+        ps (int): Score of the player to move.
+        os (int): Score of the opponent.
+        t (int): Current turn total.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+
+    Returns:
+        float: Probability that the player to move wins after taking `action`.
+    """
+    if action == 0:
+        return 1.0 - V_opp[os, ps + t, 0]
+
+    roll_prob = 1.0 / die_sides
+    value = roll_prob * (1.0 - V_opp[os, ps, 0])
+    for r in range(2, die_sides + 1):
+        new_t = t + r
+        if ps + new_t >= target_score:
+            value += roll_prob
+        elif new_t <= max_turn:
+            value += roll_prob * V[ps, os, new_t]
+    return value
+
+
+@njit(cache=True)
+def _layered_policy_evaluation(V1: np.ndarray,
+                               V2: np.ndarray,
+                               policy1: np.ndarray,
+                               policy2: np.ndarray,
+                               target_score: int,
+                               die_sides: int,
+                               max_turn: int,
+                               epsilon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Layered backward sweep with both players' actions fixed by their policies.
+
+    Args:
+        V1 (np.ndarray): Player 1's win probability when player 1 is to move (updated in place).
+        V2 (np.ndarray): Player 2's win probability when player 2 is to move (updated in place).
+        policy1 (np.ndarray): Player 1's policy.
+        policy2 (np.ndarray): Player 2's policy.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Convergence threshold for iteration.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The converged arrays V1 and V2.
+    """
+    for score_sum in range(2 * target_score - 1, -1, -1):
+        converged = False
+        while not converged:
+            max_diff = 0.0
+
+            p_min = max(0, score_sum - target_score + 1)
+            p_max = min(target_score, score_sum)
+
+            for ps in range(p_min, p_max + 1):
+                os = score_sum - ps
+                if ps >= target_score or os >= target_score:
+                    continue
+
+                # Descending t lets each sweep carry values straight down to t = 0
+                for t in range(min(max_turn, target_score - ps - 1), -1, -1):
+                    new_v = _fixed_action_value(V1, V2, _action(policy1, ps, os, t),
+                                                ps, os, t, target_score, die_sides, max_turn)
+                    diff = abs(V1[ps, os, t] - new_v)
+                    if diff > max_diff:
+                        max_diff = diff
+                    V1[ps, os, t] = new_v
+
+                    new_v = _fixed_action_value(V2, V1, _action(policy2, ps, os, t),
+                                                ps, os, t, target_score, die_sides, max_turn)
+                    diff = abs(V2[ps, os, t] - new_v)
+                    if diff > max_diff:
+                        max_diff = diff
+                    V2[ps, os, t] = new_v
+
+            if max_diff < epsilon:
+                converged = True
+
+    return V1, V2
+
+
+def evaluate_policies(policy1: np.ndarray,
+                      policy2: np.ndarray,
+                      target_score: int = 100,
+                      die_sides: int = 6,
+                      max_turn: int = 100,
+                      epsilon: float = 1e-12) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes exact win probabilities of one fixed policy against another.
+
+    `V1[ps, os, t]` is player 1's probability of winning when player 1 is to move with score
+    `ps`, the opponent has `os` and the turn total is `t`; `V2` is the same for player 2.
+    Player 1's chance of winning a game in which they move first is therefore `V1[0, 0, 0]`,
+    and in which they move second is `1 - V2[0, 0, 0]`.
+
+    Args:
+        policy1 (np.ndarray): Player 1's policy array (0 = hold, 1 = roll).
+        policy2 (np.ndarray): Player 2's policy array.
+        target_score (int, optional): Score needed to win. Defaults to 100.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 100.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-12.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The win probability arrays V1 and V2.
+    """
+    V1, _ = _init_V_policy(target_score, max_turn)
+    V2 = V1.copy()
+    return _layered_policy_evaluation(V1, V2,
+                                      np.ascontiguousarray(policy1),
+                                      np.ascontiguousarray(policy2),
+                                      target_score, die_sides, max_turn, epsilon)
+
+
+class BestResponse(NamedTuple):
+    """
+    Result of `best_response`.
+
+    Attributes:
+        V (np.ndarray): Best responder's win probability when they are to move.
+        policy (np.ndarray): Best-response policy (0 = hold, 1 = roll).
+        opponent_V (np.ndarray): Opponent's win probability when they are to move.
+        first_mover_value (float): Best responder's win probability when moving first.
+        second_mover_value (float): Best responder's win probability when moving second.
+        exploitability (float): Seat-averaged best-response win probability minus 0.5.
+    """
+    V: np.ndarray
+    policy: np.ndarray
+    opponent_V: np.ndarray
+    first_mover_value: float
+    second_mover_value: float
+    exploitability: float
+
+
+@njit(cache=True)
+def _layered_best_response(V: np.ndarray,
+                           policy: np.ndarray,
+                           V_opp: np.ndarray,
+                           opponent_policy: np.ndarray,
+                           target_score: int,
+                           die_sides: int,
+                           max_turn: int,
+                           epsilon: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Layered backward sweep maximising over our actions while the opponent's are fixed.
+
+    Args:
+        V (np.ndarray): Best responder's value array (updated in place).
+        policy (np.ndarray): Best responder's policy array (updated in place).
+        V_opp (np.ndarray): Opponent's value array (updated in place).
+        opponent_policy (np.ndarray): The fixed opponent policy.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Convergence threshold for iteration.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The converged V, policy and V_opp.
+    """
+    for score_sum in range(2 * target_score - 1, -1, -1):
+        converged = False
+        while not converged:
+            max_diff = 0.0
+
+            p_min = max(0, score_sum - target_score + 1)
+            p_max = min(target_score, score_sum)
+
+            for ps in range(p_min, p_max + 1):
+                os = score_sum - ps
+                if ps >= target_score or os >= target_score:
+                    continue
+
+                for t in range(min(max_turn, target_score - ps - 1), -1, -1):
+                    roll_value = _fixed_action_value(V, V_opp, 1, ps, os, t,
+                                                     target_score, die_sides, max_turn)
+                    # As in `_layered_vi`, holding with nothing to bank is never chosen
+                    if t == 0:
+                        hold_value = 0.0
+                    else:
+                        hold_value = _fixed_action_value(V, V_opp, 0, ps, os, t,
+                                                         target_score, die_sides, max_turn)
+
+                    if roll_value >= hold_value:
+                        new_v = roll_value
+                        policy[ps, os, t] = 1
+                    else:
+                        new_v = hold_value
+                        policy[ps, os, t] = 0
+
+                    diff = abs(V[ps, os, t] - new_v)
+                    if diff > max_diff:
+                        max_diff = diff
+                    V[ps, os, t] = new_v
+
+                    new_v = _fixed_action_value(V_opp, V, _action(opponent_policy, ps, os, t),
+                                                ps, os, t, target_score, die_sides, max_turn)
+                    diff = abs(V_opp[ps, os, t] - new_v)
+                    if diff > max_diff:
+                        max_diff = diff
+                    V_opp[ps, os, t] = new_v
+
+            if max_diff < epsilon:
+                converged = True
+
+    return V, policy, V_opp
+
+
+def best_response(opponent_policy: np.ndarray,
+                  target_score: int = 100,
+                  die_sides: int = 6,
+                  max_turn: int = 100,
+                  epsilon: float = 1e-12) -> BestResponse:
+    """
+    Computes the best response to a fixed opponent policy in a single compiled pass.
+
+    Since seats alternate between games, a policy that cannot be exploited concedes exactly
+    one half on average over both seats. The exploitability of `opponent_policy` is how far
+    the best response's seat-averaged win probability rises above that.
+
+    Args:
+        opponent_policy (np.ndarray): The opponent's policy array, e.g. `Opponents.hold_at_n(20)`.
+        target_score (int, optional): Score needed to win. Defaults to 100.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 100.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-12.
+
+    Returns:
+        BestResponse: The best-response values and policy, and the opponent's exploitability.
+    """
+    V, policy = _init_V_policy(target_score, max_turn)
+    V_opp = V.copy()
+    V, policy, V_opp = _layered_best_response(V, policy, V_opp,
+                                              np.ascontiguousarray(opponent_policy),
+                                              target_score, die_sides, max_turn, epsilon)
+
+    first_mover_value = float(V[0, 0, 0])
+    second_mover_value = float(1.0 - V_opp[0, 0, 0])
+    exploitability = 0.5 * (first_mover_value + second_mover_value) - 0.5
+    return BestResponse(V, policy, V_opp, first_mover_value, second_mover_value, exploitability)
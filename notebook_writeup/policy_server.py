@@ -0,0 +1,471 @@
+'''
+A local server answering "roll or hold?" for many concurrent game bots from one table.
+
+The table is memory-mapped from the solution cache, so however many servers and bots run
+on a machine, the operating system keeps a single copy of it. Requests from all
+connections are gathered into micro-batches and answered with one vectorised lookup, and
+the time from receiving each request to writing its answer is recorded for latency
+percentiles.
+
+The wire format is fixed-size binary. A request is three little-endian int32 values
+(ps, os, t). A response is a uint8 action (0 = hold, 1 = roll) followed by a float64 win
+probability. A request the table cannot answer gets the action 255 and a NaN probability,
+and the connection carries on. Responses come back in request order on each connection,
+so clients may pipeline many requests before reading. Each connection keeps reading while
+its replies wait to be sent, until `max_backlog` bytes of replies are outstanding, and
+`PolicyClient` sends large batches in chunks, reading each chunk's replies before sending
+the next, so neither side can fill the socket buffers and stall the other.
+
+    python notebook_writeup/policy_server.py --target-score 100 --unix /tmp/pig.sock
+'''
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import threading
+from collections import deque
+import numpy as np
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+# This makes imports around a directory a bit easier usually
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from .solution_cache import SolutionCache, cached_pig_layered_value_iteration
+except ImportError:
+    from solution_cache import SolutionCache, cached_pig_layered_value_iteration
+
+
+REQUEST = np.dtype([('ps', '<i4'), ('os', '<i4'), ('t', '<i4')])
+RESPONSE = np.dtype([('action', 'u1'), ('win_probability', '<f8')])
+
+# Action of the reply to a request the table could not answer
+ERROR_ACTION = 255
+
+
+class PolicyTable:
+    """
+    Dense value and policy arrays (typically read-only memory maps) with batch lookups.
+    """
+
+    def __init__(self, V: np.ndarray, policy: np.ndarray) -> None:
+        """
+        Args:
+            V (np.ndarray): Value array from the solver.
+            policy (np.ndarray): Policy array from the solver.
+        """
+        # Plain ndarray views of a memory map still share its pages, but index faster
+        self.V = np.asarray(V)
+        self.policy = np.asarray(policy)
+
+    @classmethod
+    def from_cache(cls,
+                   target_score: int = 100,
+                   die_sides: int = 6,
+                   max_turn: Optional[int] = None,
+                   method: str = 'direct',
+                   cache: Optional[SolutionCache] = None) -> 'PolicyTable':
+        """
+        Memory-maps a solution from the solution cache, solving it first on a miss.
+
+        Args:
+            target_score (int, optional): Score needed to win. Defaults to 100.
+            die_sides (int, optional): Number of sides on the die. Defaults to 6.
+            max_turn (Optional[int]): Maximum turn total. Defaults to the target score.
+            method (str, optional): Solver mode. Defaults to 'direct'.
+            cache (Optional[SolutionCache]): Cache to use. Defaults to the default directory.
+
+        Returns:
+            PolicyTable: The memory-mapped table.
+        """
+        max_turn = target_score if max_turn is None else max_turn
+        V, policy = cached_pig_layered_value_iteration(target_score, die_sides, max_turn,
+                                                       method=method, cache=cache)
+        return cls(V, policy)
+
+    def query(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Actions and win probabilities of a batch of states, clamping indices as `Competition` does.
+        """
+        shape = self.policy.shape
+        # np.minimum/np.maximum rather than np.clip, which costs several times more on small batches
+        ps = np.minimum(np.maximum(ps, 0), shape[0] - 1)
+        os = np.minimum(np.maximum(os, 0), shape[1] - 1)
+        t = np.minimum(np.maximum(t, 0), shape[2] - 1)
+        return self.policy[ps, os, t], self.V[ps, os, t]
+
+
+class LatencyRecorder:
+    """
+    Ring buffer of the most recent request latencies.
+    """
+
+    def __init__(self, capacity: int = 100_000) -> None:
+        """
+        Args:
+            capacity (int, optional): Number of latencies kept. Defaults to 100,000.
+        """
+        self._seconds = np.zeros(capacity)
+        self._next = 0
+        self.count = 0
+
+    def record(self, seconds: float, n: int = 1) -> None:
+        """
+        Records the same latency for `n` requests answered together.
+        """
+        capacity = self._seconds.shape[0]
+        n_kept = min(n, capacity)
+        slots = (self._next + np.arange(n_kept)) % capacity
+        self._seconds[slots] = seconds
+        self._next = (self._next + n_kept) % capacity
+        self.count += n
+
+    def percentiles(self, qs: Tuple[float, ...] = (50, 90, 99, 99.9)) -> Dict[str, float]:
+        """
+        Latency percentiles of the kept requests, in microseconds.
+
+        Returns:
+            Dict[str, float]: For example {'p50': 41.2, 'p90': 60.3, ...}, or an empty dict
+                before any request has been answered.
+        """
+        kept = self._seconds[:min(self.count, self._seconds.shape[0])]
+        if kept.size == 0:
+            return {}
+        values = np.percentile(kept, qs) * 1e6
+        return {f"p{q:g}": float(v) for q, v in zip(qs, values)}
+
+
+class PolicyServer:
+    """
+    asyncio server answering policy lookups over a Unix socket or localhost TCP.
+    """
+
+    def __init__(self,
+                 table: PolicyTable,
+                 max_batch: int = 8192,
+                 max_delay: float = 0.0,
+                 latency_history: int = 100_000,
+                 max_backlog: int = 16 * 2 ** 20) -> None:
+        """
+        Args:
+            table (PolicyTable): Table to answer from. Anything with a vectorised
+                                 `query(ps, os, t)`, such as a `ThresholdPolicy`, also works.
+            max_batch (int, optional): Most requests answered in one lookup. Defaults to 8192.
+            max_delay (float, optional): Seconds to wait for more requests before answering a
+                                         batch. The default of 0 batches whatever arrived in the
+                                         same event loop iteration, adding no delay.
+            latency_history (int, optional): Latencies kept for percentiles. Defaults to 100,000.
+            max_backlog (int, optional): Bytes of replies a connection may have waiting to be
+                                         sent before the server stops reading its requests.
+                                         Defaults to 16 MiB.
+        """
+        self.table = table
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_backlog = max_backlog
+        self.latency = LatencyRecorder(latency_history)
+        self.batches = 0
+        self.address: Union[str, Tuple[str, int], None] = None
+
+        self._pending: Deque[Tuple[np.ndarray, asyncio.Future]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connections: set = set()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Requests answered, batches, mean batch size and latency percentiles (microseconds).
+        """
+        requests = self.latency.count
+        return dict(requests=requests, batches=self.batches,
+                    mean_batch=requests / self.batches if self.batches else 0.0,
+                    **self.latency.percentiles())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one connection: every read is parsed into requests and queued as one chunk.
+
+        Replies are written and drained by a separate task, so requests keep being read
+        while a client that pipelines a large batch is not yet reading, until `max_backlog`
+        bytes of replies are waiting.
+        """
+        self._connections.add(asyncio.current_task())
+        replies: asyncio.Queue = asyncio.Queue()
+        room = asyncio.Event()
+        room.set()
+        backlog = 0
+
+        async def send_replies() -> None:
+            nonlocal backlog
+            try:
+                while True:
+                    reply = await replies.get()
+                    if reply is None:
+                        return
+                    future, n, received = reply
+                    writer.write((await future).tobytes())
+                    await writer.drain()
+                    self.latency.record(time.perf_counter() - received, n)
+                    backlog -= n * RESPONSE.itemsize
+                    if backlog <= self.max_backlog:
+                        room.set()
+            finally:
+                room.set()  # Never leave the reader waiting on a sender that has stopped
+
+        sender = asyncio.create_task(send_replies())
+        buffer = b''
+        try:
+            while True:
+                await room.wait()
+                if sender.done():
+                    break
+                data = await reader.read(1 << 16)
+                if not data:
+                    break
+                received = time.perf_counter()
+                buffer += data
+                n = len(buffer) // REQUEST.itemsize
+                if n == 0:
+                    continue
+
+                requests = np.frombuffer(buffer, REQUEST, count=n)
+                buffer = buffer[n * REQUEST.itemsize:]
+                future = self._loop.create_future()
+                self._pending.append((requests, future))
+                self._wakeup.set()
+
+                replies.put_nowait((future, n, received))
+                backlog += n * RESPONSE.itemsize
+                if backlog > self.max_backlog:
+                    room.clear()
+            replies.put_nowait(None)
+            await sender
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except asyncio.CancelledError:
+            pass  # The server is stopping
+        finally:
+            sender.cancel()
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    def _lookup(self, requests: np.ndarray) -> np.ndarray:
+        """
+        Answers a batch with one lookup, replying `ERROR_ACTION` to requests the table rejects.
+        """
+        responses = np.empty(len(requests), RESPONSE)
+        try:
+            actions, values = self.table.query(requests['ps'], requests['os'], requests['t'])
+            responses['action'] = actions
+            responses['win_probability'] = values
+        except Exception:
+            # Look the requests up one at a time so that only the bad ones fail
+            for i in range(len(requests)):
+                one = requests[i:i + 1]
+                try:
+                    actions, values = self.table.query(one['ps'], one['os'], one['t'])
+                    responses[i] = (np.ravel(actions)[0], np.ravel(values)[0])
+                except Exception:
+                    responses[i] = (ERROR_ACTION, np.nan)
+        return responses
+
+    async def _batcher(self) -> None:
+        """
+        Answers pending chunks from all connections with one lookup per batch.
+        """
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Give other ready connections a chance to queue their requests first
+            await asyncio.sleep(self.max_delay)
+
+            while self._pending:
+                batch, size = [], 0
+                while self._pending and (not batch or size + len(self._pending[0][0]) <= self.max_batch):
+                    requests, future = self._pending.popleft()
+                    batch.append((requests, future))
+                    size += len(requests)
+
+                responses = self._lookup(np.concatenate([r for r, _ in batch]))
+                self.batches += 1
+
+                start = 0
+                for chunk, future in batch:
+                    if not future.done():
+                        future.set_result(responses[start:start + len(chunk)])
+                    start += len(chunk)
+
+    async def serve(self,
+                    path: Optional[str] = None,
+                    host: str = '127.0.0.1',
+                    port: int = 0,
+                    ready: Optional[threading.Event] = None) -> None:
+        """
+        Serves until `stop` is called.
+
+        Args:
+            path (Optional[str]): Unix socket path. If None, TCP on `host`:`port` is used.
+            host (str, optional): TCP host. Defaults to localhost.
+            port (int, optional): TCP port, 0 picking a free one. Defaults to 0.
+            ready (Optional[threading.Event]): Set once `address` is known and clients may connect.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self._handle, path=path)
+            self.address = path
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+            self.address = server.sockets[0].getsockname()[:2]
+
+        batcher = asyncio.create_task(self._batcher())
+        if ready is not None:
+            ready.set()
+        async with server:
+            await self._stopping.wait()
+            # Connections still open would otherwise wait forever on the batcher
+            for connection in list(self._connections):
+                connection.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        batcher.cancel()
+        if path is not None and os.path.exists(path):
+            os.unlink(path)
+
+    def run(self, *args, **kwargs) -> None:
+        """
+        Blocking form of `serve`, e.g. as the target of a background thread.
+        """
+        asyncio.run(self.serve(*args, **kwargs))
+
+    def stop(self) -> None:
+        """
+        Stops the server; safe to call from any thread.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+
+class PolicyClient:
+    """
+    Blocking client for `PolicyServer`, as used by a game bot.
+    """
+
+    def __init__(self, address: Union[str, Tuple[str, int]], chunk: int = 4096) -> None:
+        """
+        Args:
+            address (Union[str, Tuple[str, int]]): Unix socket path, or (host, port).
+            chunk (int, optional): Most requests in flight at once; their requests and replies
+                                   must fit in the socket buffers. Defaults to 4096.
+        """
+        self.chunk = chunk
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+
+    def _receive(self, n_bytes: int) -> bytes:
+        """
+        Reads exactly `n_bytes` from the server.
+        """
+        data = bytearray()
+        while len(data) < n_bytes:
+            chunk = self.sock.recv(n_bytes - len(data))
+            if not chunk:
+                raise ConnectionError("Policy server closed the connection.")
+            data += chunk
+        return bytes(data)
+
+    def decide_many(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pipelines a batch of lookups over the connection, `chunk` requests at a time.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Actions and win probabilities, in request order.
+
+        Raises:
+            ValueError: If the server could not answer some of the requests. The connection
+                        stays usable.
+        """
+        ps, os, t = np.broadcast_arrays(ps, os, t)
+        requests = np.empty(ps.size, REQUEST)
+        requests['ps'], requests['os'], requests['t'] = ps.ravel(), os.ravel(), t.ravel()
+        responses = np.empty(ps.size, RESPONSE)
+        for start in range(0, ps.size, self.chunk):
+            part = requests[start:start + self.chunk]
+            self.sock.sendall(part.tobytes())
+            responses[start:start + part.size] = np.frombuffer(self._receive(part.size * RESPONSE.itemsize),
+                                                               RESPONSE)
+
+        failed = np.flatnonzero(responses['action'] == ERROR_ACTION)
+        if failed.size:
+            state = tuple(int(x) for x in requests[failed[0]])
+            raise ValueError(f"The policy server could not answer {failed.size} request(s), "
+                             f"the first being (ps, os, t) = {state}.")
+        return responses['action'].reshape(ps.shape), responses['win_probability'].reshape(ps.shape)
+
+    def decide(self, ps: int, os: int, t: int) -> Tuple[int, float]:
+        """
+        Looks up a single state.
+
+        Returns:
+            Tuple[int, float]: The action (0 = hold, 1 = roll) and the win probability.
+        """
+        actions, values = self.decide_many(ps, os, t)
+        return int(actions), float(values)
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def __enter__(self) -> 'PolicyClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Serves the cached solution of a game until interrupted, reporting latency as it goes.
+    """
+    parser = argparse.ArgumentParser(description="Serve Pig policy decisions to local clients.")
+    parser.add_argument('--target-score', type=int, default=100)
+    parser.add_argument('--die-sides', type=int, default=6)
+    parser.add_argument('--max-turn', type=int, default=None, help="Defaults to the target score.")
+    parser.add_argument('--unix', default=None, help="Unix socket path; TCP is used if omitted.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=8192)
+    parser.add_argument('--max-delay-us', type=float, default=0.0)
+    parser.add_argument('--report-every', type=float, default=10.0, help="Seconds between stats lines.")
+    args = parser.parse_args(argv)
+
+    table = PolicyTable.from_cache(args.target_score, args.die_sides, args.max_turn)
+    server = PolicyServer(table, args.max_batch, args.max_delay_us * 1e-6)
+    ready = threading.Event()
+    thread = threading.Thread(target=server.run, args=(args.unix, args.host, args.port, ready), daemon=True)
+    thread.start()
+    ready.wait()
+    print(f"serving on {server.address}", file=sys.stderr)
+
+    try:
+        while thread.is_alive():
+            thread.join(args.report_every)
+            print(server.stats(), file=sys.stderr)
+    except KeyboardInterrupt:
+        server.stop()
+        thread.join()
+        print(server.stats(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
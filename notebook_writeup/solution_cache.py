@@ -0,0 +1,226 @@
+'''
+A persistent on-disk cache of solutions from `pig_layered_value_iteration`.
+
+Entries are content-addressed by a hash of the game and solver parameters, and stored as
+raw `.npy` files so that they can be memory-mapped straight back in: a repeat solve costs
+a file open rather than a full solve, and pages are only read as they are touched. The
+least recently used entries are evicted once the cache grows beyond its size limit.
+Files other modules add to an entry, such as meshes, go through `add_to_entry` so that
+they count toward that limit as soon as they are written.
+'''
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+try:
+    from .optimised_layered_vi import SOLVER_VERSION, pig_layered_value_iteration
+except ImportError:
+    from optimised_layered_vi import SOLVER_VERSION, pig_layered_value_iteration
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('PIG_CACHE_DIR', Path.home() / '.cache' / 'pig_solutions'))
+DEFAULT_MAX_BYTES = 8 * 1024**3
+
+# Size limit given explicitly for a cache directory, used when it is opened without one
+_LIMIT_FILE = '.max_bytes'
+
+
+class SolutionCache:
+    """
+    Directory of memory-mappable solutions, one subdirectory per parameter hash.
+    """
+
+    def __init__(self,
+                 root: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_bytes: Optional[int] = None) -> None:
+        """
+        Args:
+            root (Union[str, Path], optional): Cache directory, created if missing.
+                Defaults to $PIG_CACHE_DIR or ~/.cache/pig_solutions.
+            max_bytes (Optional[int]): Size above which old entries are evicted. A limit given
+                here is recorded in the directory, and caches opened on it without one use
+                it; otherwise the default is 8 GiB.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        limit = self.root / _LIMIT_FILE
+        if max_bytes is not None:
+            handle, staging = tempfile.mkstemp(dir=self.root, prefix='.staging-')
+            with os.fdopen(handle, 'w') as f:
+                f.write(str(max_bytes))
+            os.replace(staging, limit)
+        elif limit.exists():
+            max_bytes = int(limit.read_text())
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+
+    @classmethod
+    def containing(cls, path: Union[str, Path]) -> Optional['SolutionCache']:
+        """
+        The cache with an entry directly holding `path`, opened with its recorded size limit, if any.
+
+        Args:
+            path (Union[str, Path]): A file, such as a memory-mapped solution.
+
+        Returns:
+            Optional[SolutionCache]: The cache, or None if `path` is not in a cache entry.
+        """
+        entry = Path(path).parent
+        if not (entry / 'meta.json').exists():
+            return None
+        return cls(entry.parent)
+
+    def add_to_entry(self, path: Union[str, Path], write: Callable[[Path], None]) -> None:
+        """
+        Adds a file to an existing entry atomically, then evicts old entries beyond the size limit.
+
+        Args:
+            path (Union[str, Path]): Where the file goes, inside an entry directory.
+            write (Callable[[Path], None]): Writes the file's contents to the path it is given.
+        """
+        path = Path(path)
+        staging = path.with_name(f'.staging-{os.getpid()}-{path.name}')
+        try:
+            write(staging)
+            os.replace(staging, path)
+        finally:
+            staging.unlink(missing_ok=True)
+        self.evict(keep=path.parent.name)
+
+    @staticmethod
+    def key(params: Dict) -> str:
+        """
+        Content address of a parameter set, including the solver version.
+
+        Args:
+            params (Dict): Game and solver parameters.
+
+        Returns:
+            str: Hex digest naming the entry.
+        """
+        keyed = dict(params, solver_version=SOLVER_VERSION)
+        return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode()).hexdigest()[:32]
+
+    def load(self, params: Dict) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Memory-maps a cached entry read-only, marking it as recently used.
+
+        Args:
+            params (Dict): Game and solver parameters.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: The value and policy arrays, or None on a miss.
+        """
+        entry = self.root / self.key(params)
+        try:
+            os.utime(entry / 'meta.json')
+            V = np.load(entry / 'V.npy', mmap_mode='r')
+            policy = np.load(entry / 'policy.npy', mmap_mode='r')
+        except FileNotFoundError:
+            # Never stored, or evicted by another process part way through loading
+            return None
+        return V, policy
+
+    def store(self, params: Dict, V: np.ndarray, policy: np.ndarray) -> None:
+        """
+        Writes an entry atomically, then evicts old entries beyond the size limit.
+
+        Args:
+            params (Dict): Game and solver parameters.
+            V (np.ndarray): Value array.
+            policy (np.ndarray): Policy array.
+        """
+        entry = self.root / self.key(params)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix='.staging-'))
+        try:
+            np.save(staging / 'V.npy', V)
+            np.save(staging / 'policy.npy', policy)
+            meta = dict(params, solver_version=SOLVER_VERSION)
+            (staging / 'meta.json').write_text(json.dumps(meta, sort_keys=True))
+            os.replace(staging, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=entry.name)
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Returns:
+            Dict[str, Tuple[float, int]]: Last-use time and size in bytes of every entry.
+        """
+        found = {}
+        for entry in self.root.iterdir():
+            meta = entry / 'meta.json'
+            if entry.name.startswith('.') or not meta.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            found[entry.name] = (meta.stat().st_mtime, size)
+        return found
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Removes least recently used entries until the cache fits within `max_bytes`.
+
+        Args:
+            keep (Optional[str]): Entry never to evict, such as the one just stored.
+        """
+        entries = self.entries()
+        total = sum(size for _, size in entries.values())
+        for name, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self.root / name, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Removes every entry, along with any staging left behind by interrupted writes.
+        """
+        for entry in self.root.iterdir():
+            if entry.name == _LIMIT_FILE:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+
+
+def cached_pig_layered_value_iteration(target_score: int = 15,
+                                       die_sides: int = 6,
+                                       max_turn: int = 15,
+                                       epsilon: float = 1e-6,
+                                       method: str = 'sweep',
+                                       cache: Optional[SolutionCache] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `pig_layered_value_iteration`, served from the on-disk cache when possible.
+
+    The arrays returned are read-only memory maps; copy them before modifying.
+
+    Args:
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        method (str, optional): Solver mode, as in `pig_layered_value_iteration`. Defaults to 'sweep'.
+        cache (Optional[SolutionCache], optional): Cache to use. Defaults to the default directory.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Final value and policy arrays.
+    """
+    cache = cache if cache is not None else SolutionCache()
+    params = dict(target_score=target_score, die_sides=die_sides, max_turn=max_turn,
+                  epsilon=epsilon, method=method)
+
+    cached = cache.load(params)
+    if cached is None:
+        V, policy = pig_layered_value_iteration(target_score, die_sides, max_turn, epsilon, method)
+        cache.store(params, V, policy)
+        cached = cache.load(params)
+    return cached
@@ -0,0 +1,92 @@
+'''
+Command line solver for short-lived batch jobs.
+
+Start-up is kept small: the ahead-of-time kernels from `build_aot.py` are used when they
+have been built for the current `SOLVER_VERSION`, so numba is never imported, and
+otherwise the JIT kernels are loaded from numba's on-disk cache. A build for another
+version is reported on stderr and ignored. Nothing from the plotting stack is imported.
+
+A sub-second start only holds with the ahead-of-time build. The JIT path still pays for
+importing numba and loading the cached kernels, about a second, and several seconds on the
+first run while the cache is filled.
+
+    python notebook_writeup/solve_cli.py --target-score 100 --output solution.npz
+'''
+
+import time
+
+START = time.perf_counter()
+
+import os
+import sys
+import argparse
+import numpy as np
+from typing import List, Optional, Tuple
+
+# This makes imports around a directory a bit easier usually
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from solver_state import SOLVER_VERSION, _init_V_policy
+
+
+def solve(target_score: int,
+          die_sides: int,
+          max_turn: int,
+          epsilon: float,
+          method: str,
+          jit: bool = False) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Solves with the ahead-of-time kernels if built for this solver version and `jit` is False,
+    else with the JIT solver.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, str]: Value and policy arrays, and which backend ran.
+    """
+    kernel = None
+    if not jit:
+        try:
+            import _pig_aot
+            built = _pig_aot.solver_version() if hasattr(_pig_aot, 'solver_version') else None
+            if built == SOLVER_VERSION:
+                kernel = getattr(_pig_aot, method, None)
+            else:
+                print(f"ignoring _pig_aot built for solver version {built}, not {SOLVER_VERSION}; "
+                      f"rerun build_aot.py", file=sys.stderr)
+        except ImportError:
+            pass
+
+    if kernel is None:
+        from optimised_layered_vi import pig_layered_value_iteration
+        V, policy = pig_layered_value_iteration(target_score, die_sides, max_turn, epsilon, method)
+        return V, policy, 'jit'
+
+    V, policy = _init_V_policy(target_score, max_turn)
+    V, policy = kernel(V, policy, target_score, die_sides, max_turn, epsilon)
+    return V, policy, 'aot'
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Parses arguments, solves, and reports the result and the time since start-up.
+    """
+    parser = argparse.ArgumentParser(description="Solve Pig by layered value iteration.")
+    parser.add_argument('--target-score', type=int, default=100)
+    parser.add_argument('--die-sides', type=int, default=6)
+    parser.add_argument('--max-turn', type=int, default=None, help="Defaults to the target score.")
+    parser.add_argument('--epsilon', type=float, default=1e-6)
+    parser.add_argument('--method', choices=['direct', 'parallel', 'sweep', 'window'], default='direct')
+    parser.add_argument('--output', default=None, help="Optional .npz file to write V and policy to.")
+    parser.add_argument('--jit', action='store_true', help="Use the JIT kernels even if the AOT build exists.")
+    args = parser.parse_args(argv)
+
+    max_turn = args.target_score if args.max_turn is None else args.max_turn
+    V, policy, backend = solve(args.target_score, args.die_sides, max_turn, args.epsilon, args.method, args.jit)
+    if args.output:
+        np.savez(args.output, V=V, policy=policy)
+
+    print(f"P(first player wins) = {V[0, 0, 0]:.12f}")
+    print(f"backend = {backend}, elapsed = {time.perf_counter() - START:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
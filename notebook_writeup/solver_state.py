@@ -0,0 +1,35 @@
+'''
+The solver version and initial arrays, shared by the JIT solvers and the ahead-of-time build.
+
+Nothing here imports numba, so that `solve_cli.py` can set up a solve and check that the
+`_pig_aot` build matches the current kernels without paying numba's start-up cost.
+'''
+
+import numpy as np
+from typing import Tuple
+
+# Bump whenever a change to the kernels can alter their output, invalidating cached solutions
+# and ahead-of-time builds
+SOLVER_VERSION = 1
+
+
+def _init_V_policy(target_score: int, max_turn: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Initialises the value and policy arrays for all reachable states.
+
+    Args:
+        target_score (int): The score required to win the game.
+        max_turn (int): Maximum number of unbanked points to track (limits state space).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Zero-initialised value array and default policy (all roll).
+    """
+    ps = np.arange(target_score + 1)[:, None, None]
+    t = np.arange(max_turn + 1)[None, None, :]
+    shape = (target_score + 1, target_score + 1, max_turn + 1)
+
+    # Win as soon as ps + t reaches the target, where holding is the only sensible action
+    won = np.broadcast_to(ps + t >= target_score, shape)
+    V = won.astype(np.float64)
+    policy = (~won).astype(np.int64)
+    return V, policy
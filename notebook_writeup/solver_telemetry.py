@@ -0,0 +1,135 @@
+'''
+Telemetry for the layered value iteration solvers.
+
+The compiled solvers in `optimised_layered_vi` run every layer inside one kernel and only
+return the solution. Here the same solve is driven one `score_sum` layer at a time from
+Python, so each layer can be timed and its sweep count and final residual recorded. The
+layer kernels update states in the same order as the full solvers, so results are identical,
+and `pig_layered_value_iteration` itself is untouched and pays nothing for any of this.
+'''
+
+import time
+import numpy as np
+from typing import Callable, NamedTuple, Optional, Tuple
+
+try:
+    from .optimised_layered_vi import (_init_V_policy, _sweep_layer, _parallel_layer,
+                                       _direct_layer, _SOLVERS)
+except ImportError:
+    from optimised_layered_vi import (_init_V_policy, _sweep_layer, _parallel_layer,
+                                      _direct_layer, _SOLVERS)
+
+
+# One record per layer; `pd.DataFrame(report)` turns a report into a table
+LAYER_DTYPE = np.dtype([
+    ('score_sum', np.int64),          # ps + os of the layer
+    ('sweeps', np.int64),             # sweeps to converge (row-pair solves for 'direct')
+    ('max_diff', np.float64),         # largest change in the final sweep (residual for 'direct')
+    ('states', np.int64),             # state updates performed
+    ('seconds', np.float64),          # wall time spent on the layer
+    ('states_per_second', np.float64),
+])
+
+
+class SolverTelemetry(NamedTuple):
+    """
+    Result of `instrumented_layered_value_iteration`.
+
+    Attributes:
+        V (np.ndarray): Final value array.
+        policy (np.ndarray): Final policy array.
+        layers (np.ndarray): Per-layer report with dtype `LAYER_DTYPE`, in solve order.
+        seconds (float): Total wall time of the solve, including allocation.
+    """
+    V: np.ndarray
+    policy: np.ndarray
+    layers: np.ndarray
+    seconds: float
+
+    @property
+    def states_per_second(self) -> float:
+        """
+        State updates per second over the whole solve.
+        """
+        return float(self.layers['states'].sum() / self.seconds) if self.seconds > 0 else float('inf')
+
+
+def _run_layer(method: str,
+               V: np.ndarray,
+               policy: np.ndarray,
+               pair_diff: np.ndarray,
+               slope: np.ndarray,
+               score_sum: int,
+               target_score: int,
+               die_sides: int,
+               max_turn: int,
+               epsilon: float) -> Tuple[int, float, int]:
+    """
+    Solves one layer with the per-layer kernel of `method`, in the full solver's order.
+
+    Args:
+        pair_diff (np.ndarray): Scratch of length target_score for 'parallel'.
+        slope (np.ndarray): Scratch of length max_turn + 1 for 'direct'.
+
+    Returns:
+        Tuple[int, float, int]: Sweeps taken, final max_diff and number of state updates.
+    """
+    if method in ('sweep', 'window'):
+        return _sweep_layer(V, policy, score_sum, target_score, die_sides, max_turn, epsilon,
+                            method == 'window')
+    if method == 'parallel':
+        return _parallel_layer(V, policy, pair_diff, score_sum, target_score, die_sides, max_turn, epsilon)
+    return _direct_layer(V, policy, slope, score_sum, target_score, die_sides, max_turn)
+
+
+def instrumented_layered_value_iteration(target_score: int = 15,
+                                         die_sides: int = 6,
+                                         max_turn: int = 15,
+                                         epsilon: float = 1e-6,
+                                         method: str = 'sweep',
+                                         progress: Optional[Callable[[np.ndarray], None]] = None,
+                                         progress_every: int = 1) -> SolverTelemetry:
+    """
+    Runs `pig_layered_value_iteration` layer by layer, recording per-layer telemetry.
+
+    Args:
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        method (str, optional): 'sweep', 'parallel', 'direct' or 'window', as for
+                                `pig_layered_value_iteration`. Defaults to 'sweep'.
+        progress (Optional[Callable[[np.ndarray], None]]): Called with the report of the
+                                layers completed so far, every `progress_every` layers
+                                and once the last layer is done.
+        progress_every (int, optional): Layers between progress calls. Defaults to 1.
+
+    Returns:
+        SolverTelemetry: The solution together with the per-layer report.
+    """
+    if method not in _SOLVERS:
+        raise ValueError(f"Unknown method '{method}', expected one of {sorted(_SOLVERS)}.")
+    if progress_every < 1:
+        raise ValueError("progress_every must be at least 1.")
+
+    start = time.perf_counter()
+    V, policy = _init_V_policy(target_score, max_turn)
+    pair_diff = np.zeros(target_score)
+    slope = np.zeros(max_turn + 1)
+
+    n_layers = max(2 * target_score - 1, 0)
+    layers = np.zeros(n_layers, LAYER_DTYPE)
+
+    for i, score_sum in enumerate(range(n_layers - 1, -1, -1)):
+        layer_start = time.perf_counter()
+        sweeps, max_diff, states = _run_layer(method, V, policy, pair_diff, slope, score_sum,
+                                              target_score, die_sides, max_turn, epsilon)
+        seconds = time.perf_counter() - layer_start
+
+        layers[i] = (score_sum, sweeps, max_diff, states, seconds,
+                     states / seconds if seconds > 0 else np.inf)
+
+        if progress is not None and ((i + 1) % progress_every == 0 or i + 1 == n_layers):
+            progress(layers[:i + 1])
+
+    return SolverTelemetry(V, policy, layers, time.perf_counter() - start)
@@ -0,0 +1,259 @@
+'''
+Layer-streaming solver for targets too large to hold the solution in memory.
+
+A layer of states with ps + os = score_sum only reads its own states and the t = 0 values
+of higher layers. This solver keeps just those resident: the (target, target) plane of
+t = 0 values and a buffer for the layer being solved. Layers are solved in turn with the
+direct per-layer solver, and each finished layer is appended to `.npy` files on disk.
+Memory therefore grows with target^2 while only the files grow with target^3, and the
+files are memory-mapped back in for lookups.
+
+On disk the non-terminal states are stored layer by layer in solve order (decreasing
+score_sum), each layer row by row in increasing ps, and each row over t = 0..width - 1.
+'''
+
+import json
+import numpy as np
+from numba import njit
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+try:
+    from .optimised_layered_vi import SOLVER_VERSION, _solve_pair_fixed_point
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from optimised_layered_vi import SOLVER_VERSION, _solve_pair_fixed_point
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+def _stream_layout(target_score: int, max_turn: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the on-disk layout, in O(target) memory.
+
+    Args:
+        target_score (int): Score required to win.
+        max_turn (int): Maximum turn total represented.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Row widths by ps (length
+            target), their prefix sums (length target + 1), and the start and size of each
+            layer in the files, indexed by score_sum (length 2 * target - 1).
+    """
+    widths = np.minimum(max_turn, target_score - 1 - np.arange(target_score)) + 1
+    cum_widths = np.zeros(target_score + 1, np.int64)
+    cum_widths[1:] = np.cumsum(widths)
+
+    score_sum = np.arange(max(2 * target_score - 1, 0))
+    p_min = np.maximum(0, score_sum - target_score + 1)
+    p_max = np.minimum(target_score - 1, score_sum)
+    sizes = cum_widths[p_max + 1] - cum_widths[p_min]
+
+    # Layers are written from the highest score_sum down
+    starts = np.cumsum(sizes[::-1])[::-1] - sizes
+    return widths, cum_widths, starts, sizes
+
+
+@njit(cache=True)
+def _solve_layer(layer_values: np.ndarray,
+                 layer_policy: np.ndarray,
+                 cum_widths: np.ndarray,
+                 slope: np.ndarray,
+                 t0_plane: np.ndarray,
+                 score_sum: int,
+                 target_score: int,
+                 die_sides: int,
+                 max_turn: int) -> None:
+    """
+    Solves one layer into a zeroed buffer with the direct solver's pair routine.
+
+    Args:
+        layer_values (np.ndarray): float64 buffer of the layer's values (filled in).
+        layer_policy (np.ndarray): Buffer of the layer's policy (filled in).
+        cum_widths (np.ndarray): Prefix sums of the row widths.
+        slope (np.ndarray): Scratch array of length max_turn + 1.
+        t0_plane (np.ndarray): Dense (target, target) array of t = 0 values (updated in place).
+        score_sum (int): The layer's ps + os.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+    """
+    p_min = max(0, score_sum - target_score + 1)
+    p_max = min(target_score - 1, score_sum)
+    base = cum_widths[p_min]
+
+    for low in range(p_min, (p_min + p_max) // 2 + 1):
+        high = score_sum - low
+        lo_start, lo_end = cum_widths[low] - base, cum_widths[low + 1] - base
+        hi_start, hi_end = cum_widths[high] - base, cum_widths[high + 1] - base
+        _solve_pair_fixed_point(layer_values[lo_start:lo_end], layer_policy[lo_start:lo_end],
+                                layer_values[hi_start:hi_end], layer_policy[hi_start:hi_end],
+                                slope, t0_plane, low, high, target_score, die_sides, max_turn)
+        t0_plane[low, high] = layer_values[lo_start]
+        t0_plane[high, low] = layer_values[hi_start]
+
+
+def _write_npy_header(f, dtype: type, n: int) -> None:
+    """
+    Writes the header of a 1D `.npy` file whose data is then appended by hand.
+    """
+    header = dict(descr=np.lib.format.dtype_to_descr(np.dtype(dtype)), fortran_order=False, shape=(n,))
+    np.lib.format.write_array_header_2_0(f, header)
+
+
+class StreamedSolution:
+    """
+    A solution written by `streaming_layered_value_iteration`, memory-mapped from disk.
+
+    States are addressed with the same (ps, os, t) indices as the dense arrays, and the
+    lookups also answer for terminal states, as `CompactSolution` does.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """
+        Args:
+            directory (Union[str, Path]): Directory the solver wrote to.
+        """
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / 'meta.json').read_text())
+        self.target_score = meta['target_score']
+        self.die_sides = meta['die_sides']
+        self.max_turn = meta['max_turn']
+        self.values = np.load(self.directory / 'values.npy', mmap_mode='r')
+        self.policy = np.load(self.directory / 'policy.npy', mmap_mode='r')
+        self.t0_plane = np.load(self.directory / 't0_plane.npy', mmap_mode='r')
+        layout = _stream_layout(self.target_score, self.max_turn)
+        self.widths, self.cum_widths, self.layer_starts, self.layer_sizes = layout
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """
+        Shape of the equivalent dense arrays.
+        """
+        return (self.target_score + 1, self.target_score + 1, self.max_turn + 1)
+
+    @property
+    def n_states(self) -> int:
+        """
+        Number of non-terminal states stored.
+        """
+        return int(self.layer_sizes.sum())
+
+    def index(self, ps, os, t) -> np.ndarray:
+        """
+        Flat file index of non-terminal states (ps + t < target and os < target).
+
+        Raises:
+            IndexError: If any state is terminal or outside the stored range.
+        """
+        ps, os, t = (np.asarray(a, np.int64) for a in (ps, os, t))
+        T = self.target_score
+        if ((ps < 0) | (ps >= T) | (os < 0) | (os >= T) | (t < 0)
+                | (t > np.minimum(self.max_turn, T - ps - 1))).any():
+            raise IndexError(f"Only non-terminal states with 0 <= ps, os < {T} and "
+                             f"0 <= t <= min({self.max_turn}, {T} - ps - 1) are stored.")
+        score_sum = ps + os
+        p_min = np.maximum(0, score_sum - self.target_score + 1)
+        return self.layer_starts[score_sum] + self.cum_widths[ps] - self.cum_widths[p_min] + t
+
+    def _split(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Broadcasts the indices and returns them with a mask of the non-terminal states.
+
+        Raises:
+            IndexError: If any index lies outside the dense arrays' shape.
+        """
+        ps, os, t = np.broadcast_arrays(np.asarray(ps, np.int64),
+                                        np.asarray(os, np.int64),
+                                        np.asarray(t, np.int64))
+        T = self.target_score
+        if ((ps < 0) | (ps > T) | (os < 0) | (os > T) | (t < 0) | (t > self.max_turn)).any():
+            raise IndexError(f"State indices out of range for shape {self.shape}.")
+        stored = (ps + t < T) & (os < T)
+        return ps, os, t, stored
+
+    def value(self, ps, os, t) -> np.ndarray:
+        """
+        Win probability of the player to move, vectorised over the indices.
+        """
+        ps, os, t, stored = self._split(ps, os, t)
+        out = np.asarray(ps + t >= self.target_score, np.float64)
+        out[stored] = self.values[self.index(ps[stored], os[stored], t[stored])]
+        return out
+
+    def action(self, ps, os, t) -> np.ndarray:
+        """
+        Policy decision (0 = hold, 1 = roll), vectorised over the indices.
+        """
+        ps, os, t, stored = self._split(ps, os, t)
+        out = np.asarray(ps + t < self.target_score, np.uint8)
+        out[stored] = self.policy[self.index(ps[stored], os[stored], t[stored])]
+        return out
+
+    def dense_policy(self, dtype: type = np.uint8) -> np.ndarray:
+        """
+        Expands the policy to the dense layout of `pig_layered_value_iteration`; small targets only.
+        """
+        return self.action(*np.indices(self.shape)).astype(dtype)
+
+    def dense_values(self) -> np.ndarray:
+        """
+        Expands the values to the dense layout of `pig_layered_value_iteration`; small targets only.
+        """
+        return self.value(*np.indices(self.shape))
+
+
+def streaming_layered_value_iteration(directory: Union[str, Path],
+                                      target_score: int = 15,
+                                      die_sides: int = 6,
+                                      max_turn: Optional[int] = None,
+                                      value_dtype: type = np.float64) -> StreamedSolution:
+    """
+    Solves Pig layer by layer, spilling every finished layer to disk.
+
+    Resident memory is the t = 0 plane (8 target^2 bytes) and one layer's buffers. The files
+    hold (bytes per value + 1) bytes per non-terminal state, about target^2 * max_turn / 2
+    states when max_turn is close to the target.
+
+    Args:
+        directory (Union[str, Path]): Directory to write the solution to, created if missing.
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (Optional[int]): Maximum turn total to represent. Defaults to the target score.
+        value_dtype (type, optional): Storage type of the values on disk. Defaults to np.float64.
+
+    Returns:
+        StreamedSolution: The memory-mapped solution.
+    """
+    max_turn = target_score if max_turn is None else max_turn
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    _, cum_widths, _, layer_sizes = _stream_layout(target_score, max_turn)
+    n_states = int(layer_sizes.sum())
+    largest = int(layer_sizes.max(initial=0))
+
+    t0_plane = np.zeros((target_score, target_score))
+    slope = np.zeros(max_turn + 1)
+    layer_values = np.zeros(largest)
+    layer_policy = np.zeros(largest, np.int64)
+
+    with open(directory / 'values.npy', 'wb') as f_values, open(directory / 'policy.npy', 'wb') as f_policy:
+        _write_npy_header(f_values, value_dtype, n_states)
+        _write_npy_header(f_policy, np.uint8, n_states)
+
+        for score_sum in range(2 * target_score - 2, -1, -1):
+            size = int(layer_sizes[score_sum])
+            values, policy = layer_values[:size], layer_policy[:size]
+            values[:] = 0.0
+            _solve_layer(values, policy, cum_widths, slope, t0_plane,
+                         score_sum, target_score, die_sides, max_turn)
+            values.astype(value_dtype).tofile(f_values)
+            policy.astype(np.uint8).tofile(f_policy)
+
+    np.save(directory / 't0_plane.npy', t0_plane)
+    meta = dict(target_score=target_score, die_sides=die_sides, max_turn=max_turn,
+                value_dtype=np.dtype(value_dtype).str, solver_version=SOLVER_VERSION)
+    (directory / 'meta.json').write_text(json.dumps(meta, sort_keys=True))
+    return StreamedSolution(directory)
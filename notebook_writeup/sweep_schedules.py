@@ -0,0 +1,287 @@
+'''
+Alternative update schedules for the layered sweeps, with their sweep counts.
+
+`_layered_vi` updates every state of a layer in increasing t, over and over, until the
+largest change is below epsilon. Three changes to that schedule can be combined here:
+
+- successive over-relaxation, moving each value omega times the Bellman update;
+- reverse-t ordering, sweeping each row from its highest turn total down, so that the
+  states a roll lands on are already updated when they are read;
+- prioritised sweeping, revisiting a row only while its own last update moved a value by
+  at least the threshold, or the one value it reads from the rest of the layer (the
+  opponent's V[os, ps, 0]) has since moved by at least the threshold in total.
+
+Each solve returns the same per-layer report as `instrumented_layered_value_iteration`,
+so schedules can be compared on sweeps, state updates and time per target size.
+'''
+
+import time
+import numpy as np
+from numba import njit
+from typing import Dict, Optional, Tuple
+
+try:
+    from .optimised_layered_vi import _init_V_policy, _row_width, pig_layered_value_iteration
+    from .solver_telemetry import LAYER_DTYPE, SolverTelemetry
+    from .kernel_cache import share_kernel_cache
+except ImportError:
+    from optimised_layered_vi import _init_V_policy, _row_width, pig_layered_value_iteration
+    from solver_telemetry import LAYER_DTYPE, SolverTelemetry
+    from kernel_cache import share_kernel_cache
+
+share_kernel_cache(__name__)
+
+
+# Schedules run by `compare_schedules` unless others are given
+DEFAULT_SCHEDULES = {
+    'gauss_seidel': dict(),
+    'sor_1.2': dict(omega=1.2),
+    'reverse': dict(reverse=True),
+    'prioritised': dict(prioritised=True),
+    'reverse_prioritised': dict(reverse=True, prioritised=True),
+}
+
+# One record per schedule
+SCHEDULE_DTYPE = np.dtype([
+    ('name', 'U32'),
+    ('sweeps', np.int64),        # sweeps summed over layers
+    ('states', np.int64),        # state updates performed
+    ('seconds', np.float64),     # wall time of the solve
+    ('max_error', np.float64),   # largest difference from the direct solver's values
+    ('converged', np.bool_),     # every layer converged within max_sweeps
+])
+
+
+@njit(cache=True)
+def _scheduled_row(V: np.ndarray,
+                   policy: np.ndarray,
+                   ps: int,
+                   os: int,
+                   target_score: int,
+                   die_sides: int,
+                   max_turn: int,
+                   omega: float,
+                   reverse: bool) -> float:
+    """
+    `_sweep_row` with over-relaxation and an optional reversed order of turn totals.
+
+    With omega = 1 and reverse False the updates are exactly those of `_sweep_row`.
+
+    Returns:
+        float: Largest Bellman residual |update - value| met in the row.
+    """
+    roll_prob = 1.0 / die_sides
+    max_diff = 0.0
+    width = min(max_turn, target_score - ps - 1) + 1
+
+    for i in range(width):
+        t = width - 1 - i if reverse else i
+
+        # Compute expected value of rolling
+        roll_value = roll_prob * (1.0 - V[os, ps, 0])
+        for r in range(2, die_sides + 1):
+            new_t = t + r
+            if ps + new_t >= target_score:
+                roll_value += roll_prob * 1.0
+            elif new_t <= max_turn:
+                roll_value += roll_prob * V[ps, os, new_t]
+
+        # Compute value of holding
+        if t > 0:
+            hold_value = 1.0 - V[os, ps + t, 0]
+        else:
+            hold_value = 0.0
+
+        # Select better action
+        if roll_value >= hold_value:
+            new_v = roll_value
+            policy_val = 1
+        else:
+            new_v = hold_value
+            policy_val = 0
+
+        diff = abs(V[ps, os, t] - new_v)
+        if diff > max_diff:
+            max_diff = diff
+
+        if omega != 1.0:
+            new_v = V[ps, os, t] + omega * (new_v - V[ps, os, t])
+        V[ps, os, t] = new_v
+        policy[ps, os, t] = policy_val
+
+    return max_diff
+
+
+@njit(cache=True)
+def _scheduled_layer(V: np.ndarray,
+                     policy: np.ndarray,
+                     dirty: np.ndarray,
+                     drift: np.ndarray,
+                     score_sum: int,
+                     target_score: int,
+                     die_sides: int,
+                     max_turn: int,
+                     epsilon: float,
+                     omega: float,
+                     reverse: bool,
+                     prioritised: bool,
+                     threshold: float,
+                     max_sweeps: int) -> Tuple[int, float, int]:
+    """
+    Sweeps a single layer to convergence under the chosen schedule.
+
+    Without prioritisation every row is swept until the largest residual is below epsilon,
+    as in `_sweep_layer`. With it, only dirty rows are swept, until none are left. Either
+    way the layer is abandoned after `max_sweeps` sweeps, as over-relaxation can cycle
+    around the kinks of the max over actions instead of converging.
+
+    Args:
+        V (np.ndarray): Value function array (updated in place).
+        policy (np.ndarray): Policy array (updated in place).
+        dirty (np.ndarray): Scratch flags by ps, of length at least target_score.
+        drift (np.ndarray): Scratch by ps for the change in the opponent's t = 0 value
+                            since the row was last swept.
+        score_sum (int): The layer's ps + os.
+        target_score (int): Score threshold to win the game.
+        die_sides (int): Number of faces on the die.
+        max_turn (int): Max turn total tracked.
+        epsilon (float): Convergence threshold.
+        omega (float): Relaxation factor, 1 for plain Gauss-Seidel.
+        reverse (bool): Sweep rows from the highest turn total down.
+        prioritised (bool): Only revisit rows that may still move by `threshold`.
+        threshold (float): Change below which a row is left alone when prioritised.
+        max_sweeps (int): Sweeps after which the layer is left unconverged.
+
+    Returns:
+        Tuple[int, float, int]: Sweeps taken, final largest residual and number of state updates.
+    """
+    p_min = max(0, score_sum - target_score + 1)
+    p_max = min(target_score - 1, score_sum)
+    for ps in range(p_min, p_max + 1):
+        dirty[ps] = True
+        drift[ps] = 0.0
+
+    sweeps = 0
+    states = 0
+    while True:
+        max_diff = 0.0
+        for ps in range(p_min, p_max + 1):
+            if prioritised and not dirty[ps]:
+                continue
+            os = score_sum - ps
+            before = V[ps, os, 0]
+            diff = _scheduled_row(V, policy, ps, os, target_score, die_sides, max_turn, omega, reverse)
+            states += _row_width(ps, target_score, max_turn)
+            if diff > max_diff:
+                max_diff = diff
+
+            # Row os reads V[ps, os, 0]; a row that is its own opponent is covered by diff
+            dirty[ps] = diff >= threshold
+            drift[ps] = 0.0
+            if os != ps:
+                drift[os] += abs(V[ps, os, 0] - before)
+                if drift[os] >= threshold:
+                    dirty[os] = True
+        sweeps += 1
+
+        if prioritised:
+            done = True
+            for ps in range(p_min, p_max + 1):
+                if dirty[ps]:
+                    done = False
+                    break
+        else:
+            done = max_diff < epsilon
+        if done or sweeps >= max_sweeps:
+            return sweeps, max_diff, states
+
+
+def scheduled_layered_value_iteration(target_score: int = 15,
+                                      die_sides: int = 6,
+                                      max_turn: int = 15,
+                                      epsilon: float = 1e-6,
+                                      omega: float = 1.0,
+                                      reverse: bool = False,
+                                      prioritised: bool = False,
+                                      threshold: Optional[float] = None,
+                                      max_sweeps: int = 10000) -> SolverTelemetry:
+    """
+    Layered value iteration under a chosen update schedule, reporting every layer.
+
+    With the defaults the updates are those of `pig_layered_value_iteration`'s 'sweep'
+    method and the results identical.
+
+    Args:
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        omega (float, optional): Over-relaxation factor in (0, 2). Defaults to 1.0.
+        reverse (bool, optional): Sweep turn totals in decreasing order. Defaults to False.
+        prioritised (bool, optional): Only revisit rows whose values may still move.
+                                      Defaults to False.
+        threshold (Optional[float]): Change below which rows are not revisited when
+                                     prioritised. Defaults to epsilon.
+        max_sweeps (int, optional): Sweeps per layer after which the layer is given up on,
+                                    visible as a final `max_diff` of at least epsilon in
+                                    its report. Defaults to 10000.
+
+    Returns:
+        SolverTelemetry: The solution with sweeps, residual, state updates and time per layer.
+    """
+    if not 0 < omega < 2:
+        raise ValueError("omega must lie strictly between 0 and 2.")
+    threshold = epsilon if threshold is None else threshold
+
+    start = time.perf_counter()
+    V, policy = _init_V_policy(target_score, max_turn)
+    dirty = np.zeros(max(target_score, 1), np.bool_)
+    drift = np.zeros(max(target_score, 1))
+
+    n_layers = max(2 * target_score - 1, 0)
+    layers = np.zeros(n_layers, LAYER_DTYPE)
+    for i, score_sum in enumerate(range(n_layers - 1, -1, -1)):
+        layer_start = time.perf_counter()
+        sweeps, max_diff, states = _scheduled_layer(V, policy, dirty, drift, score_sum, target_score,
+                                                    die_sides, max_turn, epsilon, omega, reverse,
+                                                    prioritised, threshold, max_sweeps)
+        seconds = time.perf_counter() - layer_start
+        layers[i] = (score_sum, sweeps, max_diff, states, seconds,
+                     states / seconds if seconds > 0 else np.inf)
+
+    return SolverTelemetry(V, policy, layers, time.perf_counter() - start)
+
+
+def compare_schedules(target_score: int = 15,
+                      die_sides: int = 6,
+                      max_turn: int = 15,
+                      epsilon: float = 1e-6,
+                      schedules: Optional[Dict[str, Dict]] = None) -> np.ndarray:
+    """
+    Solves once per schedule and tabulates the work done against the accuracy reached.
+
+    Args:
+        target_score (int, optional): Score needed to win. Defaults to 15.
+        die_sides (int, optional): Number of sides on the die. Defaults to 6.
+        max_turn (int, optional): Maximum turn total to represent. Defaults to 15.
+        epsilon (float, optional): Convergence threshold. Defaults to 1e-6.
+        schedules (Optional[Dict[str, Dict]]): Keyword arguments of
+            `scheduled_layered_value_iteration` by name. Defaults to `DEFAULT_SCHEDULES`.
+
+    Returns:
+        np.ndarray: One record per schedule with dtype `SCHEDULE_DTYPE`, errors measured
+            against the direct solver's exact solution.
+    """
+    schedules = DEFAULT_SCHEDULES if schedules is None else schedules
+    V_exact, _ = pig_layered_value_iteration(target_score, die_sides, max_turn, method='direct')
+
+    table = np.zeros(len(schedules), SCHEDULE_DTYPE)
+    for row, (name, kwargs) in zip(table, schedules.items()):
+        result = scheduled_layered_value_iteration(target_score, die_sides, max_turn, epsilon, **kwargs)
+        row['name'] = name
+        row['sweeps'] = result.layers['sweeps'].sum()
+        row['states'] = result.layers['states'].sum()
+        row['seconds'] = result.seconds
+        row['max_error'] = np.abs(result.V - V_exact).max()
+        row['converged'] = (result.layers['sweeps'] < kwargs.get('max_sweeps', 10000)).all()
+    return table
@@ -0,0 +1,225 @@
+'''
+Threshold-compressed storage of a policy.
+
+Along almost every (ps, os) row, the optimal policy rolls while the turn total is below a
+threshold and holds from there on. Close to the target a second band of rolling appears,
+where a player with a large turn total keeps rolling for the win. Hold-at-n opponents
+follow the same shape. Each row is therefore stored as three breakpoints:
+
+    roll if t < hold_at  or  reroll_at <= t < stop_at,  otherwise hold
+
+Cells that do not follow this rule are listed separately as exceptions, which makes the
+format lossless for any 0/1 policy. For the optimal policy of the standard game this is a
+few hundred cells out of a million. Lookups are vectorised over arrays of states.
+'''
+
+import numpy as np
+from typing import Optional, Tuple, Union
+
+try:
+    from .compact_storage import CompactSolution
+except ImportError:
+    from compact_storage import CompactSolution
+
+
+def _first(mask: np.ndarray) -> np.ndarray:
+    """
+    Index of the first True along the last axis, or its length if there is none.
+    """
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), mask.shape[-1])
+
+
+class ThresholdPolicy:
+    """
+    A policy stored as per-(ps, os) breakpoints plus a sorted list of exception cells,
+    optionally carrying the win probabilities for lookups.
+    """
+
+    def __init__(self,
+                 hold_at: np.ndarray,
+                 reroll_at: np.ndarray,
+                 stop_at: np.ndarray,
+                 exceptions: np.ndarray,
+                 n_turns: int,
+                 values: Optional[CompactSolution] = None) -> None:
+        """
+        Wraps existing breakpoints and exceptions.
+
+        Args:
+            hold_at (np.ndarray): First turn total at which each row holds.
+            reroll_at (np.ndarray): Start of each row's second rolling band.
+            stop_at (np.ndarray): End (exclusive) of each row's second rolling band.
+            exceptions (np.ndarray): Sorted flat indices, into the dense policy, of the
+                                     cells whose action is the opposite of the rule.
+            n_turns (int): Number of turn totals in the dense policy (max_turn + 1).
+            values (Optional[CompactSolution]): Win probabilities to answer lookups with.
+        """
+        self.hold_at = hold_at
+        self.reroll_at = reroll_at
+        self.stop_at = stop_at
+        self.exceptions = exceptions
+        self.n_turns = n_turns
+        self.values = values
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """
+        Shape of the equivalent dense policy.
+        """
+        return self.hold_at.shape + (self.n_turns,)
+
+    @property
+    def n_exceptions(self) -> int:
+        """
+        Number of cells not following the threshold rule.
+        """
+        return int(self.exceptions.size)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the policy, and by the values if present.
+        """
+        policy_bytes = sum(a.nbytes for a in (self.hold_at, self.reroll_at, self.stop_at, self.exceptions))
+        return policy_bytes + (self.values.nbytes if self.values is not None else 0)
+
+    @classmethod
+    def from_dense(cls,
+                   policy: np.ndarray,
+                   values: Union[np.ndarray, CompactSolution, None] = None,
+                   value_dtype: type = np.float32) -> 'ThresholdPolicy':
+        """
+        Compresses a dense 0/1 policy, such as the output of `pig_layered_value_iteration`.
+
+        Args:
+            policy (np.ndarray): Dense policy array (0 = hold, 1 = roll).
+            values (Union[np.ndarray, CompactSolution, None]): Optional win probabilities,
+                either the dense value array of the same solve or a compact solution.
+            value_dtype (type, optional): Storage type when compacting dense values.
+                                          Defaults to np.float32.
+
+        Returns:
+            ThresholdPolicy: The compressed policy.
+        """
+        policy = np.asarray(policy)
+        if not np.isin(policy, (0, 1)).all():
+            raise ValueError("Only deterministic 0/1 policies can be threshold-compressed.")
+
+        rows = policy.astype(bool)
+        t = np.arange(policy.shape[2])
+        hold_at = _first(~rows)
+        reroll_at = _first(rows & (t >= hold_at[..., None]))
+        stop_at = _first(~rows & (t >= reroll_at[..., None]))
+
+        rule = (t < hold_at[..., None]) | ((t >= reroll_at[..., None]) & (t < stop_at[..., None]))
+        exceptions = np.flatnonzero(rule != rows)
+
+        if isinstance(values, np.ndarray):
+            values = CompactSolution.from_dense(values, policy, values.shape[0] - 1, value_dtype)
+
+        dtype = np.min_scalar_type(policy.shape[2])
+        return cls(hold_at.astype(dtype), reroll_at.astype(dtype), stop_at.astype(dtype),
+                   exceptions, policy.shape[2], values)
+
+    @classmethod
+    def from_compact(cls, solution: CompactSolution) -> 'ThresholdPolicy':
+        """
+        Compresses the policy of a compact solution, keeping its values for lookups.
+        """
+        return cls.from_dense(solution.dense_policy(), solution)
+
+    def dense_policy(self, dtype: type = np.uint8) -> np.ndarray:
+        """
+        Expands to the dense layout used by `Competition` and the plotting code.
+
+        Args:
+            dtype (type, optional): Element type of the dense array. Defaults to np.uint8.
+
+        Returns:
+            np.ndarray: The original dense policy.
+        """
+        t = np.arange(self.n_turns)
+        dense = ((t < self.hold_at[..., None])
+                 | ((t >= self.reroll_at[..., None]) & (t < self.stop_at[..., None])))
+        dense.ravel()[self.exceptions] ^= True
+        return dense.astype(dtype)
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The dense int64 policy, as returned by `pig_layered_value_iteration`.
+        """
+        return self.dense_policy(np.int64)
+
+    def _indices(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Broadcasts the indices, clamping them into the policy's shape as `PolicyTable.query` does.
+        """
+        ps, os, t = np.broadcast_arrays(np.asarray(ps, np.int64),
+                                        np.asarray(os, np.int64),
+                                        np.asarray(t, np.int64))
+        shape = self.shape
+        return (np.minimum(np.maximum(ps, 0), shape[0] - 1),
+                np.minimum(np.maximum(os, 0), shape[1] - 1),
+                np.minimum(np.maximum(t, 0), shape[2] - 1))
+
+    def action(self, ps, os, t) -> np.ndarray:
+        """
+        Policy decision (0 = hold, 1 = roll), vectorised over the indices.
+        """
+        ps, os, t = self._indices(ps, os, t)
+        roll = (t < self.hold_at[ps, os]) | ((t >= self.reroll_at[ps, os]) & (t < self.stop_at[ps, os]))
+
+        if self.exceptions.size:
+            flat = np.ravel_multi_index((ps, os, t), self.shape)
+            pos = np.minimum(np.searchsorted(self.exceptions, flat), self.exceptions.size - 1)
+            roll ^= self.exceptions[pos] == flat
+        return roll.astype(np.uint8)
+
+    def win_probability(self, ps, os, t) -> np.ndarray:
+        """
+        Win probability of the player to move, vectorised over the indices.
+        """
+        if self.values is None:
+            raise ValueError("This policy was compressed without values.")
+        return self.values.value(*self._indices(ps, os, t))
+
+    def query(self, ps, os, t) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Looks up actions and win probabilities of a batch of states in one call.
+
+        Args:
+            ps: Player score(s).
+            os: Opponent score(s).
+            t: Turn total(s).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The actions and win probabilities, broadcast to
+                the shape of the indices.
+        """
+        return self.action(ps, os, t), self.win_probability(ps, os, t)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the compressed policy, and its values if present, to an .npz file.
+        """
+        arrays = dict(hold_at=self.hold_at, reroll_at=self.reroll_at, stop_at=self.stop_at,
+                      exceptions=self.exceptions, n_turns=self.n_turns)
+        if self.values is not None:
+            arrays.update(values=self.values.values, value_policy=self.values.policy,
+                          target_score=self.values.target_score, max_turn=self.values.max_turn,
+                          packed=self.values.packed)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'ThresholdPolicy':
+        """
+        Reads a policy written by `save`.
+        """
+        with np.load(path) as f:
+            values = None
+            if 'values' in f:
+                values = CompactSolution(f['values'], f['value_policy'], int(f['target_score']),
+                                         int(f['max_turn']), bool(f['packed']))
+            return cls(f['hold_at'], f['reroll_at'], f['stop_at'], f['exceptions'],
+                       int(f['n_turns']), values)
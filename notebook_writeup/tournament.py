@@ -0,0 +1,267 @@
+'''
+Round-robin tournaments between a pool of policies.
+
+Every ordered pairing is played as a `Competition` with the compiled engine, so both seat
+orders are covered, and pairings run concurrently on separate cores (the kernel releases the
+GIL). Each pairing's result is cached under a hash of the two policies' contents, the seed
+and the game settings, in memory and optionally on disk, so adding a policy to the pool
+only plays the pairings that involve it and re-running a tournament plays nothing.
+
+The seed of each pairing is derived from the tournament seed and the two policy hashes,
+so a result does not depend on which other policies are in the pool.
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    from .competition import Competition, Opponents
+    from .compact_storage import as_dense_policy
+except ImportError:
+    from competition import Competition, Opponents
+    from compact_storage import as_dense_policy
+
+
+# Bump when the simulation engine changes, invalidating cached results
+RESULT_VERSION = 2
+
+# One record per policy, sorted by rating
+RATING_DTYPE = np.dtype([
+    ('name', 'U64'),
+    ('rating', np.float64),          # Bradley-Terry strength on the Elo scale, mean zero
+    ('mean_win_rate', np.float64),   # seat-averaged win rate against the rest of the pool
+    ('games', np.int64),             # games played, in both seats
+])
+
+
+def policy_hash(policy) -> str:
+    """
+    Content hash of a policy, independent of its integer type and storage format.
+
+    Args:
+        policy: Dense policy array, or any compact format accepted by `Competition`.
+
+    Returns:
+        str: Hex digest of the policy's shape and 0/1 actions.
+    """
+    dense = np.ascontiguousarray(as_dense_policy(policy), dtype=np.uint8)
+    digest = hashlib.sha256(str(dense.shape).encode())
+    digest.update(dense.tobytes())
+    return digest.hexdigest()[:32]
+
+
+def hold_at_pool(ns: Iterable[int]) -> Dict[str, np.ndarray]:
+    """
+    Hold-at-n opponents for a pool, stored as uint8 to take an eighth of the memory.
+
+    Args:
+        ns (Iterable[int]): Hold thresholds.
+
+    Returns:
+        Dict[str, np.ndarray]: Policies named 'hold_at_<n>'.
+    """
+    return {f'hold_at_{n}': Opponents.hold_at_n(n).astype(np.uint8) for n in ns}
+
+
+class TournamentResult(NamedTuple):
+    """
+    Result of `Tournament.run`.
+
+    Attributes:
+        names (List[str]): Policy names, indexing the matrices.
+        first_seat (np.ndarray): Win rate of row moving first against column (NaN on the diagonal).
+        win_matrix (np.ndarray): Win rate of row against column averaged over both seats,
+                                 so that win_matrix + win_matrix.T = 1 off the diagonal.
+        ratings (np.ndarray): Rating table with dtype `RATING_DTYPE`, strongest first.
+        computed (int): Pairings played in this run.
+        cached (int): Pairings answered from the cache.
+    """
+    names: List[str]
+    first_seat: np.ndarray
+    win_matrix: np.ndarray
+    ratings: np.ndarray
+    computed: int
+    cached: int
+
+
+def _bradley_terry(wins: np.ndarray, games: np.ndarray, iterations: int = 1000) -> np.ndarray:
+    """
+    Fits Bradley-Terry strengths by minorisation-maximisation and returns them on the Elo scale.
+
+    Half a win and half a loss are added to every pairing, so that a policy beating all
+    others still gets a finite rating.
+
+    Args:
+        wins (np.ndarray): wins[i, j] is the number of games i won against j.
+        games (np.ndarray): games[i, j] is the number of games between i and j.
+        iterations (int, optional): Maximum number of updates. Defaults to 1000.
+
+    Returns:
+        np.ndarray: Ratings with mean zero, a 400 point gap meaning 10 to 1 odds.
+    """
+    n = wins.shape[0]
+    off_diagonal = ~np.eye(n, dtype=bool)
+    wins = wins + 0.5 * off_diagonal
+    games = games + 1.0 * off_diagonal
+    total_wins = wins.sum(axis=1)
+    strength = np.ones(n)
+    for _ in range(iterations):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = total_wins / denominator
+        updated /= np.exp(np.log(updated).mean())
+        if np.max(np.abs(updated - strength)) < 1e-12:
+            strength = updated
+            break
+        strength = updated
+    return 400 * np.log10(strength)
+
+
+class Tournament:
+    """
+    A pool of named policies playing every ordered pairing, with cached results.
+    """
+
+    def __init__(self,
+                 pool: Optional[Dict[str, object]] = None,
+                 replications: int = 10000,
+                 seed: int = 0,
+                 target_score: int = 100,
+                 die_sides: int = 6,
+                 workers: Optional[int] = None,
+                 cache_dir: Union[str, Path, None] = None) -> None:
+        """
+        Args:
+            pool (Optional[Dict[str, object]]): Named policies, as dense arrays or any compact
+                                                format accepted by `Competition`.
+            replications (int, optional): Games per ordered pairing. Defaults to 10000.
+            seed (int, optional): Tournament seed. Defaults to 0.
+            target_score (int, optional): Score required to win. Defaults to 100.
+            die_sides (int, optional): Number of faces on the die. Defaults to 6.
+            workers (Optional[int]): Pairings played at once. Defaults to the number of cores.
+            cache_dir (Union[str, Path, None]): Directory to keep results in between sessions;
+                                                results are only kept in memory if None.
+        """
+        self.policies: Dict[str, np.ndarray] = {}
+        self.hashes: Dict[str, str] = {}
+        self.replications = replications
+        self.seed = seed
+        self.target_score = target_score
+        self.die_sides = die_sides
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._results: Dict[str, int] = {}
+        for name, policy in (pool or {}).items():
+            self.add(name, policy)
+
+    def add(self, name: str, policy) -> None:
+        """
+        Adds (or replaces) a policy in the pool.
+
+        Args:
+            name (str): Name of the policy in the results.
+            policy: Dense policy array or compact policy.
+        """
+        self.policies[name] = as_dense_policy(policy)
+        self.hashes[name] = policy_hash(policy)
+
+    def remove(self, name: str) -> None:
+        """
+        Removes a policy from the pool; its cached results are kept.
+        """
+        del self.policies[name]
+        del self.hashes[name]
+
+    def _key(self, first: str, second: str) -> Tuple[str, int]:
+        """
+        Cache key and seed of the pairing with `first` moving first.
+        """
+        params = dict(first=self.hashes[first], second=self.hashes[second], seed=self.seed,
+                      replications=self.replications, target_score=self.target_score,
+                      die_sides=self.die_sides, result_version=RESULT_VERSION)
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        return digest[:32], int(digest[32:48], 16)
+
+    def _lookup(self, key: str) -> Optional[int]:
+        """
+        Player 1's wins for a cached pairing, from memory or disk, or None on a miss.
+        """
+        if key not in self._results and self.cache_dir is not None:
+            path = self.cache_dir / f'{key}.json'
+            if path.exists():
+                self._results[key] = json.loads(path.read_text())['wins']
+        return self._results.get(key)
+
+    def _store(self, key: str, first: str, second: str, wins: int) -> None:
+        """
+        Records a pairing's result, writing it to disk atomically when there is a cache directory.
+        """
+        self._results[key] = wins
+        if self.cache_dir is None:
+            return
+        entry = dict(wins=wins, games=self.replications, first=self.hashes[first],
+                     second=self.hashes[second], first_name=first, second_name=second)
+        handle, staging = tempfile.mkstemp(dir=self.cache_dir, prefix='.staging-')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(entry, f, sort_keys=True)
+        os.replace(staging, self.cache_dir / f'{key}.json')
+
+    def _play(self, first: str, second: str, seed: int) -> int:
+        """
+        Plays one ordered pairing and returns the first player's wins.
+        """
+        competition = Competition(self.policies[first], self.policies[second], self.replications,
+                                  seed, self.target_score, self.die_sides, compiled=True)
+        return int(round(competition() * self.replications))
+
+    def run(self) -> TournamentResult:
+        """
+        Plays every ordered pairing missing from the cache and tabulates the results.
+
+        Returns:
+            TournamentResult: Win-rate matrices and the rating table.
+        """
+        names = list(self.policies)
+        n = len(names)
+        pairings = [(i, j) for i in range(n) for j in range(n) if i != j]
+        keys = {(i, j): self._key(names[i], names[j]) for i, j in pairings}
+        missing = [(i, j) for i, j in pairings if self._lookup(keys[i, j][0]) is None]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {(i, j): pool.submit(self._play, names[i], names[j], keys[i, j][1])
+                           for i, j in missing}
+                for (i, j), future in futures.items():
+                    self._store(keys[i, j][0], names[i], names[j], future.result())
+
+        # first_wins[i, j] is the number of games row won moving first against column
+        first_wins = np.zeros((n, n))
+        for i, j in pairings:
+            first_wins[i, j] = self._lookup(keys[i, j][0])
+        reps = self.replications
+        first_seat = first_wins / reps
+        np.fill_diagonal(first_seat, np.nan)
+
+        # Wins of row against column over both seats
+        wins = first_wins + (reps - first_wins.T)
+        np.fill_diagonal(wins, 0)
+        games = np.full((n, n), 2.0 * reps)
+        np.fill_diagonal(games, 0)
+        win_matrix = np.where(games > 0, wins / np.maximum(games, 1), np.nan)
+
+        ratings = np.zeros(n, RATING_DTYPE)
+        ratings['name'] = names
+        ratings['rating'] = _bradley_terry(wins, games) if n > 1 else 0.0
+        ratings['mean_win_rate'] = wins.sum(axis=1) / np.maximum(games.sum(axis=1), 1)
+        ratings['games'] = games.sum(axis=1)
+        ratings = ratings[np.argsort(-ratings['rating'], kind='stable')]
+
+        return TournamentResult(names, first_seat, win_matrix, ratings,
+                                len(missing), len(pairings) - len(missing))
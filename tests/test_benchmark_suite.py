@@ -0,0 +1,47 @@
+'''
+The content of this test checks that the benchmark suite runs every benchmark
+of the quick grid and that its results can be compared between runs.
+'''
+
+import sys
+import os
+import json
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.benchmark_suite import build_grid, run_suite, compare
+
+
+def test_quick_grid_runs(tmp_path):
+    '''
+    Every case either runs or is skipped for a missing optional dependency, and the output is JSON
+    '''
+    output = tmp_path / 'benchmarks.json'
+    report = run_suite('quick', repeats=1, isolate=False, output=str(output))
+
+    assert len(report['results']) == len(build_grid('quick'))
+    for result in report['results']:
+        assert result['status'] in ('ok', 'skipped')
+        if result['status'] == 'ok':
+            assert result['seconds_min'] > 0
+            assert result['peak_traced_bytes'] >= 0
+    assert {'Competition', 'PigletSolver', 'pig_layered_value_iteration', 'modelling_state_space'} <= \
+        {r['benchmark'] for r in report['results'] if r['status'] == 'ok'}
+    assert json.loads(output.read_text()) == report
+
+
+def test_compare_flags_regressions():
+    '''
+    Comparing a run with itself shows no regressions; a doubled time is flagged
+    '''
+    report = run_suite('quick', repeats=1, isolate=False, benchmarks=['pig_layered_value_iteration'])
+    assert not any(row['regressed'] for row in compare(report, report))
+
+    slower = json.loads(json.dumps(report))
+    slower['results'][0]['seconds_min'] *= 2
+    rows = compare(report, slower)
+    assert len(rows) == len(report['results'])
+    assert rows[0]['regressed'] and not any(row['regressed'] for row in rows[1:])
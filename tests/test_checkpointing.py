@@ -0,0 +1,58 @@
+'''
+The content of this test checks that a layered value iteration solve 
+stopped part way and resumed from its checkpoints gives exactly the 
+arrays of an uninterrupted solve.
+'''
+
+import sys
+import os
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.checkpointing import checkpointed_layered_value_iteration, resume_layered_value_iteration
+
+TARGET_SCORE = 30
+DICE_SIZE = 6
+MAX_TURN = 30
+
+
+def test_resume_matches_uninterrupted(tmp_path):
+    '''
+    A solve split over several calls, as by preemption, ends with identical arrays
+    '''
+    for method in ('sweep', 'direct'):
+        V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6, method)
+        directory = tmp_path / method
+
+        partial = checkpointed_layered_value_iteration(directory, TARGET_SCORE, DICE_SIZE, MAX_TURN,
+                                                       1e-6, method, every=4, max_layers=10)
+        assert not partial.complete and partial.next_score_sum == 2 * TARGET_SCORE - 12
+
+        partial = resume_layered_value_iteration(directory, every=3, max_layers=25)
+        assert partial.next_score_sum == 2 * TARGET_SCORE - 37
+
+        result = resume_layered_value_iteration(directory)
+        assert result.complete
+        assert_array_equal(result.V, V)
+        assert_array_equal(result.policy, policy)
+
+        # a finished checkpoint is simply reloaded
+        assert_array_equal(resume_layered_value_iteration(directory).V, V)
+
+
+def test_checkpoint_of_other_solve_rejected(tmp_path):
+    '''
+    A directory holding another solve's checkpoint is not resumed by mistake
+    '''
+    checkpointed_layered_value_iteration(tmp_path, 10, 6, 10, max_layers=3)
+    with pytest.raises(ValueError):
+        checkpointed_layered_value_iteration(tmp_path, 12, 6, 12)
+    with pytest.raises(FileNotFoundError):
+        resume_layered_value_iteration(tmp_path / 'empty')
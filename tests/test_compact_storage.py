@@ -0,0 +1,62 @@
+'''
+The content of this test checks that the compact triangular storage 
+reproduces the dense solver output, and that its lookups agree with 
+indexing the dense arrays.
+'''
+
+import sys
+import os
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.compact_storage import CompactSolution, compact_layered_value_iteration
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+
+
+def test_compact_solver_matches_dense():
+    '''
+    Solving straight into float64 storage gives the dense direct solution exactly
+    '''
+    V, policy = pig_layered_value_iteration(40, 6, 30, method='direct')
+    solution = compact_layered_value_iteration(40, 6, 30, value_dtype=np.float64, packed=True)
+    V_dense, policy_dense = solution.to_dense()
+
+    assert_array_equal(V_dense, V)
+    assert_array_equal(policy_dense, policy)
+
+
+def test_lookups_match_dense_indexing():
+    '''
+    Vectorised lookups, terminal states included, agree with the dense arrays
+    '''
+    V, policy = pig_layered_value_iteration(40, 6, 40, method='direct')
+    solution = CompactSolution.from_dense(V, policy, 40, value_dtype=np.float32, packed=True)
+    ps, os, t = np.indices(V.shape).reshape(3, -1)
+
+    assert_array_equal(solution.action(ps, os, t), policy[ps, os, t])
+    assert np.abs(solution.value(ps, os, t) - V[ps, os, t]).max() < 1e-7
+
+
+def test_lookups_reject_out_of_range_states():
+    '''
+    Indices outside the dense shape, or terminal states passed to `index`, raise IndexError
+    '''
+    V, policy = pig_layered_value_iteration(20, 6, 10, method='direct')
+    solution = CompactSolution.from_dense(V, policy, 20, value_dtype=np.float64)
+
+    assert solution.value(3, 4, 5) == V[3, 4, 5]
+    assert solution.action(20, 20, 10) == policy[20, 20, 10]
+    for state in [(-1, 0, 0), (0, 21, 0), (0, 0, 11), (0, -1, 0)]:
+        with pytest.raises(IndexError):
+            solution.value(*state)
+        with pytest.raises(IndexError):
+            solution.action(*state)
+    for state in [(19, 0, 1), (0, 20, 0), (5, 5, 11), (-1, 0, 0)]:
+        with pytest.raises(IndexError):
+            solution.index(*state)
@@ -0,0 +1,109 @@
+'''
+The content of this test checks that the compiled simulation engine 
+in `Competition` agrees with the original pure python loop, and that 
+it is reproducible for a fixed seed.
+'''
+
+import sys
+import os
+import numpy as np
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.competition import Competition, Opponents
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+
+
+def test_compiled_matches_python():
+    '''
+    Both engines should estimate the same win rate up to Monte Carlo noise
+    '''
+    player1 = Opponents.hold_at_n(20)
+    player2 = Opponents.hold_at_n(25)
+
+    python_rate = Competition(player1, player2, replications=4000, seed=0)()
+    compiled_rate = Competition(player1, player2, replications=200000, seed=0, compiled=True)()
+
+    # four standard errors of the python estimate
+    assert abs(python_rate - compiled_rate) < 4 * np.sqrt(0.25 / 4000)
+
+
+def test_compiled_is_reproducible():
+    '''
+    A fixed seed gives the same result on repeated calls
+    '''
+    player1 = Opponents.hold_at_n(20)
+    competition = Competition(player1, player1, replications=10000, seed=42, compiled=True)
+    assert competition() == competition()
+
+
+def test_parallel_is_reproducible():
+    '''
+    Splitting across workers is deterministic for a given (seed, workers) pair
+    '''
+    player1 = Opponents.hold_at_n(20)
+    player2 = Opponents.hold_at_n(25)
+    first = Competition(player1, player2, replications=10001, seed=7, workers=3)()
+    second = Competition(player1, player2, replications=10001, seed=7, workers=3)()
+    assert first == second
+
+
+def test_estimators_exact_cases():
+    '''
+    Plain estimates replay the compiled engine, and the variance-reduced estimators 
+    are exact where they should be: optimal play against itself for the control 
+    variate, and any policy against itself under common random numbers
+    '''
+    V, policy = pig_layered_value_iteration(100, 6, 100, method='direct')
+    competition = Competition(policy, policy, replications=2000, seed=5, compiled=True)
+
+    assert competition.estimate('plain').win_rate == competition()
+    controlled = competition.estimate('control_variate', V)
+    assert np.isclose(controlled.win_rate, V[0, 0, 0]) and controlled.std_error == 0
+    assert competition.estimate('crn').win_rate == 0.5
+
+
+def test_estimators_reduce_variance():
+    '''
+    The control variate and common random numbers agree with plain simulation 
+    while reporting smaller standard errors
+    '''
+    V, policy = pig_layered_value_iteration(100, 6, 100, method='direct')
+    player2 = Opponents.hold_at_n(20)
+    competition = Competition(policy, player2, replications=40000, seed=1, workers=2)
+
+    plain = competition.estimate('plain')
+    controlled = competition.estimate('control_variate', V)
+    assert abs(plain.win_rate - controlled.win_rate) < 4 * plain.std_error
+    assert controlled.variance_reduction > 10
+    assert controlled.std_error < plain.std_error / 3
+
+    # Seat-averaged rate, checked against plain runs from both seats
+    crn = competition.estimate('crn')
+    second_seat = Competition(player2, policy, replications=40000, seed=2, workers=2).estimate('plain')
+    assert abs(crn.win_rate - (plain.win_rate + 1 - second_seat.win_rate) / 2) < 4 * plain.std_error
+    assert crn.variance_reduction > 1.5 and crn.games == 40000
+
+
+def test_sequential_stopping():
+    '''
+    Lopsided match-ups stop early on the SPRT, close ones stop at the requested 
+    half-width, and the budget caps the games played
+    '''
+    player1 = Opponents.hold_at_n(20)
+    competition = Competition(player1, Opponents.hold_at_n(5), replications=10**6, seed=0)
+    result = competition.sequential(half_width=None, sprt_delta=0.02, batch=1000)
+    assert result.reason == 'sprt_better' and result.games == 1000
+    assert result.interval[0] > 0.5
+
+    competition = Competition(player1, Opponents.hold_at_n(25), replications=10**6, seed=0)
+    result = competition.sequential(half_width=0.01, batch=2000)
+    assert result.reason == 'half_width' and result.games < 10**6
+    assert (result.interval[1] - result.interval[0]) / 2 <= 0.01
+    assert result.interval[0] < result.win_rate < result.interval[1]
+
+    capped = Competition(player1, player1, replications=3000, seed=0).sequential(half_width=0.001, batch=2000)
+    assert capped.reason == 'max_games' and capped.games == 3000
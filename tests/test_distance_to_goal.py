@@ -0,0 +1,44 @@
+'''
+The content of this test checks that extending a distance-indexed 
+solution to a larger target reproduces a fresh solve, and that 
+smaller targets can be sliced out of it.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.distance_to_goal import DistanceSolution
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+
+
+def test_extension_matches_fresh_solve():
+    '''
+    Extending a cached-style score solution gives the direct solve of the larger target
+    '''
+    V_small, policy_small = pig_layered_value_iteration(30, 6, 30, method='direct')
+    solution = DistanceSolution.from_score_arrays(V_small, policy_small, die_sides=6).extend(50)
+
+    V, policy = pig_layered_value_iteration(50, 6, 50, method='direct')
+    V_ext, policy_ext = solution.for_target(50)
+
+    assert_array_equal(V_ext, V)
+    assert_array_equal(policy_ext, policy)
+
+
+def test_slice_smaller_target():
+    '''
+    The solution for a smaller target is a slice of the larger one
+    '''
+    solution = DistanceSolution.solve(50)
+    V, policy = pig_layered_value_iteration(35, 6, 35, method='direct')
+    V_slice, policy_slice = solution.for_target(35)
+
+    assert_array_equal(V_slice, V)
+    assert_array_equal(policy_slice, policy)
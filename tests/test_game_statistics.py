@@ -0,0 +1,58 @@
+'''
+The content of this test checks that the streaming game statistics 
+collected by `Competition.statistics` describe the same games as the 
+compiled engine, and that statistics merge across workers and runs.
+'''
+
+import sys
+import os
+import numpy as np
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.competition import Competition, Opponents
+from notebook_writeup.game_statistics import GameStatistics
+
+
+def test_statistics_are_consistent():
+    '''
+    The win rate matches the compiled engine and the counts agree with each other
+    '''
+    player1 = Opponents.hold_at_n(20)
+    player2 = Opponents.hold_at_n(25).astype(np.uint8)
+    competition = Competition(player1, player2, replications=5001, seed=3, workers=2)
+    stats = competition.statistics()
+
+    assert stats.n_games == 5001
+    assert stats.win_rate == competition()
+    assert stats.wins.sum() == stats.length_counts.sum() == stats.margin_counts.sum() == 5001
+    assert stats.turns.sum() == stats.length_moments[0] == stats.roll_counts.sum()
+
+    # every decision is a visit: one per roll that did not bust plus one per hold or bust
+    assert stats.visits.sum() == stats.turns.sum() + stats.rolls.sum() - stats.busts.sum()
+    # player 1 always starts from (0, 0, 0), player 2 at least once per game
+    assert stats.visits[0, 0, 0, 0] >= 5001
+
+    margins = np.arange(stats.margin_counts.size) - stats.margin_bound
+    assert np.isclose((margins * stats.margin_counts).sum() / 5001, stats.margin[0])
+    assert 0 < stats.bust_rate[0] < 1
+
+
+def test_statistics_merge(tmp_path):
+    '''
+    Merging two runs gives the element-wise sum, and survives a save and load
+    '''
+    player = Opponents.hold_at_n(20)
+    first = Competition(player, player, replications=1000, seed=0).statistics(visits=False)
+    second = Competition(player, player, replications=1000, seed=1).statistics(visits=False)
+
+    first.save(tmp_path / 'first.npz')
+    merged = GameStatistics.load(tmp_path / 'first.npz') + second
+    assert merged.n_games == 2000
+    assert np.array_equal(merged.length_counts, first.length_counts + second.length_counts)
+    assert merged.visits.shape == (2, 0, 0, 0)
+    # the operands are left unchanged
+    assert first.n_games == second.n_games == 1000
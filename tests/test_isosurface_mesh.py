@@ -0,0 +1,121 @@
+'''
+The content of this test checks that the NumPy isosurface extraction gives
+closed, correctly placed meshes, that meshes are cached with the solution, 
+and that the `*_mesh` plotting functions build their figures.
+'''
+
+import sys
+import os
+import numpy as np
+import pytest
+from unittest import mock
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.isosurface_mesh import marching_tetrahedra, cached_isosurface
+from notebook_writeup.solution_cache import SolutionCache, cached_pig_layered_value_iteration
+
+CENTRE = np.array([15.3, 14.6, 15.8])
+RADIUS = 9.0
+
+
+def test_sphere_mesh_is_closed_and_accurate():
+    '''
+    A sphere comes out watertight, on the right radius, with normals towards higher values
+    '''
+    x, y, z = np.meshgrid(*[np.arange(31)] * 3, indexing='ij')
+    field = -np.sqrt((x - CENTRE[0])**2 + (y - CENTRE[1])**2 + (z - CENTRE[2])**2)
+    vertices, faces = marching_tetrahedra(field, -RADIUS)
+
+    radii = np.linalg.norm(vertices - CENTRE, axis=1)
+    assert np.abs(radii - RADIUS).max() < 0.1
+
+    # Every edge is shared by exactly two triangles, traversed in opposite directions
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    assert len(np.unique(edges, axis=0)) == len(edges)
+    undirected, counts = np.unique(np.sort(edges, axis=1), axis=0, return_counts=True)
+    assert (counts == 2).all()
+
+    corners = vertices[faces]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    assert ((normals * (CENTRE - corners.mean(axis=1))).sum(axis=1) > 0).all()
+
+    _, coarse = marching_tetrahedra(field, -RADIUS, step=2)
+    assert len(coarse) < len(faces) / 3
+
+
+def test_mesh_cached_with_solution(tmp_path):
+    '''
+    Meshes of a cached solution are stored in its cache entry and reloaded unchanged
+    '''
+    cache = SolutionCache(tmp_path)
+    V, _ = cached_pig_layered_value_iteration(30, 6, 30, method='direct', cache=cache)
+
+    vertices, faces = cached_isosurface(V[:, :-1, :], 0.5)
+    entry = next(path for path in tmp_path.iterdir() if not path.name.startswith('.'))
+    assert len(list(entry.glob('mesh-*.npz'))) == 1
+
+    cached_vertices, cached_faces = cached_isosurface(V[:, :-1, :], 0.5)
+    assert_array_equal(cached_vertices, vertices)
+    assert_array_equal(cached_faces, faces)
+
+    cached_isosurface(V[:, 1:, :], 0.5)
+    assert len(list(entry.glob('mesh-*.npz'))) == 2
+
+
+def test_mesh_counts_toward_cache_limit(tmp_path):
+    '''
+    A mesh written into a cache entry is accounted at once, evicting older entries over the limit
+    '''
+    cache = SolutionCache(tmp_path)
+    cached_pig_layered_value_iteration(30, 6, 30, method='direct', cache=cache)
+    V, _ = cached_pig_layered_value_iteration(25, 6, 25, method='direct', cache=cache)
+    assert len(cache.entries()) == 2
+
+    # Exactly full, so that the mesh pushes the older solution out
+    cache.max_bytes = sum(size for _, size in cache.entries().values())
+    cached_isosurface(V[:, :-1, :], 0.5, cache=cache)
+
+    entries = cache.entries()
+    assert len(entries) == 1
+    assert len(list((tmp_path / next(iter(entries))).glob('mesh-*.npz'))) == 1
+
+
+def test_mesh_plots_build(tmp_path):
+    '''
+    The mesh plotting functions build one Mesh3d trace per surface, with show patched out
+    '''
+    go = pytest.importorskip('plotly.graph_objects')
+    from notebook_writeup.plotting_tools import plot_isosurface_mesh, generate_box_plots_mesh
+
+    V, policy = cached_pig_layered_value_iteration(15, 6, 15, method='direct',
+                                                   cache=SolutionCache(tmp_path))
+    with mock.patch.object(go.Figure, 'show', autospec=True) as show:
+        plot_isosurface_mesh(V, isovalues=[0.3, 0.7])
+        generate_box_plots_mesh(policy, title='Policy', pad=True)
+
+    values_figure, policy_figure = (call.args[0] for call in show.call_args_list)
+    assert [trace.type for trace in values_figure.data] == ['mesh3d', 'mesh3d']
+    assert [trace.type for trace in policy_figure.data] == ['mesh3d']
+    assert policy_figure.layout.title.text == 'Policy'
+
+
+def test_mesh_cache_dir_tells_solutions_apart(tmp_path):
+    '''
+    Two cached solutions of the same shape get their own meshes in a shared cache directory
+    '''
+    cache = SolutionCache(tmp_path / 'solutions')
+    V6, _ = cached_pig_layered_value_iteration(20, 6, 20, method='direct', cache=cache)
+    V10, _ = cached_pig_layered_value_iteration(20, 10, 20, method='direct', cache=cache)
+    assert V6.shape == V10.shape
+
+    for V in (V6, V10):
+        vertices, faces = cached_isosurface(V, 0.5, cache_dir=tmp_path / 'meshes')
+        expected_vertices, expected_faces = marching_tetrahedra(V, 0.5)
+        assert_array_equal(vertices, expected_vertices)
+        assert_array_equal(faces, expected_faces)
+    assert len(list((tmp_path / 'meshes').glob('mesh-*.npz'))) == 2
@@ -40,3 +40,34 @@ def test_piglet_policy():
 
     # and finally test their equality 
     assert_array_equal(generated_policy, correct_policy)
+
+
+def test_piglet_bounded_history():
+    '''
+    A small snapshot buffer keeps an evenly thinned subset of the full history
+    '''
+    full = PigletSolver(goal=5, epsilon=1e-6)
+    full()
+    bounded = PigletSolver(goal=5, epsilon=1e-6, max_logs=4)
+    bounded()
+
+    assert len(bounded.log_iterations) <= 4
+    assert_array_equal(bounded.iteration_logs, full.iteration_logs[bounded.log_iterations])
+    assert_array_equal(bounded.get_policy(), full.get_policy())
+
+
+def test_piglet_history_byte_budget():
+    '''
+    The snapshot buffer never exceeds its byte budget, and is dropped if two snapshots don't fit
+    '''
+    snapshot = 5 ** 3 * 8
+    bounded = PigletSolver(goal=5, epsilon=1e-6, max_log_bytes=3 * snapshot)
+    bounded()
+    assert bounded._buffer.nbytes <= 3 * snapshot
+    assert len(bounded.log_iterations) <= 3
+
+    unlogged = PigletSolver(goal=5, epsilon=1e-6, max_log_bytes=snapshot)
+    unlogged()
+    assert unlogged.iteration_logs.shape[0] == 0
+    assert len(unlogged.max_changes) == len(bounded.max_changes)
+    assert_array_equal(unlogged.get_policy(), bounded.get_policy())
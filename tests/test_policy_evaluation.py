@@ -0,0 +1,69 @@
+'''
+The content of this test checks the exact policy evaluator against 
+the value function from layered value iteration, and against 
+simulated play in `Competition`, and checks the best-response solver 
+against the evaluator.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_allclose
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.policy_evaluation import evaluate_policies, best_response
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.competition import Competition, Opponents
+
+
+def test_optimal_self_play_matches_value_iteration():
+    '''
+    Evaluating the optimal policy against itself recovers V
+    '''
+    V, policy = pig_layered_value_iteration(target_score=30, die_sides=6, max_turn=30, epsilon=1e-10)
+    V1, V2 = evaluate_policies(policy, policy, target_score=30, die_sides=6, max_turn=30)
+
+    assert_allclose(V1, V, atol=1e-8)
+    assert_allclose(V2, V, atol=1e-8)
+
+
+def test_matches_simulation():
+    '''
+    The exact win probability lies within Monte Carlo noise of the simulated one
+    '''
+    player1 = Opponents.hold_at_n(20)
+    player2 = Opponents.hold_at_n(25)
+    reps = 10**6
+
+    V1, _ = evaluate_policies(player1, player2)
+    simulated = Competition(player1, player2, replications=reps, seed=0, compiled=True)()
+
+    assert abs(V1[0, 0, 0] - simulated) < 4 * np.sqrt(0.25 / reps)
+
+
+def test_best_response_to_optimal_is_optimal():
+    '''
+    The optimal policy cannot be exploited, and is its own best response
+    '''
+    V, policy = pig_layered_value_iteration(target_score=30, die_sides=6, max_turn=30, epsilon=1e-10)
+    result = best_response(policy, target_score=30, die_sides=6, max_turn=30)
+
+    assert_allclose(result.V, V, atol=1e-8)
+    assert abs(result.exploitability) < 1e-8
+
+
+def test_best_response_value_is_attained():
+    '''
+    Playing the best-response policy against the opponent achieves the reported value
+    '''
+    opponent = Opponents.hold_at_n(10)
+    result = best_response(opponent, target_score=30, die_sides=6, max_turn=30)
+    V1, V2 = evaluate_policies(result.policy, opponent, target_score=30, die_sides=6, max_turn=30)
+
+    assert_allclose(V1[0, 0, 0], result.first_mover_value, atol=1e-9)
+    assert_allclose(1 - V2[0, 0, 0], result.second_mover_value, atol=1e-9)
+    assert result.exploitability > 0
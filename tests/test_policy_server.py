@@ -0,0 +1,139 @@
+'''
+The content of this test checks that the policy server answers concurrent
+clients from its table, over both a Unix socket and TCP, and reports latency.
+'''
+
+import sys
+import os
+import threading
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.solution_cache import SolutionCache
+from notebook_writeup.policy_server import PolicyTable, PolicyServer, PolicyClient
+
+TARGET_SCORE = 30
+DICE_SIZE = 6
+
+
+def _serve(table, path=None, **kwargs):
+    server = PolicyServer(table, **kwargs)
+    ready = threading.Event()
+    thread = threading.Thread(target=server.run, args=(path,), kwargs=dict(ready=ready))
+    thread.start()
+    ready.wait()
+    return server, thread
+
+
+def test_concurrent_clients(tmp_path):
+    '''
+    Several pipelining clients get the table's answers, in order, over both transports
+    '''
+    table = PolicyTable.from_cache(TARGET_SCORE, DICE_SIZE, cache=SolutionCache(tmp_path / 'cache'))
+
+    for path in (str(tmp_path / 'pig.sock'), None):
+        server, thread = _serve(table, path)
+        errors = []
+
+        def bot(seed):
+            rng = np.random.default_rng(seed)
+            ps, os, t = rng.integers(-2, TARGET_SCORE + 3, (3, 2000))
+            try:
+                with PolicyClient(server.address) as client:
+                    actions, values = client.decide_many(ps, os, t)
+                    action, value = client.decide(ps[0], os[0], t[0])
+
+                ps, os, t = (np.clip(a, 0, TARGET_SCORE) for a in (ps, os, t))
+                assert_array_equal(actions, table.policy[ps, os, t])
+                assert_array_equal(values, table.V[ps, os, t])
+                assert (action, value) == (actions[0], values[0])
+            except Exception as error:  # Raised in a thread, so reported below
+                errors.append(error)
+
+        bots = [threading.Thread(target=bot, args=(seed,)) for seed in range(4)]
+        for b in bots:
+            b.start()
+        for b in bots:
+            b.join()
+        server.stop()
+        thread.join()
+
+        assert not errors
+        stats = server.stats()
+        assert stats['requests'] == 4 * 2001
+        assert stats['batches'] <= stats['requests']
+        assert 0 < stats['p50'] <= stats['p99']
+
+
+def test_batches_larger_than_socket_buffers(tmp_path):
+    '''
+    Batches far larger than the socket buffers are answered, whether the client sends 
+    them in chunks or, like a naive client, writes everything before reading
+    '''
+    table = PolicyTable.from_cache(TARGET_SCORE, DICE_SIZE, cache=SolutionCache(tmp_path / 'cache'))
+    rng = np.random.default_rng(0)
+    ps, os, t = rng.integers(0, TARGET_SCORE + 1, (3, 500_000))
+
+    for path in (str(tmp_path / 'pig.sock'), None):
+        server, thread = _serve(table, path)
+        try:
+            with PolicyClient(server.address) as client:
+                actions, values = client.decide_many(ps, os, t)
+                assert_array_equal(actions, table.policy[ps, os, t])
+
+                # Everything sent before anything is read
+                naive = PolicyClient(server.address, chunk=ps.size)
+                with naive:
+                    naive_actions, naive_values = naive.decide_many(ps, os, t)
+                assert_array_equal(naive_values, values)
+        finally:
+            server.stop()
+            thread.join()
+
+    # A chunking client still gets every answer when the server holds back after one chunk
+    server, thread = _serve(table, str(tmp_path / 'pig.sock'), max_backlog=4096)
+    try:
+        with PolicyClient(server.address) as client:
+            assert_array_equal(client.decide_many(ps, os, t)[1], values)
+    finally:
+        server.stop()
+        thread.join()
+
+
+class _StrictTable(PolicyTable):
+    '''
+    A table rejecting negative indices, as a table without clamping would
+    '''
+    def query(self, ps, os, t):
+        if (np.asarray(ps) < 0).any():
+            raise IndexError("negative player score")
+        return super().query(ps, os, t)
+
+
+def test_bad_request_answered_with_error(tmp_path):
+    '''
+    A request the table rejects gets an error reply, and the connection and server keep working
+    '''
+    solved = PolicyTable.from_cache(TARGET_SCORE, DICE_SIZE, cache=SolutionCache(tmp_path / 'cache'))
+    table = _StrictTable(solved.V, solved.policy)
+    server, thread = _serve(table, str(tmp_path / 'pig.sock'))
+    try:
+        with PolicyClient(server.address) as client:
+            with pytest.raises(ValueError):
+                client.decide(-1, 4, 5)
+            assert client.decide(3, 4, 5) == (table.policy[3, 4, 5], table.V[3, 4, 5])
+
+            # Only the bad request of a batch fails, the rest are still looked up
+            with pytest.raises(ValueError, match='1 request'):
+                client.decide_many([1, -1, 2], 4, 5)
+            actions, _ = client.decide_many([1, 2], 4, 5)
+            assert_array_equal(actions, table.policy[[1, 2], 4, 5])
+    finally:
+        server.stop()
+        thread.join()
@@ -0,0 +1,48 @@
+'''
+The content of this test checks the exact forward propagation of 
+state visits against the exact policy evaluator: the probability 
+mass reaching winning states must equal each player's win probability.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_allclose
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.map_reachable_states import exact_state_visits
+from notebook_writeup.policy_evaluation import evaluate_policies
+from notebook_writeup.competition import Opponents
+
+
+def test_terminal_mass_matches_win_probability():
+    '''
+    Visits to winning states add up to each player's exact win probability
+    '''
+    player1 = Opponents.hold_at_n(20)
+    player2 = Opponents.hold_at_n(25)
+    visits = exact_state_visits(player1, player2)
+    V1, _ = evaluate_policies(player1, player2)
+
+    ps = np.arange(101)[:, None, None]
+    t = np.arange(101)[None, None, :]
+    won = np.broadcast_to(ps + t >= 100, visits.visit1.shape)
+
+    assert_allclose(visits.visit1[won].sum(), V1[0, 0, 0], atol=1e-9)
+    assert_allclose(visits.visit1[won].sum() + visits.visit2[won].sum(), 1.0, atol=1e-9)
+
+
+def test_visits_are_probabilities():
+    '''
+    Visit probabilities are bounded by one and by the expected number of visits
+    '''
+    policy = Opponents.hold_at_n(20)
+    visits = exact_state_visits(policy, 0.5 * policy)
+
+    assert visits.visit1[0, 0, 0] == 1.0
+    assert visits.visit1.max() <= 1.0 + 1e-12
+    assert np.all(visits.visit1 <= visits.occupancy1 + 1e-12)
@@ -0,0 +1,77 @@
+'''
+The content of this test checks that the on-disk solution cache 
+returns the solver's output, and evicts old entries once it grows 
+beyond its size limit.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.solution_cache import SolutionCache, cached_pig_layered_value_iteration
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+
+
+def test_cache_round_trip(tmp_path):
+    '''
+    A miss stores the solution, and a hit memory-maps the same arrays back in
+    '''
+    cache = SolutionCache(tmp_path)
+    V, policy = pig_layered_value_iteration(20, 6, 20, 1e-6)
+
+    V_miss, policy_miss = cached_pig_layered_value_iteration(20, 6, 20, 1e-6, cache=cache)
+    V_hit, policy_hit = cached_pig_layered_value_iteration(20, 6, 20, 1e-6, cache=cache)
+
+    assert len(cache.entries()) == 1
+    assert isinstance(V_hit, np.memmap)
+    assert_array_equal(V_miss, V)
+    assert_array_equal(V_hit, V)
+    assert_array_equal(policy_hit, policy)
+
+
+def test_cache_eviction(tmp_path):
+    '''
+    Only the most recent entry survives when the limit fits one entry
+    '''
+    cache = SolutionCache(tmp_path, max_bytes=1)
+    cached_pig_layered_value_iteration(10, 6, 10, cache=cache)
+    cached_pig_layered_value_iteration(12, 6, 12, cache=cache)
+
+    params = dict(target_score=12, die_sides=6, max_turn=12, epsilon=1e-6, method='sweep')
+    assert list(cache.entries()) == [cache.key(params)]
+
+
+def test_cache_partly_evicted_entry_and_clear(tmp_path):
+    '''
+    An entry removed part way through loading is a miss, and clearing removes plain files too
+    '''
+    cache = SolutionCache(tmp_path)
+    params = dict(target_score=10, die_sides=6, max_turn=10, epsilon=1e-6, method='direct')
+    cached_pig_layered_value_iteration(cache=cache, **params)
+
+    # As if another process evicted the entry between its metadata and its arrays
+    (tmp_path / cache.key(params) / 'V.npy').unlink()
+    assert cache.load(params) is None
+
+    (tmp_path / '.staging-file').write_text('interrupted')
+    (tmp_path / '.staging-dir').mkdir()
+    cache.clear()
+    assert cache.entries() == {}
+    assert not (tmp_path / '.staging-file').exists() and not (tmp_path / '.staging-dir').exists()
+
+
+def test_cache_limit_only_recorded_when_given(tmp_path):
+    '''
+    Opening a cache without a limit neither changes nor forgets one given explicitly
+    '''
+    assert SolutionCache(tmp_path).max_bytes == 8 * 1024**3
+    SolutionCache(tmp_path, max_bytes=1000)
+    assert SolutionCache(tmp_path).max_bytes == 1000
+    cached_pig_layered_value_iteration(10, 6, 10, method='direct', cache=SolutionCache(tmp_path))
+    assert SolutionCache(tmp_path).max_bytes == 1000
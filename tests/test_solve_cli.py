@@ -0,0 +1,80 @@
+'''
+The content of this test runs the command line solver as a fresh 
+process, as a batch job would, checking its answer and its start-up 
+time budget, with the ahead-of-time kernels (built first if missing or 
+stale) and with the JIT kernels loaded from numba's cache.
+'''
+
+import sys
+import os
+import types
+import subprocess
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.solver_state import SOLVER_VERSION
+from notebook_writeup.solve_cli import solve
+
+COLD_START_BUDGET = 0.5  # seconds, from interpreter start to answer, with the AOT kernels
+JIT_START_BUDGET = 2.0  # seconds, likewise, with the JIT kernels already in numba's cache
+
+
+def _build_aot_if_stale():
+    '''
+    Builds the ahead-of-time kernels unless a build for the current solver version exists
+    '''
+    check = ("import sys; sys.path.insert(0, 'notebook_writeup'); import _pig_aot; "
+             "print(_pig_aot.solver_version())")
+    found = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True)
+    if found.returncode != 0 or found.stdout.strip() != str(SOLVER_VERSION):
+        subprocess.run([sys.executable, 'notebook_writeup/build_aot.py'], capture_output=True, check=True)
+
+
+def test_cli_solve():
+    '''
+    A small solve from the command line, with the AOT kernels, returns the first mover's win
+    probability well within the cold-start budget
+    '''
+    _build_aot_if_stale()
+    V, _ = pig_layered_value_iteration(30, 6, 30, method='direct')
+
+    result = subprocess.run([sys.executable, 'notebook_writeup/solve_cli.py', '--target-score', '30'],
+                            capture_output=True, text=True, check=True)
+    answer, timing = result.stdout.strip().splitlines()
+
+    assert abs(float(answer.split('=')[1]) - V[0, 0, 0]) < 1e-11
+    assert 'backend = aot' in timing
+    assert float(timing.split('elapsed = ')[1].rstrip('s')) < COLD_START_BUDGET
+
+
+def test_stale_aot_build_ignored(monkeypatch):
+    '''
+    A build for another solver version is not used, the JIT kernels answering instead
+    '''
+    # Were it used, this build's answers would be all zeros
+    stale = types.SimpleNamespace(solver_version=lambda: SOLVER_VERSION + 1,
+                                  direct=lambda V, policy, *args: (0 * V, policy))
+    monkeypatch.setitem(sys.modules, '_pig_aot', stale)
+
+    V, policy, backend = solve(20, 6, 20, 1e-6, 'direct')
+    expected_V, _ = pig_layered_value_iteration(20, 6, 20, method='direct')
+    assert backend == 'jit'
+    assert_array_equal(V, expected_V)
+
+
+def test_cli_jit_budget():
+    '''
+    With the JIT kernels forced, a solve after the cache is warm still answers within its budget
+    '''
+    command = [sys.executable, 'notebook_writeup/solve_cli.py', '--target-score', '30', '--jit']
+    subprocess.run(command, capture_output=True, check=True)  # fills numba's cache if needed
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    _, timing = result.stdout.strip().splitlines()
+
+    assert 'backend = jit' in timing
+    assert float(timing.split('elapsed = ')[1].rstrip('s')) < JIT_START_BUDGET
@@ -0,0 +1,54 @@
+'''
+The content of this test checks that the alternative solver modes of 
+`pig_layered_value_iteration` agree with the standard serial sweep.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+
+TARGET_SCORE = 50
+DICE_SIZE = 6
+MAX_TURN = 50
+
+
+def test_parallel_matches_sweep():
+    '''
+    The parallel solver reproduces the serial update order exactly
+    '''
+    V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6)
+    V_par, policy_par = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6, method='parallel')
+
+    assert_array_equal(V_par, V)
+    assert_array_equal(policy_par, policy)
+
+
+def test_direct_matches_converged_sweep():
+    '''
+    The direct solver agrees with a tightly converged sweep, policy and values
+    '''
+    V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-13)
+    V_dir, policy_dir = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, method='direct')
+
+    assert np.abs(V_dir - V).max() < 1e-11
+    assert_array_equal(policy_dir, policy)
+
+
+def test_window_matches_sweep():
+    '''
+    Window-sum roll expectations agree with the face-by-face sweep, for small and large dice
+    '''
+    for die_sides in (DICE_SIZE, 20, 100):
+        V, policy = pig_layered_value_iteration(TARGET_SCORE, die_sides, MAX_TURN, 1e-9)
+        V_win, policy_win = pig_layered_value_iteration(TARGET_SCORE, die_sides, MAX_TURN, 1e-9, method='window')
+
+        assert np.abs(V_win - V).max() < 1e-12
+        assert_array_equal(policy_win, policy)
@@ -0,0 +1,51 @@
+'''
+The content of this test checks that the instrumented solver reproduces
+`pig_layered_value_iteration` and reports on every layer it solves.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.solver_telemetry import instrumented_layered_value_iteration
+
+TARGET_SCORE = 30
+DICE_SIZE = 6
+MAX_TURN = 30
+
+
+def test_telemetry_matches_solver():
+    '''
+    Driving the solve layer by layer gives the same arrays for every method
+    '''
+    for method in ('sweep', 'parallel', 'direct', 'window'):
+        V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6, method=method)
+        result = instrumented_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6, method=method)
+
+        assert_array_equal(result.V, V)
+        assert_array_equal(result.policy, policy)
+
+
+def test_layer_report_and_progress():
+    '''
+    One record per layer, in solve order, with the progress callback called every N layers
+    '''
+    calls = []
+    result = instrumented_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6,
+                                                  progress=lambda layers: calls.append(len(layers)),
+                                                  progress_every=10)
+    layers = result.layers
+
+    assert_array_equal(layers['score_sum'], np.arange(2 * TARGET_SCORE - 2, -1, -1))
+    assert (layers['sweeps'] >= 1).all()
+    assert (layers['max_diff'] < 1e-6).all()
+    assert (layers['states'] > 0).all()
+    assert calls == [10, 20, 30, 40, 50, 59]
+    assert result.states_per_second > 0
@@ -0,0 +1,66 @@
+'''
+The content of this test checks that the layer-streaming solver writes the
+same solution as the in-memory direct solver.
+'''
+
+import sys
+import os
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.streaming_solver import streaming_layered_value_iteration, StreamedSolution
+
+
+def test_streamed_matches_direct(tmp_path):
+    '''
+    Values, policy and t = 0 plane agree exactly, with and without truncated turn totals
+    '''
+    for target_score, die_sides, max_turn in ((50, 6, 50), (40, 4, 20)):
+        V, policy = pig_layered_value_iteration(target_score, die_sides, max_turn, method='direct')
+        directory = tmp_path / f'{target_score}-{die_sides}-{max_turn}'
+        streaming_layered_value_iteration(directory, target_score, die_sides, max_turn)
+
+        solution = StreamedSolution(directory)
+        assert_array_equal(solution.dense_values(), V)
+        assert_array_equal(solution.dense_policy(np.int64), policy)
+        assert_array_equal(solution.t0_plane, V[:target_score, :target_score, 0])
+
+
+def test_float32_storage(tmp_path):
+    '''
+    Lower precision storage only rounds the values; lookups of single states work
+    '''
+    V, policy = pig_layered_value_iteration(30, 6, 30, method='direct')
+    solution = streaming_layered_value_iteration(tmp_path, 30, 6, value_dtype=np.float32)
+
+    assert solution.values.dtype == np.float32
+    assert_array_equal(solution.dense_policy(np.int64), policy)
+    assert np.abs(solution.dense_values() - V).max() < 1e-7
+    assert solution.value(0, 0, 0) == np.float32(V[0, 0, 0])
+
+
+def test_lookups_reject_out_of_range_states(tmp_path):
+    '''
+    Indices outside the dense shape, or terminal states passed to `index`, raise IndexError
+    rather than wrapping round to another state
+    '''
+    V, policy = pig_layered_value_iteration(20, 6, 10, method='direct')
+    streaming_layered_value_iteration(tmp_path, 20, 6, 10)
+    solution = StreamedSolution(tmp_path)
+
+    assert solution.action(20, 20, 10) == policy[20, 20, 10]
+    for state in [(-1, 0, 0), (0, 21, 0), (0, 0, 11), (0, -1, 0), (3, -2, 1)]:
+        with pytest.raises(IndexError):
+            solution.value(*state)
+        with pytest.raises(IndexError):
+            solution.action(*state)
+    for state in [(19, 0, 1), (0, 20, 0), (5, 5, 11), (-1, 0, 0), (3, -2, 1)]:
+        with pytest.raises(IndexError):
+            solution.index(*state)
@@ -0,0 +1,51 @@
+'''
+The content of this test checks that the alternative sweep schedules 
+reach the same solution as the standard sweep with less work, and that 
+schedules which fail to converge are reported as such.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.sweep_schedules import compare_schedules, scheduled_layered_value_iteration
+
+TARGET_SCORE = 30
+DICE_SIZE = 6
+MAX_TURN = 30
+
+
+def test_default_schedule_matches_sweep():
+    '''
+    Plain Gauss-Seidel under the scheduler is the standard sweep, update for update
+    '''
+    V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6)
+    result = scheduled_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-6)
+
+    assert_array_equal(result.V, V)
+    assert_array_equal(result.policy, policy)
+
+
+def test_schedules_compared():
+    '''
+    Every default schedule converges to the exact solution, reverse ordering and 
+    prioritised sweeping doing fewer updates, and a diverging relaxation is flagged
+    '''
+    schedules = dict(gauss_seidel=dict(), reverse=dict(reverse=True),
+                     prioritised=dict(prioritised=True), sor_1_2=dict(omega=1.2),
+                     sor_1_5=dict(omega=1.5, max_sweeps=200))
+    table = compare_schedules(TARGET_SCORE, DICE_SIZE, MAX_TURN, 1e-9, schedules)
+    rows = {row['name']: row for row in table}
+
+    for name in ('gauss_seidel', 'reverse', 'prioritised', 'sor_1_2'):
+        assert rows[name]['converged'] and rows[name]['max_error'] < 1e-6
+    assert rows['reverse']['sweeps'] < rows['gauss_seidel']['sweeps']
+    assert rows['prioritised']['states'] < rows['gauss_seidel']['states']
+    assert not rows['sor_1_5']['converged']
@@ -0,0 +1,68 @@
+'''
+The content of this test checks that threshold-compressed policies round-trip
+losslessly and answer batch lookups like the dense arrays.
+'''
+
+import sys
+import os
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.optimised_layered_vi import pig_layered_value_iteration
+from notebook_writeup.threshold_policy import ThresholdPolicy
+
+TARGET_SCORE = 100
+DICE_SIZE = 6
+MAX_TURN = 100
+
+
+def test_round_trip_is_lossless(tmp_path):
+    '''
+    The optimal policy, and an arbitrary 0/1 policy, expand back to exactly the same array
+    '''
+    _, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, method='direct')
+    compressed = ThresholdPolicy.from_dense(policy)
+
+    assert_array_equal(compressed.to_dense(), policy)
+    assert compressed.n_exceptions < 1000
+    assert compressed.nbytes < policy.nbytes // 100
+
+    noise = np.random.default_rng(0).integers(0, 2, (20, 20, 20))
+    assert_array_equal(ThresholdPolicy.from_dense(noise).to_dense(), noise)
+
+    compressed.save(tmp_path / 'policy.npz')
+    assert_array_equal(ThresholdPolicy.load(tmp_path / 'policy.npz').to_dense(), policy)
+
+
+def test_batch_query_matches_dense():
+    '''
+    Batch lookups of actions and win probabilities agree with indexing the dense arrays
+    '''
+    V, policy = pig_layered_value_iteration(TARGET_SCORE, DICE_SIZE, MAX_TURN, method='direct')
+    compressed = ThresholdPolicy.from_dense(policy, V, value_dtype=np.float64)
+
+    ps, os, t = np.random.default_rng(1).integers(0, TARGET_SCORE + 1, (3, 100000))
+    actions, win_probs = compressed.query(ps, os, t)
+
+    assert_array_equal(actions, policy[ps, os, t])
+    assert_allclose(win_probs, V[ps, os, t], rtol=0, atol=1e-15)
+
+
+def test_negative_indices_clamped():
+    '''
+    Negative and oversized indices are clamped into the table, as `PolicyTable.query` does
+    '''
+    V, policy = pig_layered_value_iteration(30, DICE_SIZE, 30, method='direct')
+    compressed = ThresholdPolicy.from_dense(policy, V, value_dtype=np.float64)
+
+    ps, os, t = np.array([-1, 4, -5, 40]), np.array([4, -2, -1, 3]), np.array([5, -3, 0, 50])
+    actions, win_probs = compressed.query(ps, os, t)
+
+    clamped = tuple(np.clip(x, 0, 30) for x in (ps, os, t))
+    assert_array_equal(actions, policy[clamped])
+    assert_allclose(win_probs, V[clamped], rtol=0, atol=1e-15)
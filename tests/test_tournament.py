@@ -0,0 +1,54 @@
+'''
+The content of this test checks that the round-robin tournament tabulates 
+both seat orders consistently, and that cached pairings are not replayed 
+when a policy is added or the tournament is run again from disk.
+'''
+
+import sys
+import os
+import numpy as np
+
+
+# coding in relative imports in a flexible manor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Loading in the module to be tested. 
+from notebook_writeup.competition import Opponents
+from notebook_writeup.tournament import Tournament, hold_at_pool, policy_hash
+
+
+def test_tournament_tables():
+    '''
+    Seat-averaged rates are complementary, and the table ranks the strongest first
+    '''
+    pool = hold_at_pool([5, 20, 25])
+    result = Tournament(pool, replications=4000, seed=0, workers=2).run()
+
+    off_diagonal = ~np.eye(3, dtype=bool)
+    assert np.allclose((result.win_matrix + result.win_matrix.T)[off_diagonal], 1)
+    assert np.isnan(result.first_seat.diagonal()).all()
+    assert result.computed == 6 and result.cached == 0
+    assert result.ratings['name'][-1] == 'hold_at_5'
+    assert np.isclose(result.ratings['rating'].mean(), 0)
+
+    # policies are identified by their actions, not their integer type
+    assert policy_hash(Opponents.hold_at_n(20)) == policy_hash(pool['hold_at_20'])
+
+
+def test_tournament_cache(tmp_path):
+    '''
+    Adding a policy only plays its pairings, and a new tournament reuses results on disk
+    '''
+    pool = hold_at_pool([15, 25])
+    tournament = Tournament(pool, replications=2000, seed=3, cache_dir=tmp_path)
+    first = tournament.run()
+
+    tournament.add('hold_at_20', Opponents.hold_at_n(20))
+    grown = tournament.run()
+    assert grown.computed == 4 and grown.cached == 2
+    assert np.array_equal(grown.win_matrix[:2, :2], first.win_matrix, equal_nan=True)
+
+    reloaded = Tournament(dict(pool, hold_at_20=Opponents.hold_at_n(20)), replications=2000,
+                          seed=3, cache_dir=tmp_path).run()
+    assert reloaded.computed == 0
+    assert np.array_equal(reloaded.win_matrix, grown.win_matrix, equal_nan=True)